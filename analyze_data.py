@@ -8,8 +8,9 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 from datetime import datetime
+from telemetry_store import run_db_path
 
-DB_PATH = "telemetry.db"
+DB_PATH = run_db_path("telemetry.db")  # Database file of the latest run
 
 def analyze_data():
     """Perform comprehensive data analysis"""
@@ -0,0 +1,116 @@
+"""
+Backend Benchmark
+Compares simulation steps/second of the RSU collection loop (traCI_rsu.py)
+under the traci (socket) and libsumo (in-process) backends.
+
+Each backend runs in its own process because the backend is selected at
+import time. Uploads to the server are disabled by default so that only
+SUMO stepping and telemetry collection are measured.
+
+Usage:
+    python benchmark_backends.py --steps 1000
+    python benchmark_backends.py --backends libsumo --with-upload
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def run_child(steps: int, with_upload: bool):
+    """Run the collection loop headless in this process and print a JSON result"""
+    import traCI_rsu as app
+    from rsu import DROP_OLDEST
+    from sim_backend import BACKEND_NAME, traci
+
+    log = io.StringIO()
+    with tempfile.TemporaryDirectory() as spool_dir, contextlib.redirect_stdout(log):
+        if with_upload:
+            # Records spilled during the benchmark must not be replayed by a real run
+            app.rsu_network.spill_dir = spool_dir
+        else:
+            # Nothing is sent, so full buffers would only measure spool writes
+            app.rsu_network.overflow_policy = DROP_OLDEST
+        app.setup_rsu_network()
+        if not with_upload:
+            app.rsu_network.send_all_data = lambda *args, **kwargs: None
+        app.start_simulation(gui=False)
+
+        samples = 0
+        last_log_time = 0
+        start = time.perf_counter()
+        try:
+            for _ in range(steps):
+                sim_time, _, _ = app.advance_simulation()
+                if sim_time - last_log_time >= app.LOG_INTERVAL:
+                    app.collect_vehicle_data_via_rsu(sim_time)
+                    samples += 1
+                    last_log_time = sim_time
+        finally:
+            elapsed = time.perf_counter() - start
+            traci.close()
+            # Finish the uploads and release the upload threads, spools and HTTP pool
+            app.rsu_network.wait_for_uploads()
+            app.rsu_network.close()
+
+    print(json.dumps({
+        "backend": BACKEND_NAME,
+        "steps": steps,
+        "samples": samples,
+        "seconds": round(elapsed, 3),
+        "steps_per_second": round(steps / elapsed, 1) if elapsed > 0 else None,
+    }))
+
+
+def run_benchmark(backends, steps: int, with_upload: bool):
+    """Run the child benchmark once per backend and print a comparison"""
+    results = []
+    for backend in backends:
+        env = dict(os.environ, SUMO_BACKEND=backend, SUMO_GUI="0")
+        cmd = [sys.executable, __file__, "--child", "--steps", str(steps)]
+        if with_upload:
+            cmd.append("--with-upload")
+        print(f"Running {steps} steps with backend '{backend}'...")
+        proc = subprocess.run(cmd, env=env, capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(f"  ✗ failed:\n{proc.stderr.strip()}")
+            continue
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        if result["backend"] != backend:
+            print(f"  ⚠ '{backend}' not available, ran with '{result['backend']}'")
+        print(f"  ✓ {result['steps_per_second']} steps/s ({result['seconds']}s, {result['samples']} samples)")
+        results.append(result)
+
+    if len(results) > 1:
+        print("\n" + "=" * 60)
+        print("BACKEND COMPARISON")
+        print("=" * 60)
+        baseline = results[0]
+        for result in results:
+            speedup = result["steps_per_second"] / baseline["steps_per_second"]
+            print(f"{result['backend']:10s} {result['steps_per_second']:10.1f} steps/s  ({speedup:.2f}x)")
+        print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--steps", type=int, default=1000, help="Simulation steps per run")
+    parser.add_argument("--backends", nargs="+", default=["traci", "libsumo"], help="Backends to compare")
+    parser.add_argument("--with-upload", action="store_true", help="Also POST RSU batches to the server")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.steps, args.with_upload)
+    else:
+        run_benchmark(args.backends, args.steps, args.with_upload)
+
+
+if __name__ == "__main__":
+    main()
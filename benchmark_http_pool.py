@@ -0,0 +1,129 @@
+"""
+HTTP Pool Benchmark
+Measures the effect of the pooled keep-alive session used by the RSU network
+against the local FastAPI server (server.py): the same RSU batches are POSTed
+to /ingest_rsu once with bare requests.post (new TCP connection per request)
+and once through rsu.create_http_session().
+
+Start the server first (python server.py), or pass --start-server.
+The benchmark inserts rows tagged with rsu_id 'RSU_BENCH'.
+
+Usage:
+    python benchmark_http_pool.py --requests 500 --batch-size 50
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import requests
+
+from rsu import create_http_session
+
+SERVER_URL = "http://127.0.0.1:8000"
+
+
+def make_payload(batch_size: int) -> dict:
+    """Build one RSU batch shaped like the ones sent by traCI_rsu.py"""
+    now = datetime.utcnow().isoformat(timespec="seconds") + "Z"
+    records = [
+        {
+            'vehicle_id': f"bench_ev_{i}",
+            'vehicle_type': 'Easybike_ER-02B',
+            'speed': 5.5,
+            'edge_id': 'E3',
+            'lane_id': 'E3_0',
+            'lane_position': 120.0 + i,
+            'vehicles_ahead_count': 3,
+            'same_direction_ahead': 1,
+            'distance_to_traffic_light': 250.0,
+            'next_traffic_light': 'J7',
+            'traffic_light_state': 'GGrr',
+            'time_to_red_light': 12.0,
+            'edge_occupancy_percentage': 4.5,
+            'battery_charge': 2800.0,
+            'battery_capacity': 3000.0,
+            'battery_percentage': 93.3,
+            'sim_time': float(i),
+            'position': (-210.0, 110.0),
+            'rsu_id': 'RSU_BENCH',
+            'collection_timestamp': now,
+        }
+        for i in range(batch_size)
+    ]
+    return {
+        'rsu_id': 'RSU_BENCH',
+        'rsu_position': (-218.70, 214.90),
+        'vehicle_data': records,
+        'timestamp': now,
+    }
+
+
+def run(post, url: str, payload: dict, count: int) -> list:
+    """POST the payload `count` times and return per-request latencies in ms"""
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        response = post(url, json=payload, timeout=5)
+        response.raise_for_status()
+        latencies.append((time.perf_counter() - start) * 1000.0)
+    return latencies
+
+
+def report(name: str, latencies: list):
+    total = sum(latencies) / 1000.0
+    p95 = sorted(latencies)[int(len(latencies) * 0.95) - 1]
+    print(f"{name:22s} {len(latencies) / total:8.1f} req/s   "
+          f"mean {statistics.mean(latencies):6.2f} ms   p95 {p95:6.2f} ms")
+    return len(latencies) / total
+
+
+def wait_for_server(url: str, timeout: float = 15.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            requests.get(f"{url}/rsu_stats", timeout=1)
+            return
+        except requests.exceptions.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not come up")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=SERVER_URL, help="Server base URL")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per variant")
+    parser.add_argument("--batch-size", type=int, default=50, help="Records per batch")
+    parser.add_argument("--start-server", action="store_true", help="Launch server.py for the benchmark")
+    args = parser.parse_args()
+
+    server = None
+    if args.start_server:
+        server = subprocess.Popen([sys.executable, "server.py"], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        wait_for_server(args.url)
+        url = f"{args.url}/ingest_rsu"
+        payload = make_payload(args.batch_size)
+
+        session = create_http_session()
+        run(session.post, url, payload, 10)  # warm-up
+
+        print("=" * 70)
+        print(f"POST /ingest_rsu x{args.requests} ({args.batch_size} records per batch)")
+        print("=" * 70)
+        bare = report("requests.post (no pool)", run(requests.post, url, payload, args.requests))
+        pooled = report("pooled keep-alive", run(session.post, url, payload, args.requests))
+        print("=" * 70)
+        print(f"Speedup: {pooled / bare:.2f}x")
+        session.close()
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Ingest Benchmark
+Measures rows/second of the /ingest_rsu storage path with several RSUs
+posting concurrently, comparing:
+
+    per-request   sqlite3.connect + INSERT + COMMIT + close per batch in the
+                  default rollback-journal mode (the original server.py)
+    wal-writer    server.store_rsu_payload on the persistent WAL-mode
+                  TelemetryStore writer, one transaction per batch
+    group-commit  batches queued on a GroupCommitWriter and committed in
+                  groups by its writer thread (the /ingest_rsu path)
+
+All variants run against fresh temporary databases, so telemetry.db is not touched.
+
+Usage:
+    python benchmark_ingest.py --rsus 7 --batches 200 --batch-size 50
+"""
+
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+import server
+from benchmark_wire_format import make_payload
+from telemetry_store import GroupCommitWriter, TelemetryStore
+
+
+def store_per_request(db_path: str, payload: server.RSUIngestPayload):
+    """The original storage path: one connection and one rollback-journal commit per batch"""
+    conn = sqlite3.connect(db_path, timeout=30)
+    cur = conn.cursor()
+    received_at = datetime.utcnow().isoformat(timespec="seconds") + "Z"
+    cur.executemany(server.RSU_VEHICLE_LOG_INSERT, server.rsu_vehicle_log_rows(payload, received_at))
+    cur.execute("""
+        INSERT INTO rsu_status (ts_utc, rsu_id, position_x, position_y, vehicle_count, data_records)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, (received_at, payload.rsu_id, payload.rsu_position[0], payload.rsu_position[1],
+          len(set(data.get('vehicle_id') for data in payload.vehicle_data)), len(payload.vehicle_data)))
+    conn.commit()
+    conn.close()
+
+
+def create_database(db_path: str, journal_mode: str):
+    """Create the server schema in a fresh database file"""
+    server.store = TelemetryStore(db_path)
+    server.init_db()
+    server.store.close()
+    conn = sqlite3.connect(db_path)
+    conn.execute(f"PRAGMA journal_mode={journal_mode}")
+    conn.close()
+
+
+def run(store_batch, payloads, batches: int) -> float:
+    """Store `batches` batches from each RSU thread concurrently and return the elapsed seconds"""
+    def rsu_thread(payload):
+        for _ in range(batches):
+            store_batch(payload)
+
+    threads = [threading.Thread(target=rsu_thread, args=(payload,)) for payload in payloads]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rsus", type=int, default=7, help="Concurrently posting RSUs")
+    parser.add_argument("--batches", type=int, default=200, help="Batches per RSU")
+    parser.add_argument("--batch-size", type=int, default=50, help="Records per batch")
+    args = parser.parse_args()
+
+    payloads = []
+    for i in range(args.rsus):
+        data = make_payload(args.batch_size, seed=i)
+        data['rsu_id'] = f"RSU_BENCH_{i}"
+        payloads.append(server.RSUIngestPayload(**data))
+    total_rows = args.rsus * args.batches * args.batch_size
+
+    print("=" * 64)
+    print(f"/ingest_rsu storage: {args.rsus} RSUs x {args.batches} batches x {args.batch_size} records")
+    print("=" * 64)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "per_request.db")
+        create_database(db_path, "DELETE")
+        elapsed = run(lambda payload: store_per_request(db_path, payload), payloads, args.batches)
+        results["per-request"] = total_rows / elapsed
+
+        db_path = os.path.join(tmp, "wal_writer.db")
+        create_database(db_path, "WAL")
+        server.store = TelemetryStore(db_path)
+        elapsed = run(server.store_rsu_payload, payloads, args.batches)
+        server.store.close()
+        results["wal-writer"] = total_rows / elapsed
+
+        db_path = os.path.join(tmp, "group_commit.db")
+        create_database(db_path, "WAL")
+        group_store = TelemetryStore(db_path)
+        writer = GroupCommitWriter(group_store)
+
+        def queue_batch(payload):
+            received_at = datetime.utcnow().isoformat(timespec="seconds") + "Z"
+            while not writer.submit(lambda cur: server.write_rsu_payload(cur, payload, received_at),
+                                    len(payload.vehicle_data)):
+                time.sleep(0.001)
+
+        start = time.perf_counter()
+        run(queue_batch, payloads, args.batches)
+        writer.flush()
+        elapsed = time.perf_counter() - start
+        writer.stop()
+        group_store.close()
+        results["group-commit"] = total_rows / elapsed
+
+    baseline = results["per-request"]
+    for name, rows_per_second in results.items():
+        print(f"{name:12s} {rows_per_second:12.0f} rows/s  ({rows_per_second / baseline:.2f}x)")
+    print("=" * 64)
+
+
+if __name__ == "__main__":
+    main()
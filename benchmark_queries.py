@@ -0,0 +1,173 @@
+"""
+Query Benchmark
+Times the rsu_vehicle_logs queries of analyze_data.py and the typical slices
+(one vehicle, one RSU, one edge, one sim-time window) on a synthetic table,
+first with the version 1 schema (no secondary indexes) and then after the
+remaining server.py migrations have added the indexes. Also reports the index
+build time, the file size and the ingest rate with and without the indexes,
+so index choices are made on measurements.
+
+The table is built in a temporary database, so telemetry.db is not touched.
+
+Usage:
+    python benchmark_queries.py --rows 10000000
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+import server
+from benchmark_wire_format import make_payload
+from telemetry_store import GroupCommitWriter, TelemetryStore
+
+VEHICLES = 2000
+RSUS = 7
+EDGES = 40
+RECORDS_PER_SIM_SECOND = 50
+
+# (name, SQL, parameter sets); each parameter set is one timed execution
+QUERIES = [
+    ("vehicle trajectory", """
+        SELECT sim_time, battery_charge FROM rsu_vehicle_logs
+        WHERE vehicle_id = ? ORDER BY sim_time
+    """, [("EV_17",), ("EV_1017",), ("EV_1999",)]),
+    ("rsu time slice", """
+        SELECT * FROM rsu_vehicle_logs
+        WHERE rsu_id = ? AND sim_time BETWEEN ? AND ? ORDER BY sim_time
+    """, [("RSU_1", 1000.0, 1060.0), ("RSU_4", 5000.0, 5060.0), ("RSU_6", 100.0, 160.0)]),
+    ("edge time slice", """
+        SELECT * FROM rsu_vehicle_logs
+        WHERE edge_id = ? AND sim_time BETWEEN ? AND ? ORDER BY sim_time
+    """, [("E3", 1000.0, 1300.0), ("E17", 5000.0, 5300.0), ("E39", 100.0, 400.0)]),
+    ("sim-time window", """
+        SELECT * FROM rsu_vehicle_logs
+        WHERE sim_time BETWEEN ? AND ? ORDER BY sim_time
+    """, [(1000.0, 1010.0), (5000.0, 5010.0), (100.0, 110.0)]),
+    ("by rsu (analyze 1)", """
+        SELECT rsu_id, COUNT(DISTINCT vehicle_id), COUNT(*), AVG(speed), MAX(speed),
+               MIN(speed), AVG(battery_charge), MIN(battery_charge)
+        FROM rsu_vehicle_logs GROUP BY rsu_id ORDER BY 3 DESC
+    """, [()]),
+    ("by minute (analyze 4)", """
+        SELECT CAST(sim_time / 60 AS INTEGER) AS minute, COUNT(*), COUNT(DISTINCT vehicle_id),
+               AVG(speed), AVG(battery_charge)
+        FROM rsu_vehicle_logs GROUP BY minute ORDER BY minute
+    """, [()]),
+    ("rsu_status by rsu", """
+        SELECT rsu_id, SUM(vehicle_count), SUM(data_records), MAX(ts_utc)
+        FROM rsu_status GROUP BY rsu_id
+    """, [()]),
+]
+
+
+def fill_tables(rows: int):
+    """Insert `rows` synthetic records (and one rsu_status row per 50 records) in one statement each"""
+    with server.store.writer() as cur:
+        cur.execute(f"""
+            WITH RECURSIVE n(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM n WHERE i + 1 < {rows})
+            INSERT INTO rsu_vehicle_logs
+            (ts_utc, rsu_id, rsu_position_x, rsu_position_y, vehicle_id, vehicle_type, edge_id, lane_id,
+             lane_position, speed, battery_charge, battery_capacity, battery_percentage,
+             vehicles_ahead_count, same_direction_ahead, distance_to_traffic_light, next_traffic_light,
+             traffic_light_state, edge_occupancy_percentage, sim_time, collection_timestamp, rsu_received_at)
+            SELECT '2025-01-01T00:00:00Z', 'RSU_' || (i % {RSUS}), 0.0, 0.0,
+                   'EV_' || (i % {VEHICLES}), 'EV', 'E' || ((i / {RSUS}) % {EDGES}),
+                   'E' || ((i / {RSUS}) % {EDGES}) || '_0', (i % 1800) * 1.0,
+                   (abs(random()) % 1400) / 100.0, 3000.0 - (i / {VEHICLES}) * 0.01, 3000.0, 90.0,
+                   i % 20, i % 10, (i % 1800) * 1.0, 'J' || (i % 8), 'GGrr', (i % 30) * 1.0,
+                   (i / {RECORDS_PER_SIM_SECOND}) * 1.0, '2025-01-01T00:00:00Z', '2025-01-01T00:00:00Z'
+            FROM n
+        """)
+        cur.execute(f"""
+            WITH RECURSIVE n(i) AS (SELECT 0 UNION ALL SELECT i + 1 FROM n WHERE i + 1 < {rows // 50})
+            INSERT INTO rsu_status (ts_utc, rsu_id, position_x, position_y, vehicle_count, data_records)
+            SELECT printf('2025-01-01T%08d', i), 'RSU_' || (i % {RSUS}), 0.0, 0.0, 20, 50
+            FROM n
+        """)
+
+
+def time_queries(db_path: str):
+    """Median milliseconds and query plan of every benchmark query"""
+    # A fresh connection: a reused one may report a cached pre-index EXPLAIN plan
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    results = {}
+    for name, sql, param_sets in QUERIES:
+        timings = []
+        for params in param_sets:
+            start = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            timings.append((time.perf_counter() - start) * 1000.0)
+        plan = "; ".join(row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, param_sets[0]))
+        results[name] = (statistics.median(timings), plan)
+    conn.close()
+    return results
+
+
+def time_ingest(batches: int, payload) -> float:
+    """Rows/second of `batches` /ingest_rsu writes through the group-commit queue into the current table"""
+    writer = GroupCommitWriter(server.store)
+    received_at = datetime.utcnow().isoformat(timespec="seconds") + "Z"
+    start = time.perf_counter()
+    for _ in range(batches):
+        while not writer.submit(lambda cur: server.write_rsu_payload(cur, payload, received_at),
+                                len(payload.vehicle_data)):
+            time.sleep(0.001)
+    writer.flush()
+    elapsed = time.perf_counter() - start
+    writer.stop()
+    return batches * len(payload.vehicle_data) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000_000, help="Synthetic rsu_vehicle_logs rows")
+    parser.add_argument("--ingest-batches", type=int, default=1000, help="50-record batches for the ingest rate")
+    args = parser.parse_args()
+
+    payload = server.RSUIngestPayload(**make_payload(50))
+
+    print("=" * 78)
+    print(f"rsu_vehicle_logs queries on {args.rows:,} rows")
+    print("=" * 78)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "queries.db")
+        server.store = TelemetryStore(db_path)
+        server.migrate_db(1)
+
+        start = time.perf_counter()
+        fill_tables(args.rows)
+        print(f"Filled in {time.perf_counter() - start:.1f} s, {os.path.getsize(db_path) / 2**20:.0f} MiB")
+
+        before = time_queries(db_path)
+        ingest_before = time_ingest(args.ingest_batches, payload)
+
+        start = time.perf_counter()
+        server.migrate_db()
+        print(f"Indexes built in {time.perf_counter() - start:.1f} s, "
+              f"{os.path.getsize(db_path) / 2**20:.0f} MiB")
+
+        after = time_queries(db_path)
+        ingest_after = time_ingest(args.ingest_batches, payload)
+        server.store.close()
+
+    print("-" * 78)
+    print(f"{'query':24s} {'no index ms':>12s} {'indexed ms':>12s} {'speedup':>9s}")
+    for name, _, _ in QUERIES:
+        ms_before, _ = before[name]
+        ms_after, plan = after[name]
+        print(f"{name:24s} {ms_before:12.1f} {ms_after:12.1f} {ms_before / max(ms_after, 1e-6):8.0f}x")
+        print(f"{'':24s} {plan}")
+    print("-" * 78)
+    print(f"ingest without indexes {ingest_before:10.0f} rows/s")
+    print(f"ingest with indexes    {ingest_after:10.0f} rows/s  ({ingest_after / ingest_before:.2f}x)")
+    print("=" * 78)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Wire Format Benchmark
+Compares the /ingest_rsu payload formats of wire_format.py: bytes per record
+on the wire and server-side parse time per batch (decode + validation with
+the same pydantic model server.py uses).
+
+Usage:
+    python benchmark_wire_format.py --batch-size 50 --repeat 200
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime
+
+import wire_format
+from server import RSUIngestPayload
+
+VEHICLE_TYPES = ['Easybike_ER-02B', 'Small_Easybike_V12', 'Electric_Rickshaw_V8', 'Default_EV']
+EDGES = ['E3', 'E3.189', 'E4', 'E5', 'E8', 'E9', 'E2']
+
+
+def make_payload(batch_size: int, seed: int = 1) -> dict:
+    """Build one realistic RSU batch (several EVs sampled over a few ticks)"""
+    rng = random.Random(seed)
+    now = datetime.utcnow().isoformat(timespec="seconds") + "Z"
+    records = []
+    for i in range(batch_size):
+        edge = rng.choice(EDGES)
+        capacity = rng.choice([2000.0, 3000.0, 35000.0])
+        charge = capacity * rng.uniform(0.6, 1.0)
+        records.append({
+            'vehicle_id': f"R{rng.randint(1, 7)}_{rng.choice(VEHICLE_TYPES)}",
+            'vehicle_type': 'EV',
+            'speed': round(rng.uniform(0, 13.9), 2),
+            'edge_id': edge,
+            'lane_id': f"{edge}_{rng.randint(0, 1)}",
+            'lane_position': round(rng.uniform(0, 1800), 2),
+            'vehicles_ahead_count': rng.randint(0, 20),
+            'same_direction_ahead': rng.randint(0, 10),
+            'distance_to_traffic_light': round(rng.uniform(0, 1800), 1),
+            'next_traffic_light': rng.choice(['J1', 'J2', 'J4', 'J7']),
+            'traffic_light_state': rng.choice(['GGrrGG', 'rrGGrr', 'yyrryy']),
+            'time_to_red_light': round(rng.uniform(0, 60), 1),
+            'edge_occupancy_percentage': round(rng.uniform(0, 30), 2),
+            'battery_charge': charge,
+            'battery_capacity': capacity,
+            'battery_percentage': charge / capacity * 100.0,
+            'sim_time': float(5 * (i // 10)),
+            'position': (rng.uniform(-250, 250), rng.uniform(-250, 250)),
+            'rsu_id': 'RSU_Palbari',
+            'collection_timestamp': now,
+        })
+    return {
+        'rsu_id': 'RSU_Palbari',
+        'rsu_position': (-218.70, 214.90),
+        'vehicle_data': records,
+        'timestamp': now,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=50, help="Records per batch")
+    parser.add_argument("--repeat", type=int, default=200, help="Decode repetitions per format")
+    args = parser.parse_args()
+
+    payload = make_payload(args.batch_size)
+
+    print("=" * 72)
+    print(f"/ingest_rsu wire formats ({args.batch_size} records per batch)")
+    print("=" * 72)
+    print(f"{'format':10s} {'bytes/batch':>12s} {'bytes/record':>13s} {'encode ms':>10s} {'parse ms':>10s}")
+
+    baseline_bytes = None
+    for fmt in wire_format.available_formats():
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            body, headers = wire_format.encode_payload(payload, fmt)
+        encode_ms = (time.perf_counter() - start) * 1000.0 / args.repeat
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            data = wire_format.decode_payload(body, headers.get("Content-Type"), headers.get("Content-Encoding"))
+            RSUIngestPayload(**data)
+        parse_ms = (time.perf_counter() - start) * 1000.0 / args.repeat
+
+        baseline_bytes = baseline_bytes or len(body)
+        print(f"{fmt:10s} {len(body):12d} {len(body) / args.batch_size:13.1f} "
+              f"{encode_ms:10.3f} {parse_ms:10.3f}   ({len(body) / baseline_bytes:.0%} of JSON)")
+    print("=" * 72)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ This script checks all components and shows what needs to be done
 
 import os
 import sqlite3
+from telemetry_store import run_db_path
 
 def check_database():
     """Check if database exists and has data"""
@@ -19,14 +20,16 @@ def check_database():
     
     print("✅ Database file exists")
     
-    conn = sqlite3.connect('telemetry.db')
-    cur = conn.cursor()
-    
-    # Check each table
-    tables = ['rsu_vehicle_logs', 'rsu_status', 'vehicle_logs']
+    # RSU tables of the latest run (own database file) and the legacy table in telemetry.db
+    run_db = run_db_path('telemetry.db')
+    if run_db != 'telemetry.db':
+        print(f"   Latest run: {os.path.relpath(run_db)}")
+    tables = [(run_db, 'rsu_vehicle_logs'), (run_db, 'rsu_status'), ('telemetry.db', 'vehicle_logs')]
     has_data = False
     
-    for table in tables:
+    for db_path, table in tables:
+        conn = sqlite3.connect(db_path)
+        cur = conn.cursor()
         try:
             cur.execute(f'SELECT COUNT(*) FROM {table}')
             count = cur.fetchone()[0]
@@ -37,8 +40,8 @@ def check_database():
                 print(f"⚠️  {table}: 0 records (empty)")
         except sqlite3.Error as e:
             print(f"❌ {table}: Error - {e}")
+        conn.close()
     
-    conn.close()
     print()
     return has_data
 
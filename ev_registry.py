@@ -0,0 +1,128 @@
+"""
+EV Registry Module
+Classifies vehicles as EV / non-EV once, when they depart, using the vType
+definitions from the SUMO route file
+"""
+
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional, Set
+from sim_backend import traci
+
+
+class EVRegistry:
+    """Event-driven registry of the EVs currently in the simulation"""
+
+    def __init__(self, route_file: str = "CustomRoadNetwork.rou.xml"):
+        """
+        Initialize EV Registry
+
+        Args:
+            route_file: SUMO route file containing the vType and vehicle definitions
+        """
+        self.route_file = route_file
+        self.ev_types: Set[str] = set()  # vType IDs with a battery device
+        self.type_battery_capacity: Dict[str, float] = {}  # vType ID -> battery capacity (Wh)
+        self.vehicle_types: Dict[str, str] = {}  # vehicle ID -> vType ID from the route file
+        self.active_evs: Set[str] = set()  # EVs currently in the simulation
+        self.active_vehicle_types: Dict[str, str] = {}  # active EV ID -> vType ID
+        self.load_route_file()
+
+    def load_route_file(self):
+        """Parse vType and vehicle definitions from the route file"""
+        try:
+            for _, element in ET.iterparse(self.route_file, events=("end",)):
+                if element.tag == "vType":
+                    params = {
+                        p.get("key"): p.get("value")
+                        for p in element.findall("param")
+                    }
+                    type_id = element.get("id")
+                    if params.get("has.battery.device", "").lower() == "true":
+                        self.ev_types.add(type_id)
+                        try:
+                            self.type_battery_capacity[type_id] = float(params["device.battery.capacity"])
+                        except (KeyError, ValueError):
+                            pass
+                    element.clear()
+                elif element.tag in ("vehicle", "trip", "flow"):
+                    self.vehicle_types[element.get("id")] = element.get("type", "DEFAULT_VEHTYPE")
+                    element.clear()
+        except (OSError, ET.ParseError) as e:
+            print(f"[EV Registry] Warning: could not parse {self.route_file}: {e}")
+
+        print(f"[EV Registry] Loaded {len(self.ev_types)} EV types from {self.route_file}: {sorted(self.ev_types)}")
+
+    def resolve_type(self, vehicle_id: str) -> str:
+        """
+        Resolve the vType of a vehicle, asking TraCI only for vehicles
+        that are not defined in the route file (e.g. flows or added at runtime)
+
+        Args:
+            vehicle_id: ID of the vehicle
+
+        Returns:
+            vType ID of the vehicle
+        """
+        type_id = self.vehicle_types.get(vehicle_id)
+        if type_id is None:
+            type_id = traci.vehicle.getTypeID(vehicle_id)
+        return type_id
+
+    def classify(self, vehicle_id: str) -> bool:
+        """
+        Classify a vehicle as EV or non-EV
+
+        Args:
+            vehicle_id: ID of the vehicle
+
+        Returns:
+            True if the vehicle has a battery device, False otherwise
+        """
+        try:
+            type_id = self.resolve_type(vehicle_id)
+        except Exception:
+            return False
+
+        if type_id in self.ev_types:
+            self.active_vehicle_types[vehicle_id] = type_id
+            return True
+        return False
+
+    def update(self, departed_ids, arrived_ids) -> List[str]:
+        """
+        Update the registry with this step's departures and arrivals
+
+        Args:
+            departed_ids: Vehicle IDs from traci.simulation.getDepartedIDList()
+            arrived_ids: Vehicle IDs from traci.simulation.getArrivedIDList()
+
+        Returns:
+            List of newly departed EV IDs
+        """
+        new_evs = [vid for vid in departed_ids if self.classify(vid)]
+        self.active_evs.update(new_evs)
+
+        for vid in arrived_ids:
+            self.active_evs.discard(vid)
+            self.active_vehicle_types.pop(vid, None)
+
+        return new_evs
+
+    def battery_capacity(self, vehicle_id: str) -> Optional[float]:
+        """
+        Get the battery capacity of an active EV from its vType definition
+
+        Args:
+            vehicle_id: ID of the EV
+
+        Returns:
+            Battery capacity in Wh, or None if unknown
+        """
+        type_id = self.active_vehicle_types.get(vehicle_id)
+        return self.type_battery_capacity.get(type_id)
+
+    def __contains__(self, vehicle_id: str) -> bool:
+        return vehicle_id in self.active_evs
+
+    def __len__(self) -> int:
+        return len(self.active_evs)
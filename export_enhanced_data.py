@@ -5,9 +5,10 @@ Saves the buffered traffic data to JSON format with all enhanced fields
 
 import json
 import time
-import traci
+from sim_backend import traci, start_sumo
 from datetime import datetime
 from traCI_rsu import setup_rsu_network
+from telemetry_record import as_dict
 
 def export_buffered_rsu_data():
     """
@@ -29,14 +30,14 @@ def export_buffered_rsu_data():
             'rsu_id': rsu.rsu_id,
             'rsu_position': rsu.position,
             'connected_vehicles': len(rsu.connected_vehicles),
-            'buffered_records': len(rsu.vehicle_buffer),
-            'vehicle_data': rsu.vehicle_buffer
+            'buffered_records': rsu.buffered_count(),
+            'vehicle_data': [as_dict(record) for record in rsu.buffered_records()]
         }
         
         all_data.append(rsu_data)
-        total_records += len(rsu.vehicle_buffer)
+        total_records += rsu.buffered_count()
         
-        print(f"RSU {rsu.rsu_id}: {len(rsu.vehicle_buffer)} records")
+        print(f"RSU {rsu.rsu_id}: {rsu.buffered_count()} records")
     
     # Save to JSON file
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -1,19 +1,29 @@
 """
 Extract data from RSU-based telemetry database
 Exports data to Excel files for analysis
+
+Usage:
+    python extract_data.py                      Excel + CSV via pandas (small runs)
+    python extract_data.py --stream             CSV files streamed in bounded memory
+    python extract_data.py --stream --format parquet --run-id <run_id>
 """
 
+import argparse
+import os
 import sqlite3
 import pandas as pd
 from datetime import datetime
+import telemetry_export
+from telemetry_store import run_db_path
 
-DB_PATH = "telemetry.db"
+MAIN_DB_PATH = "telemetry.db"  # Run catalogue and legacy vehicle_logs
+DB_PATH = run_db_path(MAIN_DB_PATH)  # Database file of the latest run
 
-def extract_all_data():
+def extract_all_data(db_path: str = DB_PATH):
     """Extract all data from the database"""
     try:
         # Connect to database
-        conn = sqlite3.connect(DB_PATH)
+        conn = sqlite3.connect(db_path)
         
         print("="*60)
         print("EXTRACTING DATA FROM RSU TELEMETRY DATABASE")
@@ -36,10 +46,12 @@ def extract_all_data():
         
         # Extract legacy vehicle logs (if any)
         print("Extracting legacy vehicle logs...")
+        legacy_conn = sqlite3.connect(MAIN_DB_PATH)
         df_legacy_logs = pd.read_sql_query("""
             SELECT * FROM vehicle_logs
             ORDER BY sim_time
-        """, conn)
+        """, legacy_conn)
+        legacy_conn.close()
         
         # Save to Excel with multiple sheets
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -119,5 +131,66 @@ def extract_all_data():
     except Exception as e:
         print(f"❌ Error: {e}")
 
+def stream_export(db_path: str = DB_PATH, fmt: str = telemetry_export.CSV, out_dir: str = "."):
+    """
+    Export every table to its own file without loading it into memory
+    
+    Rows are streamed from SQLite in chunks (see telemetry_export), so this
+    works for runs with millions of records where extract_all_data() runs out
+    of memory.
+    
+    Args:
+        db_path: Database file of the run to export
+        fmt: 'csv' or 'parquet' (parquet needs pyarrow)
+        out_dir: Directory of the exported files
+    """
+    try:
+        telemetry_export.check_format(fmt)
+    except telemetry_export.ExportFormatUnavailableError as e:
+        print(f"❌ {e}")
+        return
+    
+    print("="*60)
+    print(f"STREAMING EXPORT OF {db_path} ({fmt.upper()})")
+    print("="*60)
+    
+    os.makedirs(out_dir, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    created = []
+    for table in telemetry_export.EXPORT_TABLES:
+        source = MAIN_DB_PATH if table == 'vehicle_logs' else db_path
+        out_path = os.path.join(out_dir, f"{table}_{timestamp}.{fmt}")
+        try:
+            rows, size = telemetry_export.export_table(source, table, fmt, out_path)
+        except sqlite3.Error as e:
+            print(f"❌ {table}: {e}")
+            continue
+        if rows == 0:
+            os.remove(out_path)
+            print(f"⚠️  {table}: 0 records (skipped)")
+            continue
+        created.append(out_path)
+        print(f"✅ {table}: {rows} records -> {out_path} ({size / 2**20:.1f} MiB)")
+    
+    print("="*60)
+    print("FILES CREATED:")
+    for path in created:
+        print(f"  • {path}")
+    print("="*60)
+    print("\n✅ Data extraction complete!")
+
 if __name__ == "__main__":
-    extract_all_data()
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stream", action="store_true",
+                        help="Stream tables to files in bounded memory instead of loading them into pandas")
+    parser.add_argument("--format", choices=list(telemetry_export.MEDIA_TYPES), default=telemetry_export.CSV,
+                        help="File format of --stream")
+    parser.add_argument("--run-id", help="Run to export (default: the latest run)")
+    parser.add_argument("--out-dir", default=".", help="Directory of the --stream files")
+    args = parser.parse_args()
+    
+    db_path = run_db_path(MAIN_DB_PATH, args.run_id) if args.run_id else DB_PATH
+    if args.stream:
+        stream_export(db_path, args.format, args.out_dir)
+    else:
+        extract_all_data(db_path)
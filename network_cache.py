@@ -0,0 +1,220 @@
+"""
+Static Network Cache Module
+Parses the SUMO network file once into a compact artifact (lane lengths,
+TLS-controlled edges, junction positions) that is cached on disk
+"""
+
+import hashlib
+import os
+import pickle
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Optional, Sequence, Tuple
+
+CACHE_FORMAT_VERSION = 1
+
+
+class NetworkArtifact:
+    """In-memory lookup tables derived from a SUMO .net.xml file"""
+
+    def __init__(self, net_hash: str):
+        """
+        Initialize an empty artifact
+
+        Args:
+            net_hash: SHA-256 of the network file the artifact was built from
+        """
+        self.version = CACHE_FORMAT_VERSION
+        self.net_hash = net_hash
+        self.lane_lengths: Dict[str, float] = {}  # lane ID -> length (incl. internal lanes)
+        self.edge_lengths: Dict[str, float] = {}  # edge ID -> length of lane 0
+        self.edge_tls: Dict[str, str] = {}  # edge ID -> TLS controlling the end of the edge
+        self.tls_junctions: Dict[str, str] = {}  # TLS ID -> junction ID
+        self.junction_positions: Dict[str, Tuple[float, float]] = {}  # junction ID -> (x, y)
+
+    def lane_length(self, lane_id: str) -> Optional[float]:
+        """Length of a lane in meters, or None if the lane is unknown"""
+        return self.lane_lengths.get(lane_id)
+
+    def edge_length(self, edge_id: str) -> Optional[float]:
+        """Length of an edge (lane 0) in meters, or None if the edge is unknown"""
+        return self.edge_lengths.get(edge_id)
+
+    def tls_for_edge(self, edge_id: str) -> Optional[str]:
+        """TLS ID at the end of an edge, or None if the edge is not signalised"""
+        return self.edge_tls.get(edge_id)
+
+
+class RouteInfo:
+    """Prefix sums and upcoming-TLS indices of one route"""
+
+    __slots__ = ("prefix_lengths", "next_tls_index", "tls_ids")
+
+    def __init__(self, prefix_lengths: List[float], next_tls_index: List[int], tls_ids: List[Optional[str]]):
+        self.prefix_lengths = prefix_lengths  # prefix_lengths[i] = length of edges[0:i]
+        self.next_tls_index = next_tls_index  # first index >= i whose edge ends at a TLS, or -1
+        self.tls_ids = tls_ids  # TLS ID at the end of each edge, or None
+
+
+class RouteCache:
+    """Lazily built RouteInfo per distinct route, keyed by its edge tuple"""
+
+    def __init__(self, artifact: NetworkArtifact):
+        """
+        Initialize Route Cache
+
+        Args:
+            artifact: Network artifact providing edge lengths and TLS edges
+        """
+        self.artifact = artifact
+        self._routes: Dict[Tuple[str, ...], RouteInfo] = {}
+
+    def get(self, route_edges: Sequence[str]) -> RouteInfo:
+        """
+        Get (building on first use) the RouteInfo of a route
+
+        Args:
+            route_edges: Edge IDs of the route
+
+        Returns:
+            RouteInfo of the route
+        """
+        key = tuple(route_edges)
+        info = self._routes.get(key)
+        if info is None:
+            prefix_lengths = [0.0]
+            tls_ids = []
+            for edge_id in key:
+                prefix_lengths.append(prefix_lengths[-1] + (self.artifact.edge_length(edge_id) or 0.0))
+                tls_ids.append(self.artifact.tls_for_edge(edge_id))
+
+            next_tls_index = [-1] * len(key)
+            upcoming = -1
+            for i in range(len(key) - 1, -1, -1):
+                if tls_ids[i] is not None:
+                    upcoming = i
+                next_tls_index[i] = upcoming
+
+            info = RouteInfo(prefix_lengths, next_tls_index, tls_ids)
+            self._routes[key] = info
+        return info
+
+    def next_tls(self, route_edges: Sequence[str], route_index: int, remaining_on_lane: float) -> Tuple[Optional[str], float]:
+        """
+        Find the next TLS on a route and the driving distance to it
+
+        Args:
+            route_edges: Edge IDs of the route
+            route_index: Index of the vehicle's current edge in the route
+            remaining_on_lane: Distance left on the vehicle's current lane
+
+        Returns:
+            (TLS ID, distance in meters), or (None, -1) if no TLS is ahead
+        """
+        info = self.get(route_edges)
+        if not 0 <= route_index < len(info.next_tls_index):
+            return None, -1
+        tls_index = info.next_tls_index[route_index]
+        if tls_index < 0:
+            return None, -1
+        # Rest of the current lane plus every following edge up to and including the TLS edge
+        distance = remaining_on_lane + info.prefix_lengths[tls_index + 1] - info.prefix_lengths[route_index + 1]
+        return info.tls_ids[tls_index], distance
+
+
+def file_hash(path: str) -> str:
+    """
+    Compute the SHA-256 of a file
+
+    Args:
+        path: Path of the file
+
+    Returns:
+        Hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_network_artifact(net_file: str, net_hash: str) -> NetworkArtifact:
+    """
+    Parse a SUMO network file into a NetworkArtifact
+
+    Args:
+        net_file: Path of the .net.xml file
+        net_hash: SHA-256 of the network file
+
+    Returns:
+        The parsed artifact
+    """
+    artifact = NetworkArtifact(net_hash)
+
+    for _, element in ET.iterparse(net_file, events=("end",)):
+        if element.tag == "edge":
+            edge_id = element.get("id")
+            for lane in element.findall("lane"):
+                length = float(lane.get("length"))
+                artifact.lane_lengths[lane.get("id")] = length
+                if lane.get("index") == "0":
+                    artifact.edge_lengths[edge_id] = length
+            element.clear()
+        elif element.tag == "junction":
+            artifact.junction_positions[element.get("id")] = (
+                float(element.get("x")),
+                float(element.get("y")),
+            )
+            element.clear()
+        elif element.tag == "connection":
+            tls_id = element.get("tl")
+            if tls_id is not None:
+                artifact.edge_tls[element.get("from")] = tls_id
+                via = element.get("via")
+                if via and tls_id not in artifact.tls_junctions:
+                    # Internal lanes are named ":<junction>_<link>_<lane>"
+                    artifact.tls_junctions[tls_id] = via[1:].rsplit("_", 2)[0]
+            element.clear()
+
+    return artifact
+
+
+def load_network_artifact(net_file: str = "CustomRoadNetwork.net.xml", cache_file: Optional[str] = None) -> NetworkArtifact:
+    """
+    Load the network artifact from the on-disk cache, rebuilding it when the
+    network file has changed
+
+    Args:
+        net_file: Path of the .net.xml file
+        cache_file: Path of the pickle cache (default: <net_file>.cache.pkl)
+
+    Returns:
+        The network artifact
+    """
+    if cache_file is None:
+        cache_file = f"{os.path.splitext(net_file)[0]}.cache.pkl"
+
+    net_hash = file_hash(net_file)
+
+    try:
+        with open(cache_file, "rb") as f:
+            artifact = pickle.load(f)
+        if (isinstance(artifact, NetworkArtifact)
+                and artifact.version == CACHE_FORMAT_VERSION
+                and artifact.net_hash == net_hash):
+            return artifact
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+        pass
+
+    artifact = build_network_artifact(net_file, net_hash)
+    try:
+        tmp_file = f"{cache_file}.tmp"
+        with open(tmp_file, "wb") as f:
+            pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+    except OSError as e:
+        print(f"[Network Cache] Warning: could not write {cache_file}: {e}")
+
+    print(f"[Network Cache] Built artifact from {net_file}: "
+          f"{len(artifact.lane_lengths)} lanes, {len(artifact.edge_tls)} TLS-controlled edges")
+    return artifact
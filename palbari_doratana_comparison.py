@@ -3,7 +3,7 @@ Palbari to Doratana Route Comparison Analysis
 Tests 5 different routes for charge optimization
 """
 
-import traci
+from sim_backend import traci, start_sumo
 import json
 from datetime import datetime
 
@@ -33,8 +33,7 @@ def main():
     
     # Start SUMO
     print("Starting SUMO simulation...")
-    sumo_cmd = ["sumo-gui", "-c", "CustomRoadNetwork.sumocfg", "--start", "--quit-on-end"]
-    traci.start(sumo_cmd)
+    start_sumo("CustomRoadNetwork.sumocfg", gui=True, extra_args=["--start", "--quit-on-end"])
     print("✓ SUMO started\n")
     
     vehicle_data = {}
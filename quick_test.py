@@ -16,9 +16,9 @@ def is_electric_vehicle(vehicle_id):
     except:
         return False
 
-def setup_rsu_network():
+def setup_rsu_network(run_id=None):
     """Setup minimal RSU network"""
-    rsu_network = RSUNetwork(SERVER_URL)
+    rsu_network = RSUNetwork(SERVER_URL, run_id=run_id)
     
     # Only 3 RSUs for faster testing
     rsu_positions = {
@@ -72,16 +72,17 @@ def main():
     print("QUICK TEST - Non-GUI mode")
     print("="*60)
     
-    # Setup
-    rsu_network = setup_rsu_network()
-    print(f"✓ RSU Network ready with {len(rsu_network.rsus)} RSUs")
-    
-    # Clear old data
+    # Start a new run (earlier runs are kept); the RSUs send their batches to it
+    run_id = None
     try:
-        requests.delete(f"{SERVER_URL}/clear_data")
-        print("✓ Cleared old data from server")
+        run_id = requests.delete(f"{SERVER_URL}/clear_data").json()["run_id"]
+        print(f"✓ Started run {run_id} on the server")
     except:
-        print("⚠ Could not clear old data (server may not be running)")
+        print("⚠ Could not start a run (server may not be running)")
+    
+    # Setup
+    rsu_network = setup_rsu_network(run_id)
+    print(f"✓ RSU Network ready with {len(rsu_network.rsus)} RSUs")
     
     # Start SUMO in non-GUI mode
     print("\n Starting SUMO...")
@@ -127,7 +128,7 @@ def main():
     
     # Check server
     try:
-        response = requests.get(f"{SERVER_URL}/rsu_stats")
+        response = requests.get(f"{SERVER_URL}/rsu_stats", params={"run_id": run_id})
         if response.status_code == 200:
             stats = response.json()
             print(f"\nServer received data from {len(stats.get('rsu_stats', []))} RSUs")
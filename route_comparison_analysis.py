@@ -3,7 +3,7 @@ Route Comparison Analysis for EV Charge Optimization
 Tracks test vehicles across different routes to determine the most charge-efficient path
 """
 
-import traci
+from sim_backend import traci, start_sumo
 import time
 import json
 from datetime import datetime
@@ -62,14 +62,8 @@ class RouteComparison:
     def connect_sumo(self):
         """Connect to SUMO simulation"""
         print("Connecting to SUMO...")
-        sumo_binary = "sumo-gui"  # Use "sumo" for non-GUI mode
-        sumo_cmd = [
-            sumo_binary,
-            "-c", "CustomRoadNetwork.sumocfg",
-            "--start",
-            "--quit-on-end"
-        ]
-        traci.start(sumo_cmd)
+        # sumo-gui with the traci backend; headless with libsumo or SUMO_GUI=0
+        start_sumo("CustomRoadNetwork.sumocfg", gui=True, extra_args=["--start", "--quit-on-end"])
         print("✓ Connected to SUMO\n")
     
     def track_vehicle(self, vid):
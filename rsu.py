@@ -3,16 +3,553 @@ RSU (Roadside Unit) Module
 Handles communication between vehicles and the server
 """
 
+import json
 import math
-from typing import List, Dict, Set
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Iterator, List, Dict, Set, Optional, Sequence, Tuple
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime
+import wire_format
+from telemetry_record import VehicleRecord, as_dict, collection_timestamp
+
+# Overflow policies of RSUBuffer
+DROP_OLDEST = "drop_oldest"
+DROP_NEWEST = "drop_newest"
+SPILL = "spill"
+OVERFLOW_POLICIES = (DROP_OLDEST, DROP_NEWEST, SPILL)
+
+# Retry backoff of failed RSU uploads (seconds, doubled per consecutive failure)
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 30.0
+
+# Seconds after which a batch the server accepted but has not acknowledged
+# (committed) yet is sent again; the server drops the copy if it has the batch
+UNACKED_RESEND_DELAY = 10.0
+
+
+def create_http_session(pool_connections: int = 1, pool_maxsize: int = 10) -> requests.Session:
+    """
+    Create an HTTP session with a keep-alive connection pool
+    
+    Args:
+        pool_connections: Number of host pools to cache (one per server)
+        pool_maxsize: Maximum kept-alive connections per host
+        
+    Returns:
+        Configured requests.Session
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class RSUSpool:
+    """
+    Append-only, segmented write-ahead spool of the records that overflowed
+    an RSUBuffer (e.g. during a server outage)
+    
+    Records are appended as JSON lines to numbered segment files, flushed to
+    the OS on every write (they survive a process crash) and fsynced at most
+    every fsync_interval seconds (bounding what a power loss can take), so a
+    long outage does not cost one fsync per spilled record. A persisted read
+    cursor marks how far the spool has been replayed; fully replayed
+    segments are deleted. On startup the spool recovers the cursor and the
+    unread records of a previous run.
+    """
+    
+    CURSOR_FILE = "cursor.json"
+    
+    def __init__(self, directory: str, segment_max_records: int = 10000, fsync: bool = True,
+                 fsync_interval: float = 1.0):
+        """
+        Initialize RSU Spool
+        
+        Args:
+            directory: Spool directory of one RSU
+            segment_max_records: Records per segment file before rolling to a new one
+            fsync: fsync written records (power-loss safe) instead of relying on the OS cache
+            fsync_interval: Minimum seconds between fsyncs of the written records
+                            (0 = fsync every write)
+        """
+        self.directory = directory
+        self.segment_max_records = segment_max_records
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self._synced_at = 0.0  # time.monotonic() of the last fsync
+        self._unsynced = False  # Records written since the last fsync
+        self.read_segment = 0  # Segment number of the read cursor
+        self.read_offset = 0  # Byte offset of the read cursor within read_segment
+        self.write_segment = 0  # Segment number currently appended to
+        self.write_segment_records = 0  # Records in the current write segment
+        self.count = 0  # Records written but not yet replayed
+        self._write_file = None
+        os.makedirs(directory, exist_ok=True)
+        self._recover()
+    
+    def _segment_path(self, number: int) -> str:
+        return os.path.join(self.directory, f"{number:08d}.seg")
+    
+    def _segments(self) -> List[int]:
+        """Sorted segment numbers present on disk"""
+        return sorted(
+            int(name[:-4]) for name in os.listdir(self.directory)
+            if name.endswith(".seg") and name[:-4].isdigit()
+        )
+    
+    def _recover(self):
+        """Restore the read cursor and count the unread records left on disk"""
+        try:
+            with open(os.path.join(self.directory, self.CURSOR_FILE), "r", encoding="utf-8") as f:
+                cursor = json.load(f)
+            self.read_segment, self.read_offset = cursor["segment"], cursor["offset"]
+        except (OSError, ValueError, KeyError):
+            self.read_segment, self.read_offset = 0, 0
+        
+        segments = self._segments()
+        for number in segments:
+            if number < self.read_segment:
+                os.remove(self._segment_path(number))
+        segments = [n for n in segments if n >= self.read_segment]
+        
+        if not segments:
+            self.read_segment = self.write_segment = max(self.read_segment, 1)
+            self.read_offset = 0
+            return
+        
+        # Drop a torn trailing line left by a crash in the middle of a write
+        last_path = self._segment_path(segments[-1])
+        with open(last_path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+        
+        if self.read_segment < segments[0]:
+            self.read_segment, self.read_offset = segments[0], 0
+        for number in segments:
+            with open(self._segment_path(number), "rb") as f:
+                if number == self.read_segment:
+                    f.seek(self.read_offset)
+                lines = sum(1 for _ in f)
+            self.count += lines
+        
+        self.write_segment = segments[-1]
+        with open(last_path, "rb") as f:
+            self.write_segment_records = sum(1 for _ in f)
+        if self.count:
+            print(f"[RSU Spool] Recovered {self.count} unsent records from {self.directory}")
+    
+    def _save_cursor(self):
+        """Atomically persist the read cursor"""
+        path = os.path.join(self.directory, self.CURSOR_FILE)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"segment": self.read_segment, "offset": self.read_offset}, f)
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    
+    def write(self, record: Dict):
+        """Append one record to the spool (fsynced once fsync_interval has elapsed)"""
+        if self.write_segment_records >= self.segment_max_records:
+            self._close_write_file()
+            self.write_segment += 1
+            self.write_segment_records = 0
+        if self._write_file is None:
+            self._write_file = open(self._segment_path(self.write_segment), "a", encoding="utf-8")
+        self._write_file.write(json.dumps(as_dict(record), default=str) + "\n")
+        self._write_file.flush()
+        self._unsynced = True
+        self.write_segment_records += 1
+        self.count += 1
+        if time.monotonic() - self._synced_at >= self.fsync_interval:
+            self.sync()
+    
+    def sync(self):
+        """fsync the records written since the last fsync"""
+        if self.fsync and self._unsynced and self._write_file is not None:
+            os.fsync(self._write_file.fileno())
+        self._unsynced = False
+        self._synced_at = time.monotonic()
+    
+    def read(self, max_records: int) -> List[Dict]:
+        """
+        Replay (and consume) the oldest spooled records in order
+        
+        Args:
+            max_records: Maximum number of records to read
+            
+        Returns:
+            List of records
+        """
+        records = []
+        while self.count > 0 and len(records) < max_records:
+            path = self._segment_path(self.read_segment)
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8") as f:
+                    f.seek(self.read_offset)
+                    while len(records) < max_records:
+                        line = f.readline()
+                        if not line:
+                            break
+                        records.append(json.loads(line))
+                    self.read_offset = f.tell()
+            if len(records) < max_records and self.read_segment < self.write_segment:
+                # Segment fully replayed; move on and delete it
+                if os.path.exists(path):
+                    os.remove(path)
+                self.read_segment += 1
+                self.read_offset = 0
+            else:
+                break
+        
+        self.count -= len(records)
+        if records:
+            self._save_cursor()
+        return records
+    
+    def __iter__(self) -> Iterator[Dict]:
+        """Iterate over the unread records without consuming them"""
+        for number in range(self.read_segment, self.write_segment + 1):
+            path = self._segment_path(number)
+            if not os.path.exists(path):
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                if number == self.read_segment:
+                    f.seek(self.read_offset)
+                for line in f:
+                    yield json.loads(line)
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def _close_write_file(self):
+        if self._write_file is not None:
+            self.sync()
+            self._write_file.close()
+            self._write_file = None
+    
+    def close(self):
+        """Close the open segment file"""
+        self._close_write_file()
+
+
+class RSUBuffer:
+    """
+    Bounded FIFO buffer of vehicle records with O(1) append and batch pop
+    
+    When the buffer is full, the overflow policy decides what happens to a new
+    record: drop the oldest buffered record, drop the new record, or spill it
+    to an on-disk RSUSpool (replayed in order as memory frees up).
+    """
+    
+    def __init__(self, capacity: Optional[int] = None, overflow_policy: str = DROP_OLDEST, spool_dir: Optional[str] = None,
+                 spool_fsync_interval: float = 1.0):
+        """
+        Initialize RSU Buffer
+        
+        Args:
+            capacity: Maximum number of records kept in memory (None = unbounded)
+            overflow_policy: One of 'drop_oldest', 'drop_newest' or 'spill'
+            spool_dir: Spool directory (required for the 'spill' policy)
+            spool_fsync_interval: Minimum seconds between fsyncs of the spool (0 = every record)
+        """
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy '{overflow_policy}', expected one of {OVERFLOW_POLICIES}")
+        if overflow_policy == SPILL and not spool_dir:
+            raise ValueError("The 'spill' overflow policy requires a spool_dir")
+        
+        self.capacity = capacity
+        self.overflow_policy = overflow_policy
+        self.records: deque = deque()
+        self.spill = RSUSpool(spool_dir, fsync_interval=spool_fsync_interval) if overflow_policy == SPILL else None
+        # Records left in the spool by a previous run are replayed first
+        self._refill()
+        self.dropped = 0  # Records discarded by the overflow policy
+    
+    def is_full(self) -> bool:
+        """True if the in-memory part has reached its capacity"""
+        return self.capacity is not None and len(self.records) >= self.capacity
+    
+    def append(self, record: Dict) -> bool:
+        """
+        Add a record at the end of the buffer
+        
+        Args:
+            record: Vehicle record
+            
+        Returns:
+            False if the record was dropped by the overflow policy, True otherwise
+        """
+        if self.spill is not None and len(self.spill) > 0:
+            # Older records are on disk; keep FIFO order by spilling behind them
+            self.spill.write(record)
+            return True
+        
+        if self.is_full():
+            if self.overflow_policy == DROP_NEWEST:
+                self.dropped += 1
+                return False
+            if self.overflow_policy == SPILL:
+                self.spill.write(record)
+                return True
+            self.records.popleft()
+            self.dropped += 1
+        
+        self.records.append(record)
+        return True
+    
+    def peek_batch(self, batch_size: int) -> List[Dict]:
+        """
+        Get the oldest in-memory records without removing them
+        
+        Args:
+            batch_size: Maximum number of records
+            
+        Returns:
+            List of records
+        """
+        count = min(batch_size, len(self.records))
+        return [self.records[i] for i in range(count)]
+    
+    def pop_batch(self, batch_size: int) -> List[Dict]:
+        """
+        Remove and return the oldest records
+        
+        Args:
+            batch_size: Maximum number of records
+            
+        Returns:
+            List of records
+        """
+        count = min(batch_size, len(self.records))
+        batch = [self.records.popleft() for _ in range(count)]
+        self._refill()
+        return batch
+    
+    def push_front(self, batch: List[Dict]):
+        """
+        Put records back at the front of the buffer (e.g. after a failed send)
+        
+        Requeued records are never dropped, so the buffer may briefly exceed
+        its capacity by one batch.
+        
+        Args:
+            batch: Records previously returned by pop_batch()
+        """
+        self.records.extendleft(reversed(batch))
+    
+    def _refill(self):
+        """Move spilled records back into memory while there is room"""
+        if self.spill is None or len(self.spill) == 0:
+            return
+        room = len(self.spill) if self.capacity is None else self.capacity - len(self.records)
+        if room > 0:
+            self.records.extend(self.spill.read(room))
+    
+    def __len__(self) -> int:
+        return len(self.records) + (len(self.spill) if self.spill is not None else 0)
+    
+    def __bool__(self) -> bool:
+        return len(self) > 0
+    
+    def __iter__(self) -> Iterator[Dict]:
+        yield from self.records
+        if self.spill is not None:
+            yield from self.spill
+    
+    def close(self):
+        """Release the spool file handle"""
+        if self.spill is not None:
+            self.spill.close()
+
+
+class EdgeWindow:
+    """Running aggregates of the EV samples of one edge in one time window"""
+    
+    __slots__ = ('sample_count', 'vehicles', 'speed_sum', 'occupancy_sum', 'battery_sum', 'battery_min')
+    
+    def __init__(self):
+        self.sample_count = 0
+        self.vehicles: Set[str] = set()
+        self.speed_sum = 0.0
+        self.occupancy_sum = 0.0
+        self.battery_sum = 0.0
+        self.battery_min = math.inf
+
+
+class EdgeAggregator:
+    """
+    Rolling per-edge, per-window aggregates of the EV samples seen by one RSU
+    
+    Windows are aligned to multiples of the window length in simulation time.
+    A window is complete once a sample of a later window has been seen.
+    """
+    
+    def __init__(self, window: float):
+        """
+        Initialize Edge Aggregator
+        
+        Args:
+            window: Window length in simulation seconds
+        """
+        if window <= 0:
+            raise ValueError("The aggregation window must be positive")
+        self.window = window
+        self.windows: Dict[Tuple[str, float], EdgeWindow] = {}  # (edge ID, window start) -> aggregates
+        self.latest_time = -math.inf  # Latest sample time seen
+        self.pending: List[Dict] = []  # Flushed rows that could not be sent yet
+    
+    def add(self, record) -> bool:
+        """
+        Add one EV sample
+        
+        Args:
+            record: VehicleRecord or telemetry dictionary
+            
+        Returns:
+            False if the sample has no edge or sim time and was ignored
+        """
+        edge_id = record.get('edge_id')
+        sim_time = record.get('sim_time')
+        if not edge_id or sim_time is None:
+            return False
+        
+        start = math.floor(sim_time / self.window) * self.window
+        stats = self.windows.get((edge_id, start))
+        if stats is None:
+            stats = self.windows[(edge_id, start)] = EdgeWindow()
+        stats.sample_count += 1
+        stats.vehicles.add(record.get('vehicle_id'))
+        stats.speed_sum += record.get('speed') or 0.0
+        stats.occupancy_sum += record.get('edge_occupancy_percentage') or 0.0
+        battery = record.get('battery_percentage') or 0.0
+        stats.battery_sum += battery
+        stats.battery_min = min(stats.battery_min, battery)
+        self.latest_time = max(self.latest_time, sim_time)
+        return True
+    
+    def flush(self, final: bool = False) -> List[Dict]:
+        """
+        Remove and return the summary rows of the completed windows
+        
+        Args:
+            final: Also flush the windows that are still open (end of run)
+            
+        Returns:
+            Summary rows, oldest window first
+        """
+        rows = []
+        for key in sorted(self.windows):
+            edge_id, start = key
+            if not final and start + self.window > self.latest_time:
+                continue
+            stats = self.windows.pop(key)
+            count = stats.sample_count
+            rows.append({
+                'edge_id': edge_id,
+                'window_start': start,
+                'window_end': start + self.window,
+                'sample_count': count,
+                'vehicle_count': len(stats.vehicles),
+                'mean_speed': stats.speed_sum / count,
+                'mean_occupancy': stats.occupancy_sum / count,
+                'mean_battery_percentage': stats.battery_sum / count,
+                'min_battery_percentage': stats.battery_min,
+            })
+        return rows
+
+
+class AdaptiveFlushPolicy:
+    """
+    Adaptive batch size and flush trigger of one RSU uplink
+    
+    The batch size follows AIMD: it grows additively while the server answers
+    within the target latency and is halved when a batch is slow or the server
+    signals overload (HTTP 429/503). A flush is due once the backlog fills a
+    batch or the oldest buffered record is older than max_age sim seconds, and
+    a deep backlog is drained with several batches per flush.
+    """
+    
+    def __init__(self, initial_batch_size: int = 50, min_batch_size: int = 10, max_batch_size: int = 500,
+                 target_latency: float = 0.25, increase_step: int = 10, max_age: float = 10.0,
+                 max_batches_per_flush: int = 4):
+        """
+        Initialize Adaptive Flush Policy
+        
+        Args:
+            initial_batch_size: Starting batch size
+            min_batch_size: Lower bound of the batch size
+            max_batch_size: Upper bound of the batch size
+            target_latency: Round-trip time (seconds) above which the batch size shrinks
+            increase_step: Records added to the batch size after each fast batch
+            max_age: Sim seconds after which a partial batch is flushed anyway
+            max_batches_per_flush: Maximum batches sent per flush when backlogged
+        """
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.batch_size = max(min_batch_size, min(max_batch_size, initial_batch_size))
+        self.target_latency = target_latency
+        self.increase_step = increase_step
+        self.max_age = max_age
+        self.max_batches_per_flush = max_batches_per_flush
+        self.last_latency: Optional[float] = None
+    
+    def should_flush(self, backlog: int, oldest_age: Optional[float]) -> bool:
+        """
+        Decide whether the RSU should flush now
+        
+        Args:
+            backlog: Records waiting to be sent
+            oldest_age: Sim seconds since the oldest waiting record was collected
+                        (None = unknown, flush whatever is waiting)
+            
+        Returns:
+            True if a flush is due
+        """
+        if backlog <= 0:
+            return False
+        if backlog >= self.batch_size or oldest_age is None:
+            return True
+        return oldest_age >= self.max_age
+    
+    def batches_to_send(self, backlog: int) -> int:
+        """Number of batches to send in this flush for the given backlog"""
+        return max(1, min(self.max_batches_per_flush, math.ceil(backlog / self.batch_size)))
+    
+    def on_success(self, latency: float):
+        """Adapt the batch size to the round-trip time of an accepted batch"""
+        self.last_latency = latency
+        if latency > self.target_latency:
+            self.batch_size = max(self.min_batch_size, self.batch_size // 2)
+        else:
+            self.batch_size = min(self.max_batch_size, self.batch_size + self.increase_step)
+    
+    def on_overload(self):
+        """Shrink the batch size after the server signalled overload (429/503)"""
+        self.batch_size = max(self.min_batch_size, self.batch_size // 2)
 
 
 class RSU:
     """Represents a Roadside Unit in the V2I communication system"""
     
-    def __init__(self, rsu_id: str, position: tuple, coverage_radius: float, server_url: str):
+    def __init__(self, rsu_id: str, position: tuple, coverage_radius: float, server_url: str,
+                 buffer_capacity: Optional[int] = None, overflow_policy: str = DROP_OLDEST,
+                 spill_dir: Optional[str] = None, session: Optional[requests.Session] = None,
+                 payload_format: str = wire_format.JSON, delta_encoding: bool = False,
+                 aggregation_window: Optional[float] = None, raw_sample_rate: float = 1.0,
+                 run_id: Optional[str] = None, flush_policy: Optional[AdaptiveFlushPolicy] = None,
+                 spill_fsync_interval: float = 1.0):
         """
         Initialize RSU
         
@@ -21,13 +558,50 @@ class RSU:
             position: (x, y) coordinates of the RSU
             coverage_radius: Communication range in meters
             server_url: URL of the backend server
+            buffer_capacity: Maximum number of records buffered in memory (None = unbounded)
+            overflow_policy: 'drop_oldest', 'drop_newest' or 'spill' when the buffer is full
+            spill_dir: Spool root directory of the 'spill' policy (<spill_dir>/<run_id>/<rsu_id>)
+            session: Shared HTTP session (keep-alive connection pool) for uplinks
+            payload_format: Wire format of /ingest_rsu batches ('json', 'columnar' or 'msgpack')
+            delta_encoding: Send a keyframe per connected vehicle, then only the changed fields
+            aggregation_window: Window (sim seconds) of the per-edge rollups; None disables aggregation
+            raw_sample_rate: Fraction of raw records still sent when aggregation is enabled (0.0-1.0)
+            run_id: Simulation run the batch sequence numbers belong to (default: random)
+            flush_policy: Adaptive batch sizing / flush trigger (None = fixed batch size, flush every call)
+            spill_fsync_interval: Minimum seconds between fsyncs of the spool (0 = every spilled record)
         """
         self.rsu_id = rsu_id
         self.position = position  # (x, y)
         self.coverage_radius = coverage_radius
         self.server_url = server_url
-        self.vehicle_buffer = []  # Buffer for collected vehicle data
+        self.session = session if session is not None else create_http_session()
+        self.payload_format = payload_format
+        self.delta_encoding = delta_encoding
+        self.delta_base: Dict[str, Dict] = {}  # vehicle ID -> last row acknowledged by the server
+        # At-least-once delivery: every batch carries (rsu_id, run_id, seq) and keeps its
+        # seq across retries, so the server can drop the copies it already stored
+        self.run_id = run_id or uuid.uuid4().hex
+        spool_dir = None
+        if overflow_policy == SPILL:
+            # Spooled records are replayed under the run they were collected in, never a later one
+            spool_dir = os.path.join(spill_dir or "rsu_spool", self.run_id, rsu_id)
+        self.vehicle_buffer = RSUBuffer(buffer_capacity, overflow_policy, spool_dir,
+                                        spill_fsync_interval)  # Buffer for collected vehicle data
         self.connected_vehicles: Set[str] = set()  # Currently connected vehicles
+        self.buffer_lock = threading.Lock()  # Guards vehicle_buffer against the upload thread
+        self.in_flight = False  # True while a batch is queued or being uploaded in the background
+        self.next_seq = 1  # Sequence number of the next new batch
+        self.acked_seq = 0  # Every batch up to this sequence number is committed by the server
+        self.sent_seq = 0  # Highest sequence number the server accepted (delta base includes it)
+        self.retry_batches: deque = deque()  # (seq, batch) that failed, resent before new batches
+        self.unacked: deque = deque()  # (seq, batch, sent at) accepted but not yet acknowledged
+        self.failures = 0  # Consecutive failed uploads
+        self.retry_at = 0.0  # time.monotonic() before which no upload is attempted
+        self.server_retry_after = 0.0  # Retry-After (seconds) of the last 429/503 response
+        self.flush_policy = flush_policy
+        self.edge_stats = EdgeAggregator(aggregation_window) if aggregation_window else None
+        self.raw_sample_rate = raw_sample_rate if self.edge_stats is not None else 1.0
+        self._raw_credit = 0.0  # Accumulates raw_sample_rate; a raw record is kept per whole unit
         
     def is_vehicle_in_range(self, vehicle_position: tuple) -> bool:
         """
@@ -39,33 +613,36 @@ class RSU:
         Returns:
             True if vehicle is in range, False otherwise
         """
-        distance = math.sqrt(
-            (vehicle_position[0] - self.position[0]) ** 2 +
-            (vehicle_position[1] - self.position[1]) ** 2
-        )
-        return distance <= self.coverage_radius
+        dx = vehicle_position[0] - self.position[0]
+        dy = vehicle_position[1] - self.position[1]
+        return dx * dx + dy * dy <= self.coverage_radius * self.coverage_radius
     
-    def collect_vehicle_data(self, vehicle_id: str, vehicle_data: Dict, is_ev: bool = True):
+    def collect_vehicle_data(self, vehicle_id: str, vehicle_data, is_ev: bool = True):
         """
         Collect data from a vehicle within range
         
         Args:
             vehicle_id: ID of the vehicle
-            vehicle_data: Dictionary containing vehicle telemetry data
+            vehicle_data: VehicleRecord (filled in place) or a telemetry dictionary
             is_ev: Whether the vehicle is an EV (only EVs are tracked)
         """
         # Only collect data from EVs
         if not is_ev:
             return
         
-        # Add RSU metadata to the vehicle data
-        enriched_data = {
-            **vehicle_data,
-            'rsu_id': self.rsu_id,
-            'rsu_position': self.position,
-            'collection_timestamp': datetime.utcnow().isoformat(timespec="seconds") + "Z",
-            'vehicle_type': 'EV'
-        }
+        # Add RSU metadata to the vehicle data (the RSU position travels once, in the batch envelope)
+        if isinstance(vehicle_data, VehicleRecord):
+            vehicle_data.rsu_id = self.rsu_id
+            vehicle_data.collection_timestamp = collection_timestamp()
+            vehicle_data.vehicle_type = 'EV'
+            enriched_data = vehicle_data
+        else:
+            enriched_data = {
+                **vehicle_data,
+                'rsu_id': self.rsu_id,
+                'collection_timestamp': collection_timestamp(),
+                'vehicle_type': 'EV'
+            }
         
         # Log traffic density information
         if 'vehicles_ahead_count' in vehicle_data:
@@ -83,9 +660,198 @@ class RSU:
                     traffic_info += f", Next TLS: {vehicle_data['next_traffic_light']} ({vehicle_data.get('distance_to_traffic_light', 0.0)}m)"
             print(traffic_info)
         
-        self.vehicle_buffer.append(enriched_data)
         self.connected_vehicles.add(vehicle_id)
+        if self.edge_stats is not None:
+            with self.buffer_lock:
+                self.edge_stats.add(enriched_data)
+            # Evenly spaced sampling of the raw records
+            self._raw_credit += self.raw_sample_rate
+            if self._raw_credit < 1.0:
+                return
+            self._raw_credit -= 1.0
+        
+        with self.buffer_lock:
+            self.vehicle_buffer.append(enriched_data)
         
+    def _take_resend(self) -> Optional[Tuple[int, List]]:
+        """Oldest accepted batch left unacknowledged for UNACKED_RESEND_DELAY (call with buffer_lock held)"""
+        if self.unacked and time.monotonic() - self.unacked[0][2] >= UNACKED_RESEND_DELAY:
+            seq, batch, _ = self.unacked.popleft()
+            return seq, batch
+        return None
+    
+    def take_batch(self, batch_size: int = 50) -> Tuple[int, List]:
+        """
+        Take the next batch for sending: a failed batch first, then an accepted
+        batch the server has not acknowledged in time, else the oldest buffered records
+        
+        Args:
+            batch_size: Maximum number of records in a new batch
+            
+        Returns:
+            (sequence number, list of records); the list is empty if there is nothing to send
+        """
+        with self.buffer_lock:
+            if self.retry_batches:
+                return self.retry_batches.popleft()
+            resend = self._take_resend()
+            if resend is not None:
+                return resend
+            batch = self.vehicle_buffer.pop_batch(batch_size)
+            if not batch:
+                return 0, batch
+            seq = self.next_seq
+            self.next_seq += 1
+            return seq, batch
+    
+    def requeue_batch(self, seq: int, batch: List):
+        """
+        Keep a batch that could not be sent for a retry with the same sequence
+        number, and back off before the next upload attempt
+        
+        Args:
+            seq: Sequence number of the batch
+            batch: Records previously returned by take_batch()
+        """
+        with self.buffer_lock:
+            self.retry_batches.appendleft((seq, batch))
+            self.failures += 1
+            # Exponential backoff with jitter, so RSUs do not retry in lockstep,
+            # but never sooner than the server asked for
+            delay = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** (self.failures - 1))
+            delay = delay / 2 + random.uniform(0, delay / 2)
+            self.retry_at = time.monotonic() + max(delay, self.server_retry_after)
+            self.server_retry_after = 0.0
+    
+    def is_backing_off(self) -> bool:
+        """True while the retry backoff after a failed upload has not elapsed"""
+        return self.failures > 0 and time.monotonic() < self.retry_at
+    
+    def oldest_record_age(self, sim_time: Optional[float]) -> Optional[float]:
+        """
+        Sim seconds since the oldest unsent record was collected
+        
+        Args:
+            sim_time: Current simulation time (None = unknown)
+            
+        Returns:
+            Age in sim seconds, or None if unknown
+        """
+        if sim_time is None:
+            return None
+        with self.buffer_lock:
+            if self.retry_batches:
+                oldest = self.retry_batches[0][1][0]
+            else:
+                head = self.vehicle_buffer.peek_batch(1)
+                if not head:
+                    return None
+                oldest = head[0]
+        collected_at = oldest.get('sim_time')
+        return None if collected_at is None else sim_time - collected_at
+    
+    def take_flush(self, batch_size: int, sim_time: Optional[float] = None) -> List[Tuple[int, List]]:
+        """
+        Take the batches to send now
+        
+        Without a flush policy this is one batch of batch_size records. With
+        one, nothing is taken until a flush is due, and then up to
+        max_batches_per_flush batches of the adaptive batch size.
+        
+        Args:
+            batch_size: Batch size when no flush policy is set
+            sim_time: Current simulation time, for the age trigger
+            
+        Returns:
+            List of (sequence number, records)
+        """
+        policy = self.flush_policy
+        if policy is None:
+            seq, batch = self.take_batch(batch_size)
+            return [(seq, batch)] if batch else []
+        
+        backlog = self.buffered_count()
+        if not policy.should_flush(backlog, self.oldest_record_age(sim_time)):
+            with self.buffer_lock:
+                resend = self._take_resend()
+            return [resend] if resend is not None else []
+        batches = []
+        for _ in range(policy.batches_to_send(backlog)):
+            seq, batch = self.take_batch(policy.batch_size)
+            if not batch:
+                break
+            batches.append((seq, batch))
+        return batches
+    
+    def send_batches(self, batches: List[Tuple[int, List]]) -> int:
+        """
+        Send batches in order, stopping at the first failure
+        
+        The failed batch and the ones after it are kept for a retry with
+        their sequence numbers, and the RSU backs off.
+        
+        Args:
+            batches: (sequence number, records) returned by take_flush()
+            
+        Returns:
+            Number of batches sent
+        """
+        for index, (seq, batch) in enumerate(batches):
+            if not self.post_batch(batch, seq):
+                with self.buffer_lock:
+                    self.retry_batches.extendleft(reversed(batches[index + 1:]))
+                self.requeue_batch(seq, batch)
+                return index
+        return len(batches)
+    
+    def buffered_records(self) -> Iterator:
+        """Iterate over the records not yet acknowledged (unacknowledged and retry batches first, then the buffer)"""
+        for _, batch, _ in list(self.unacked):
+            yield from batch
+        for _, batch in list(self.retry_batches):
+            yield from batch
+        yield from self.vehicle_buffer
+    
+    def buffered_count(self) -> int:
+        """Number of records not yet acknowledged by the server"""
+        return (sum(len(batch) for _, batch, _ in list(self.unacked))
+                + sum(len(batch) for _, batch in list(self.retry_batches))
+                + len(self.vehicle_buffer))
+    
+    def _acknowledge(self, acked_seq: Optional[int]):
+        """Advance acked_seq and let go of the unacknowledged batches it covers"""
+        if acked_seq is None:
+            return
+        with self.buffer_lock:
+            self.acked_seq = max(self.acked_seq, acked_seq)
+            self.unacked = deque(entry for entry in self.unacked if entry[0] > self.acked_seq)
+    
+    def poll_acks(self) -> bool:
+        """
+        Ask the server how far this RSU's batches are committed
+        
+        Returns:
+            True if every accepted batch is acknowledged, False otherwise
+        """
+        if not self.unacked:
+            return True
+        try:
+            response = self.session.get(
+                f"{self.server_url}/ingest_status",
+                params={'run_id': self.run_id, 'rsu_id': self.rsu_id},
+                timeout=5
+            )
+            if response.status_code == 410:
+                # Run dropped on the server: there is nothing left to acknowledge
+                with self.buffer_lock:
+                    self.unacked.clear()
+                return True
+            response.raise_for_status()
+            self._acknowledge(response.json().get('acked_seq'))
+        except Exception as e:
+            print(f"[RSU-{self.rsu_id}] Failed to poll acknowledgements: {e}")
+        return not self.unacked
+    
     def send_data_to_server(self, batch_size: int = 50) -> bool:
         """
         Send buffered vehicle data to the server
@@ -96,36 +862,196 @@ class RSU:
         Returns:
             True if data was sent successfully, False otherwise
         """
-        if not self.vehicle_buffer:
+        if self.is_backing_off():
+            return False
+        
+        seq, batch = self.take_batch(batch_size)
+        if not batch:
             return True
         
-        # Prepare batch
-        batch = self.vehicle_buffer[:batch_size]
+        if self.post_batch(batch, seq):
+            return True
+        
+        self.requeue_batch(seq, batch)
+        return False
+    
+    def _post_payload(self, payload: Dict) -> requests.Response:
+        """POST an envelope in the configured wire format, falling back to JSON on HTTP 415"""
+        body, headers = wire_format.encode_payload(payload, self.payload_format)
+        response = self.session.post(
+            f"{self.server_url}/ingest_rsu",
+            data=body,
+            headers=headers,
+            timeout=5
+        )
+        if response.status_code == 415 and self.payload_format != wire_format.JSON:
+            # Server does not understand the compact format; fall back to JSON for good
+            print(f"[RSU-{self.rsu_id}] Server rejected '{self.payload_format}' payloads, falling back to JSON")
+            self.payload_format = wire_format.JSON
+            body, headers = wire_format.encode_payload(payload, self.payload_format)
+            response = self.session.post(
+                f"{self.server_url}/ingest_rsu",
+                data=body,
+                headers=headers,
+                timeout=5
+            )
+        return response
+    
+    def post_batch(self, batch: List[Dict], seq: Optional[int] = None) -> bool:
+        """
+        POST one batch of records to the server (does not touch the buffer)
+        
+        An accepted batch with a sequence number is kept in `unacked` until the
+        server acknowledges that it is committed, and is sent again if that
+        takes longer than UNACKED_RESEND_DELAY.
         
+        Args:
+            batch: Records to send
+            seq: Sequence number of the batch (None = no deduplication on the server)
+            
+        Returns:
+            True if the server accepted the batch (or had already stored it, or
+            dropped its run), False otherwise
+        """
         payload = {
             'rsu_id': self.rsu_id,
             'rsu_position': self.position,
             'vehicle_data': batch,
             'timestamp': datetime.utcnow().isoformat(timespec="seconds") + "Z"
         }
+        if seq is not None:
+            payload['run_id'] = self.run_id
+            payload['seq'] = seq
+        new_base = None
+        # A batch the server accepted before is resent as full rows: the delta
+        # base already holds its rows (and maybe newer ones)
+        if self.delta_encoding and (seq is None or seq > self.sent_seq):
+            payload['delta'] = True
+            payload['vehicle_data'], new_base = wire_format.encode_deltas(batch, self.delta_base)
         
         try:
-            response = requests.post(
-                f"{self.server_url}/ingest_rsu",
-                json=payload,
-                timeout=5
-            )
+            start = time.monotonic()
+            response = self._post_payload(payload)
+            if response.status_code in (429, 503):
+                # Server overloaded: shrink the batches and wait as long as it asks
+                try:
+                    self.server_retry_after = min(RETRY_MAX_DELAY, float(response.headers.get("Retry-After", 0)))
+                except ValueError:
+                    self.server_retry_after = 0.0
+                if self.flush_policy is not None:
+                    self.flush_policy.on_overload()
+                print(f"[RSU-{self.rsu_id}] Server overloaded (HTTP {response.status_code}), backing off")
+                return False
+            if response.status_code == 410:
+                # The run was dropped on the server; nothing of it is stored any more
+                print(f"[RSU-{self.rsu_id}] Run {self.run_id} was dropped by the server, discarding batch {seq}")
+                return True
+            if response.status_code == 409 and self.delta_encoding:
+                # Server lost the delta state (e.g. restarted); resend the batch as keyframes
+                print(f"[RSU-{self.rsu_id}] Server requested a keyframe resync")
+                self.delta_base.clear()
+                payload['vehicle_data'], new_base = wire_format.encode_deltas(batch, self.delta_base)
+                response = self._post_payload(payload)
             response.raise_for_status()
             
-            # Remove sent data from buffer
-            self.vehicle_buffer = self.vehicle_buffer[batch_size:]
-            print(f"[RSU-{self.rsu_id}] Successfully sent {len(batch)} records to server")
+            if new_base:
+                self.delta_base.update(new_base)
+            self.failures = 0
+            if self.flush_policy is not None:
+                self.flush_policy.on_success(time.monotonic() - start)
+            result = response.json()
+            if seq is not None:
+                with self.buffer_lock:
+                    self.sent_seq = max(self.sent_seq, seq)
+                    if seq > self.acked_seq:
+                        self.unacked.append((seq, batch, time.monotonic()))
+            self._acknowledge(result.get('acked_seq'))
+            if result.get('status') == 'duplicate':
+                print(f"[RSU-{self.rsu_id}] Batch {seq} was already stored by the server")
+            elif result.get('status') == 'pending':
+                print(f"[RSU-{self.rsu_id}] Batch {seq} is still queued on the server")
+            else:
+                print(f"[RSU-{self.rsu_id}] Successfully sent {len(batch)} records to server")
             return True
             
         except Exception as e:
             print(f"[RSU-{self.rsu_id}] Failed to send data to server: {e}")
             return False
     
+    def take_edge_stats(self, final: bool = False) -> List[Dict]:
+        """
+        Take the rollup rows ready for sending (completed windows and earlier failed rows)
+        
+        Args:
+            final: Also close the windows that are still open (end of run)
+            
+        Returns:
+            Summary rows (empty if aggregation is disabled)
+        """
+        if self.edge_stats is None:
+            return []
+        with self.buffer_lock:
+            rows = self.edge_stats.pending + self.edge_stats.flush(final)
+            self.edge_stats.pending = []
+        return rows
+    
+    def requeue_edge_stats(self, rows: List[Dict]):
+        """
+        Keep rollup rows that could not be sent for the next flush
+        
+        Args:
+            rows: Rows previously returned by take_edge_stats()
+        """
+        with self.buffer_lock:
+            self.edge_stats.pending = rows + self.edge_stats.pending
+    
+    def post_edge_stats(self, rows: List[Dict]) -> bool:
+        """
+        POST per-edge rollup rows to the server
+        
+        Args:
+            rows: Rows returned by take_edge_stats()
+            
+        Returns:
+            True if the server accepted the rows, False otherwise
+        """
+        payload = {
+            'rsu_id': self.rsu_id,
+            'window': self.edge_stats.window,
+            'edge_stats': rows,
+            'timestamp': datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            'run_id': self.run_id
+        }
+        try:
+            response = self.session.post(f"{self.server_url}/ingest_edge_stats", json=payload, timeout=5)
+            if response.status_code == 410:
+                print(f"[RSU-{self.rsu_id}] Run {self.run_id} was dropped by the server, discarding edge rollups")
+                return True
+            response.raise_for_status()
+            print(f"[RSU-{self.rsu_id}] Successfully sent {len(rows)} edge rollups to server")
+            return True
+        except Exception as e:
+            print(f"[RSU-{self.rsu_id}] Failed to send edge rollups to server: {e}")
+            return False
+    
+    def send_edge_stats(self, final: bool = False) -> bool:
+        """
+        Send ready rollup rows to the server, keeping them on failure
+        
+        Args:
+            final: Also close the windows that are still open (end of run)
+            
+        Returns:
+            True if there was nothing to send or the rows were sent, False otherwise
+        """
+        rows = self.take_edge_stats(final)
+        if not rows:
+            return True
+        if self.post_edge_stats(rows):
+            return True
+        self.requeue_edge_stats(rows)
+        return False
+    
     def update_connected_vehicles(self, current_vehicle_ids: Set[str]):
         """
         Update the list of connected vehicles
@@ -137,6 +1063,9 @@ class RSU:
         disconnected = self.connected_vehicles - current_vehicle_ids
         if disconnected:
             print(f"[RSU-{self.rsu_id}] Vehicles disconnected: {disconnected}")
+            # A vehicle that reconnects later starts again with a keyframe
+            for vehicle_id in disconnected:
+                self.delta_base.pop(vehicle_id, None)
         
         # Add new vehicles
         new_connections = current_vehicle_ids - self.connected_vehicles
@@ -157,22 +1086,153 @@ class RSU:
             'position': self.position,
             'coverage_radius': self.coverage_radius,
             'connected_vehicles': len(self.connected_vehicles),
-            'buffered_records': len(self.vehicle_buffer)
+            'buffered_records': self.buffered_count(),
+            'dropped_records': self.vehicle_buffer.dropped,
+            'open_edge_windows': len(self.edge_stats.windows) if self.edge_stats is not None else 0,
+            'batch_size': self.flush_policy.batch_size if self.flush_policy is not None else None
         }
 
 
+class RSUUploader:
+    """Background worker threads that upload RSU batches off the simulation thread"""
+    
+    def __init__(self, num_workers: int = 4):
+        """
+        Initialize and start the uploader
+        
+        Args:
+            num_workers: Number of concurrent upload threads
+        """
+        self.queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self.workers = [
+            threading.Thread(target=self._worker, name=f"rsu-uploader-{i}", daemon=True)
+            for i in range(num_workers)
+        ]
+        for worker in self.workers:
+            worker.start()
+    
+    def submit(self, rsu: RSU, batches: List[Tuple[int, List]]):
+        """
+        Enqueue batches of one RSU for upload, sent in order (returns immediately)
+        
+        Args:
+            rsu: RSU that produced the batches
+            batches: (sequence number, records) taken with RSU.take_flush()
+        """
+        rsu.in_flight = True
+        self.queue.put((rsu, batches, False))
+    
+    def submit_edge_stats(self, rsu: RSU, rows: List[Dict]):
+        """
+        Enqueue per-edge rollup rows for upload (returns immediately)
+        
+        Args:
+            rsu: RSU that produced the rows
+            rows: Rows taken with RSU.take_edge_stats()
+        """
+        self.queue.put((rsu, rows, True))
+    
+    def _worker(self):
+        """Upload queued batches until a stop sentinel is received"""
+        while True:
+            item = self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                return
+            rsu, batches, is_edge_stats = item
+            try:
+                if is_edge_stats:
+                    if not rsu.post_edge_stats(batches):
+                        rsu.requeue_edge_stats(batches)
+                else:
+                    rsu.send_batches(batches)
+            finally:
+                if not is_edge_stats:
+                    rsu.in_flight = False
+                self.queue.task_done()
+    
+    def join(self):
+        """Block until every queued batch has been processed"""
+        self.queue.join()
+    
+    def stop(self):
+        """Stop the worker threads after the queued batches are processed"""
+        for _ in self.workers:
+            self.queue.put(None)
+        for worker in self.workers:
+            worker.join()
+
+
 class RSUNetwork:
     """Manages a network of RSUs"""
     
-    def __init__(self, server_url: str):
+    def __init__(self, server_url: str, background_upload: bool = False, upload_workers: int = 4,
+                 buffer_capacity: Optional[int] = None, overflow_policy: str = DROP_OLDEST,
+                 spill_dir: Optional[str] = None, pool_maxsize: Optional[int] = None,
+                 payload_format: str = wire_format.JSON, delta_encoding: bool = False,
+                 aggregation_window: Optional[float] = None, raw_sample_rate: float = 1.0,
+                 run_id: Optional[str] = None, adaptive_flush: bool = False,
+                 flush_max_age: float = 10.0, spill_fsync_interval: float = 1.0):
         """
         Initialize RSU Network
         
         Args:
             server_url: URL of the backend server
+            background_upload: Upload batches from worker threads instead of blocking the caller
+            upload_workers: Number of upload threads when background_upload is enabled
+            buffer_capacity: Per-RSU in-memory buffer capacity (None = unbounded)
+            overflow_policy: Per-RSU overflow policy ('drop_oldest', 'drop_newest' or 'spill')
+            spill_dir: Spool root directory for the 'spill' policy (default: rsu_spool;
+                       one subdirectory per run and RSU)
+            pool_maxsize: Kept-alive server connections shared by all RSUs
+                          (default: enough for every upload worker)
+            payload_format: Wire format of RSU batches ('json', 'columnar' or 'msgpack')
+            delta_encoding: Send per-vehicle keyframes followed by changed fields only
+            aggregation_window: Window (sim seconds) of the per-RSU edge rollups; None disables them
+            raw_sample_rate: Fraction of raw records still sent when aggregation is enabled
+            run_id: Simulation run ID carried by every batch (default: random per network)
+            adaptive_flush: Give every RSU an AdaptiveFlushPolicy (batch size adapts to latency,
+                            overload and backlog; flushes on batch size or record age)
+            flush_max_age: Sim seconds after which an adaptive RSU flushes a partial batch
+            spill_fsync_interval: Minimum seconds between fsyncs of each RSU spool (0 = every spilled record)
         """
         self.rsus: List[RSU] = []
         self.server_url = server_url
+        # One pooled session for all RSU uplinks and network-level requests
+        self.session = create_http_session(pool_maxsize=pool_maxsize or max(upload_workers, 10))
+        self.buffer_capacity = buffer_capacity
+        self.overflow_policy = overflow_policy
+        self.spill_dir = spill_dir
+        self.spill_fsync_interval = spill_fsync_interval
+        self.payload_format = payload_format
+        self.delta_encoding = delta_encoding
+        self.aggregation_window = aggregation_window
+        self.raw_sample_rate = raw_sample_rate
+        self.run_id = run_id or uuid.uuid4().hex
+        self.adaptive_flush = adaptive_flush
+        self.flush_max_age = flush_max_age
+        self.uploader = RSUUploader(upload_workers) if background_upload else None
+        
+        # Spatial index over RSU positions: uniform grid with cells as large as
+        # the biggest coverage radius, so a vehicle only needs its 3x3 cell block
+        self.cell_size = 0.0
+        self.grid: Dict[Tuple[int, int], List[int]] = {}
+        self.rsu_positions = np.empty((0, 2))
+        self.rsu_radii_sq = np.empty(0)
+        
+    def _cell(self, position: Sequence[float]) -> Tuple[int, int]:
+        """Grid cell containing a position"""
+        return (math.floor(position[0] / self.cell_size), math.floor(position[1] / self.cell_size))
+    
+    def _rebuild_index(self):
+        """Rebuild the grid and the position arrays after the RSU set changed"""
+        self.rsu_positions = np.array([rsu.position for rsu in self.rsus], dtype=float).reshape(-1, 2)
+        radii = np.array([rsu.coverage_radius for rsu in self.rsus], dtype=float)
+        self.rsu_radii_sq = radii ** 2
+        self.cell_size = float(radii.max()) if len(radii) and radii.max() > 0 else 1.0
+        self.grid = {}
+        for index, rsu in enumerate(self.rsus):
+            self.grid.setdefault(self._cell(rsu.position), []).append(index)
         
     def add_rsu(self, rsu_id: str, position: tuple, coverage_radius: float = 500.0):
         """
@@ -183,8 +1243,14 @@ class RSUNetwork:
             position: (x, y) coordinates
             coverage_radius: Communication range in meters (default: 500m)
         """
-        rsu = RSU(rsu_id, position, coverage_radius, self.server_url)
+        flush_policy = AdaptiveFlushPolicy(max_age=self.flush_max_age) if self.adaptive_flush else None
+        rsu = RSU(rsu_id, position, coverage_radius, self.server_url,
+                  self.buffer_capacity, self.overflow_policy, self.spill_dir, self.session,
+                  self.payload_format, self.delta_encoding,
+                  self.aggregation_window, self.raw_sample_rate, self.run_id, flush_policy,
+                  self.spill_fsync_interval)
         self.rsus.append(rsu)
+        self._rebuild_index()
         print(f"[RSU Network] Added RSU-{rsu_id} at position {position} with {coverage_radius}m range")
         
     def find_nearest_rsu(self, vehicle_position: tuple) -> RSU:
@@ -197,29 +1263,71 @@ class RSUNetwork:
         Returns:
             The nearest RSU that can communicate with the vehicle, or None
         """
+        if not self.rsus:
+            return None
+        
+        # Candidate RSUs from the surrounding grid cells, in network order so
+        # that ties go to the RSU added first
+        cx, cy = self._cell(vehicle_position)
+        candidates = sorted(
+            index
+            for gx in (cx - 1, cx, cx + 1)
+            for gy in (cy - 1, cy, cy + 1)
+            for index in self.grid.get((gx, gy), ())
+        )
+        
         nearest_rsu = None
-        min_distance = float('inf')
+        min_distance_sq = float('inf')
         
-        for rsu in self.rsus:
-            if rsu.is_vehicle_in_range(vehicle_position):
-                distance = math.sqrt(
-                    (vehicle_position[0] - rsu.position[0]) ** 2 +
-                    (vehicle_position[1] - rsu.position[1]) ** 2
-                )
-                if distance < min_distance:
-                    min_distance = distance
-                    nearest_rsu = rsu
+        for index in candidates:
+            rsu = self.rsus[index]
+            dx = vehicle_position[0] - rsu.position[0]
+            dy = vehicle_position[1] - rsu.position[1]
+            distance_sq = dx * dx + dy * dy
+            if distance_sq <= self.rsu_radii_sq[index] and distance_sq < min_distance_sq:
+                min_distance_sq = distance_sq
+                nearest_rsu = rsu
         
         return nearest_rsu
     
-    def collect_vehicle_data(self, vehicle_id: str, vehicle_position: tuple, vehicle_data: Dict, is_ev: bool = True):
+    def assign_vehicles(self, positions, chunk_size: int = 4096) -> List[Optional[RSU]]:
+        """
+        Find the nearest in-range RSU for many vehicles at once
+        
+        Args:
+            positions: Array-like of shape (n, 2) with vehicle (x, y) coordinates
+            chunk_size: Vehicles per broadcast chunk (bounds the n x m distance matrix)
+            
+        Returns:
+            List of length n with the nearest in-range RSU of each vehicle, or None
+        """
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        if not self.rsus or len(positions) == 0:
+            return [None] * len(positions)
+        
+        assigned: List[Optional[RSU]] = []
+        for start in range(0, len(positions), chunk_size):
+            chunk = positions[start:start + chunk_size]
+            # Squared distances of every vehicle to every RSU: shape (chunk, m)
+            diff = chunk[:, None, :] - self.rsu_positions[None, :, :]
+            distance_sq = np.einsum('ijk,ijk->ij', diff, diff)
+            distance_sq[distance_sq > self.rsu_radii_sq[None, :]] = np.inf
+            nearest = np.argmin(distance_sq, axis=1)
+            in_range = np.isfinite(distance_sq[np.arange(len(chunk)), nearest])
+            assigned.extend(
+                self.rsus[index] if ok else None
+                for index, ok in zip(nearest.tolist(), in_range.tolist())
+            )
+        return assigned
+    
+    def collect_vehicle_data(self, vehicle_id: str, vehicle_position: tuple, vehicle_data, is_ev: bool = True):
         """
         Route vehicle data to the nearest RSU
         
         Args:
             vehicle_id: ID of the vehicle
             vehicle_position: (x, y) coordinates
-            vehicle_data: Vehicle telemetry data
+            vehicle_data: VehicleRecord or telemetry dictionary
             is_ev: Whether the vehicle is an EV (only EVs are tracked)
         """
         # Only process EVs
@@ -235,15 +1343,112 @@ class RSUNetwork:
             if is_ev:
                 print(f"[RSU Network] Warning: EV {vehicle_id} not in range of any RSU")
     
-    def send_all_data(self, batch_size: int = 50):
+    def collect_vehicle_data_batch(self, vehicle_ids: Sequence[str], positions, vehicle_data: Sequence):
+        """
+        Route the data of many EVs to their nearest RSUs with one batched assignment
+        
+        Args:
+            vehicle_ids: IDs of the EVs
+            positions: (x, y) coordinates of the EVs, same order as vehicle_ids
+            vehicle_data: VehicleRecords (or telemetry dictionaries), same order as vehicle_ids
+        """
+        in_range: Dict[str, Set[str]] = {rsu.rsu_id: set() for rsu in self.rsus}
+        for vehicle_id, rsu, data in zip(vehicle_ids, self.assign_vehicles(positions), vehicle_data):
+            if rsu:
+                rsu.collect_vehicle_data(vehicle_id, data, True)
+                in_range[rsu.rsu_id].add(vehicle_id)
+            else:
+                print(f"[RSU Network] Warning: EV {vehicle_id} not in range of any RSU")
+        
+        # The batch covers every EV of the tick, so it also tells who (dis)connected
+        for rsu in self.rsus:
+            rsu.update_connected_vehicles(in_range[rsu.rsu_id])
+    
+    def send_all_data(self, batch_size: int = 50, sim_time: Optional[float] = None):
         """
         Send data from all RSUs to the server
         
+        Without a flush policy each RSU sends one batch of batch_size records.
+        Adaptive RSUs only flush when a batch is full or their oldest record is
+        older than their max age, and drain a deep backlog in several batches.
+        With background upload enabled this only enqueues the batches (skipping
+        RSUs whose previous batches are still in flight) and returns.
+        RSUs backing off after a failed upload are skipped until their retry is due.
+        
+        Args:
+            batch_size: Maximum number of records per batch (initial size for adaptive RSUs)
+            sim_time: Current simulation time for the age trigger (None = flush any backlog)
+        """
+        self.send_edge_stats()
+        for rsu in self.rsus:
+            if rsu.in_flight or rsu.is_backing_off():
+                continue
+            batches = rsu.take_flush(batch_size, sim_time)
+            if not batches:
+                continue
+            if self.uploader is None:
+                rsu.send_batches(batches)
+            else:
+                self.uploader.submit(rsu, batches)
+    
+    def send_edge_stats(self, final: bool = False):
+        """
+        Send the per-edge rollups of completed windows from all RSUs
+        
         Args:
-            batch_size: Maximum number of records per batch
+            final: Also close the windows that are still open (end of run)
         """
         for rsu in self.rsus:
-            rsu.send_data_to_server(batch_size)
+            if rsu.edge_stats is None:
+                continue
+            if self.uploader is None:
+                rsu.send_edge_stats(final)
+                continue
+            rows = rsu.take_edge_stats(final)
+            if rows:
+                self.uploader.submit_edge_stats(rsu, rows)
+    
+    def wait_for_uploads(self):
+        """Block until all batches handed to the background uploader are processed"""
+        if self.uploader is not None:
+            self.uploader.join()
+    
+    def wait_for_acks(self, timeout: float = 60.0, poll_interval: float = 0.2) -> bool:
+        """
+        Block until the server has committed every batch it accepted, resending
+        the batches it does not acknowledge in time (e.g. lost by a failed write)
+        
+        Args:
+            timeout: Maximum seconds to wait
+            poll_interval: Seconds between polls of the server
+            
+        Returns:
+            True if every batch is acknowledged, False on timeout
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            self.wait_for_uploads()
+            waiting = [rsu for rsu in self.rsus if not rsu.poll_acks()]
+            if not waiting:
+                return True
+            if time.monotonic() >= deadline:
+                print(f"[RSU Network] {len(waiting)} RSUs still have unacknowledged batches")
+                return False
+            for rsu in waiting:
+                with rsu.buffer_lock:
+                    resend = rsu._take_resend()
+                if resend is not None:
+                    rsu.send_batches([resend])
+            time.sleep(poll_interval)
+    
+    def close(self):
+        """Stop the background upload threads, close the RSU spools and the HTTP pool"""
+        if self.uploader is not None:
+            self.uploader.stop()
+            self.uploader = None
+        for rsu in self.rsus:
+            rsu.vehicle_buffer.close()
+        self.session.close()
     
     def get_network_status(self) -> List[Dict]:
         """
@@ -266,4 +1471,10 @@ class RSUNetwork:
             print(f"  Coverage: {status['coverage_radius']}m")
             print(f"  Connected Vehicles: {status['connected_vehicles']}")
             print(f"  Buffered Records: {status['buffered_records']}")
+            if status['dropped_records']:
+                print(f"  Dropped Records: {status['dropped_records']}")
+            if status['open_edge_windows']:
+                print(f"  Open Edge Windows: {status['open_edge_windows']}")
+            if status['batch_size'] is not None:
+                print(f"  Adaptive Batch Size: {status['batch_size']}")
         print("="*60 + "\n")
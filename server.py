@@ -1,78 +1,386 @@
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
-import sqlite3
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from typing import List, Optional, Dict, Any, Set, Tuple, Union, Callable
+import json
+import os
+import threading
 from datetime import datetime
+import telemetry_export
+import wire_format
+from telemetry_store import GroupCommitWriter, RunPartitions, TelemetryStore
 
 app = FastAPI(title="SUMO/TraCI RSU-Based Ingest")
 
 DB_PATH = "telemetry.db"
 
-# Initialize the database with vehicle_logs and rsu_logs tables if they don't exist
-def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    
-    # Original vehicle_logs table (for backward compatibility)
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS vehicle_logs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            ts_utc TEXT NOT NULL,
-            vehicle_id TEXT NOT NULL,
-            speed REAL NOT NULL,
-            battery_charge REAL NOT NULL,
-            battery_capacity TEXT,
-            sim_time REAL NOT NULL
-        )
-    """)
+# Long-lived WAL-mode writer connection plus a pool of read-only connections
+store = TelemetryStore(DB_PATH)
+
+# Group-commit queue: /ingest_rsu returns 202 as soon as a batch is queued, and one
+# writer thread commits the queued batches every 50 ms or 5000 rows (the 202 only
+# acknowledges the seqs already committed, see committed_seqs)
+ingest_queue = GroupCommitWriter(store, max_delay=0.05, max_rows=5000)
+
+# Telemetry of each run goes to its own database file in RUNS_DIR (see the runs
+# table); telemetry.db keeps the run catalogue and the data stored before runs existed
+RUNS_DIR = os.path.join(os.path.dirname(os.path.abspath(DB_PATH)), "telemetry_runs")
+run_files: Dict[str, Optional[str]] = {}  # run_id -> db_file column of the runs table
+dropped_runs: Set[str] = set()  # Tombstones: batches and queries of these runs get 410
+current_run_id: Optional[str] = None  # Run receiving batches that carry no run_id
+runs_lock = threading.Lock()  # Guards run_files, dropped_runs and current_run_id
+
+# Ingest state per (RSU, run). A batch's seq is only acknowledged once its write
+# has committed: committed_seqs is the watermark every lower seq is stored below,
+# so an RSU can let go of a batch as soon as the watermark covers it.
+committed_seqs: Dict[Tuple[str, str], int] = {}
+# Committed seqs above the watermark (a lower batch is still queued or failed)
+committed_ahead: Dict[Tuple[str, str], Set[int]] = {}
+# Queued batches in queue order: seq (or a placeholder for batches without one) ->
+# vehicle rows the batch leaves as delta base once committed (None if not delta-encoded)
+pending_batches: Dict[Tuple[str, str], Dict[Any, Optional[Dict[str, Dict[str, Any]]]]] = {}
+# Last committed full row per vehicle, used to rebuild rows of delta-encoded batches
+delta_state: Dict[Tuple[str, str], Dict[str, Dict[str, Any]]] = {}
+ingest_lock = threading.Lock()  # Guards the four dictionaries above
+
+# Record fields that rsu_vehicle_logs requires (checked before a batch is queued)
+REQUIRED_RECORD_FIELDS = ('vehicle_id', 'speed', 'battery_charge', 'sim_time')
+
+# Traffic density columns that rsu_vehicle_logs tables created by early versions lack
+RSU_VEHICLE_LOG_DENSITY_COLUMNS = [
+    ('vehicle_type', 'TEXT'),
+    ('edge_id', 'TEXT'),
+    ('lane_id', 'TEXT'),
+    ('lane_position', 'REAL'),
+    ('vehicles_ahead_count', 'INTEGER'),
+    ('same_direction_ahead', 'INTEGER'),
+    ('distance_to_traffic_light', 'REAL'),
+    ('next_traffic_light', 'TEXT'),
+    ('traffic_light_state', 'TEXT'),
+    ('edge_occupancy_percentage', 'REAL'),
+]
+
+def add_missing_density_columns(cur):
+    """Add the traffic density columns to an rsu_vehicle_logs table that predates them"""
+    existing = {row[1] for row in cur.execute("PRAGMA table_info(rsu_vehicle_logs)")}
+    for column, column_type in RSU_VEHICLE_LOG_DENSITY_COLUMNS:
+        if column not in existing:
+            cur.execute(f"ALTER TABLE rsu_vehicle_logs ADD COLUMN {column} {column_type}")
+
+# Versioned schema: SCHEMA_MIGRATIONS[n - 1] upgrades a database from version n - 1
+# to n. A step is an SQL statement or a function run on the writer cursor.
+# PRAGMA user_version records the version a database file is at, and init_db()
+# applies the missing migrations in order, each in one transaction.
+# Append new migrations to the list; never edit one that has been released.
+SCHEMA_MIGRATIONS: List[Tuple[str, List[Union[str, Callable]]]] = [
+    ("Initial RSU telemetry schema", [
+        # Original vehicle_logs table (for backward compatibility)
+        """
+            CREATE TABLE IF NOT EXISTS vehicle_logs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts_utc TEXT NOT NULL,
+                vehicle_id TEXT NOT NULL,
+                speed REAL NOT NULL,
+                battery_charge REAL NOT NULL,
+                battery_capacity TEXT,
+                sim_time REAL NOT NULL
+            )
+        """,
+        # New RSU-based vehicle logs table with traffic density fields
+        """
+            CREATE TABLE IF NOT EXISTS rsu_vehicle_logs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts_utc TEXT NOT NULL,
+                rsu_id TEXT NOT NULL,
+                rsu_position_x REAL,
+                rsu_position_y REAL,
+                vehicle_id TEXT NOT NULL,
+                vehicle_type TEXT,
+                edge_id TEXT,
+                lane_id TEXT,
+                lane_position REAL,
+                speed REAL NOT NULL,
+                battery_charge REAL NOT NULL,
+                battery_capacity REAL,
+                battery_percentage REAL,
+                vehicles_ahead_count INTEGER,
+                same_direction_ahead INTEGER,
+                distance_to_traffic_light REAL,
+                next_traffic_light TEXT,
+                traffic_light_state TEXT,
+                edge_occupancy_percentage REAL,
+                sim_time REAL NOT NULL,
+                collection_timestamp TEXT,
+                rsu_received_at TEXT NOT NULL
+            )
+        """,
+        add_missing_density_columns,
+        # RSU status logs table
+        """
+            CREATE TABLE IF NOT EXISTS rsu_status (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts_utc TEXT NOT NULL,
+                rsu_id TEXT NOT NULL,
+                position_x REAL,
+                position_y REAL,
+                vehicle_count INTEGER,
+                data_records INTEGER
+            )
+        """,
+        # Batches received per (RSU, run, sequence number); the unique index drops resent copies
+        """
+            CREATE TABLE IF NOT EXISTS rsu_batches (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts_utc TEXT NOT NULL,
+                rsu_id TEXT NOT NULL,
+                run_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                record_count INTEGER NOT NULL
+            )
+        """,
+        """
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_rsu_batches_seq
+            ON rsu_batches (rsu_id, run_id, seq)
+        """,
+        # Per-edge, per-window rollups computed by the RSUs (aggregation mode)
+        """
+            CREATE TABLE IF NOT EXISTS rsu_edge_stats (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts_utc TEXT NOT NULL,
+                rsu_id TEXT NOT NULL,
+                edge_id TEXT NOT NULL,
+                window_start REAL NOT NULL,
+                window_end REAL NOT NULL,
+                sample_count INTEGER NOT NULL,
+                vehicle_count INTEGER NOT NULL,
+                mean_speed REAL,
+                mean_occupancy REAL,
+                mean_battery_percentage REAL,
+                min_battery_percentage REAL
+            )
+        """,
+    ]),
+    ("Indexes for per-vehicle, per-RSU, per-edge and sim-time queries", [
+        # Trajectory of one vehicle (analyze_data battery chart): seek + ordered range scan
+        """
+            CREATE INDEX IF NOT EXISTS idx_rsu_vehicle_logs_vehicle_time
+            ON rsu_vehicle_logs (vehicle_id, sim_time)
+        """,
+        # Per-RSU slices and GROUP BY rsu_id
+        """
+            CREATE INDEX IF NOT EXISTS idx_rsu_vehicle_logs_rsu_time
+            ON rsu_vehicle_logs (rsu_id, sim_time)
+        """,
+        # Per-edge slices
+        """
+            CREATE INDEX IF NOT EXISTS idx_rsu_vehicle_logs_edge_time
+            ON rsu_vehicle_logs (edge_id, sim_time)
+        """,
+        # Sim-time windows and ORDER BY sim_time exports
+        """
+            CREATE INDEX IF NOT EXISTS idx_rsu_vehicle_logs_time
+            ON rsu_vehicle_logs (sim_time)
+        """,
+        "ANALYZE",
+    ]),
+    ("Per-RSU totals maintained on ingest for /rsu_stats", [
+        """
+            CREATE TABLE IF NOT EXISTS rsu_stats_rollup (
+                rsu_id TEXT PRIMARY KEY,
+                position_x REAL,
+                position_y REAL,
+                total_vehicles INTEGER NOT NULL,
+                total_records INTEGER NOT NULL,
+                batch_count INTEGER NOT NULL,
+                last_update TEXT
+            ) WITHOUT ROWID
+        """,
+        # Backfill from the status history logged so far
+        """
+            INSERT OR REPLACE INTO rsu_stats_rollup
+            (rsu_id, position_x, position_y, total_vehicles, total_records, batch_count, last_update)
+            SELECT rsu_id, position_x, position_y, SUM(vehicle_count), SUM(data_records),
+                   COUNT(*), MAX(ts_utc)
+            FROM rsu_status
+            GROUP BY rsu_id
+        """,
+    ]),
+    # Run files share this schema; only the runs table of telemetry.db is used
+    ("Run catalogue for run-partitioned storage", [
+        """
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                started_at TEXT NOT NULL,
+                db_file TEXT,
+                description TEXT
+            )
+        """,
+        # Rows stored before runs existed stay in telemetry.db as run 'legacy' (db_file NULL)
+        """
+            INSERT OR IGNORE INTO runs (run_id, started_at, db_file, description)
+            SELECT 'legacy', MIN(ts_utc), NULL, 'Data stored before run partitioning'
+            FROM rsu_vehicle_logs
+            HAVING COUNT(*) > 0
+        """,
+    ]),
+    # Dropped runs keep their row as a tombstone, so late batches cannot recreate them;
+    # runs registered by their first batch (not POST /runs) never become current
+    ("Run tombstones and implicitly registered runs", [
+        "ALTER TABLE runs ADD COLUMN dropped_at TEXT",
+        "ALTER TABLE runs ADD COLUMN implicit INTEGER NOT NULL DEFAULT 0",
+    ]),
+]
+
+SCHEMA_VERSION = len(SCHEMA_MIGRATIONS)
+
+def migrate_db(target_version: int = SCHEMA_VERSION, db: Optional[TelemetryStore] = None,
+               verbose: bool = True) -> int:
+    """
+    Bring the database schema up to target_version
     
-    # New RSU-based vehicle logs table with traffic density fields
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS rsu_vehicle_logs (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            ts_utc TEXT NOT NULL,
-            rsu_id TEXT NOT NULL,
-            rsu_position_x REAL,
-            rsu_position_y REAL,
-            vehicle_id TEXT NOT NULL,
-            vehicle_type TEXT,
-            edge_id TEXT,
-            lane_id TEXT,
-            lane_position REAL,
-            speed REAL NOT NULL,
-            battery_charge REAL NOT NULL,
-            battery_capacity REAL,
-            battery_percentage REAL,
-            vehicles_ahead_count INTEGER,
-            same_direction_ahead INTEGER,
-            distance_to_traffic_light REAL,
-            next_traffic_light TEXT,
-            traffic_light_state TEXT,
-            edge_occupancy_percentage REAL,
-            sim_time REAL NOT NULL,
-            collection_timestamp TEXT,
-            rsu_received_at TEXT NOT NULL
-        )
-    """)
+    Databases created before versioning (user_version 0) go through the first
+    migration too: its CREATE ... IF NOT EXISTS statements keep the existing
+    tables, and older rsu_vehicle_logs tables gain the traffic density columns.
     
-    # RSU status logs table
-    cur.execute("""
-        CREATE TABLE IF NOT EXISTS rsu_status (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            ts_utc TEXT NOT NULL,
-            rsu_id TEXT NOT NULL,
-            position_x REAL,
-            position_y REAL,
-            vehicle_count INTEGER,
-            data_records INTEGER
-        )
-    """)
+    Args:
+        target_version: Schema version to migrate to
+        db: Store to migrate (default: telemetry.db)
+        verbose: Log every applied migration
+        
+    Returns:
+        Schema version of the database afterwards
+    """
+    db = db or store
+    with db.writer() as cur:
+        version = cur.execute("PRAGMA user_version").fetchone()[0]
+    if version > SCHEMA_VERSION:
+        raise RuntimeError(f"{db.db_path} has schema version {version}; this server knows up to {SCHEMA_VERSION}")
     
-    conn.commit()
-    conn.close()
+    while version < target_version:
+        description, steps = SCHEMA_MIGRATIONS[version]
+        with db.writer() as cur:
+            cur.execute("BEGIN")  # DDL does not open a transaction implicitly
+            for step in steps:
+                if callable(step):
+                    step(cur)
+                else:
+                    cur.execute(step)
+            cur.execute(f"PRAGMA user_version = {version + 1}")
+        version += 1
+        if verbose:
+            print(f"[Schema] Migrated {db.db_path} to version {version}: {description}")
+    return version
+
+# Initialize the database with vehicle_logs and rsu_logs tables, or upgrade its schema
+def init_db():
+    migrate_db()
 
 init_db()
 
+run_partitions = RunPartitions(RUNS_DIR, init_store=lambda run_store: migrate_db(db=run_store, verbose=False),
+                               max_delay=0.05, max_rows=5000)
+
+def load_runs():
+    """Load the run catalogue; the most recently started run becomes the current run"""
+    global current_run_id
+    with store.reader() as conn:
+        rows = conn.execute("SELECT run_id, db_file, dropped_at, implicit FROM runs ORDER BY rowid").fetchall()
+    with runs_lock:
+        run_files.clear()
+        dropped_runs.clear()
+        current_run_id = None
+        for run_id, db_file, dropped_at, implicit in rows:
+            if dropped_at is not None:
+                dropped_runs.add(run_id)
+                continue
+            run_files[run_id] = db_file
+            if not implicit:
+                current_run_id = run_id
+
+load_runs()
+
+def check_not_dropped(run_id: Optional[str]):
+    """Raise 410 for a run that was dropped (call with runs_lock held)"""
+    if run_id in dropped_runs:
+        raise HTTPException(status_code=410, detail=f"Run {run_id} was dropped")
+
+def register_run(run_id: Optional[str] = None, description: Optional[str] = None, implicit: bool = False) -> str:
+    """
+    Register a run, create its database file and, unless it is implicit, make
+    it the current run (the one receiving batches without a run_id)
+    
+    Args:
+        run_id: Run ID (default: generated from the current time)
+        description: Free-text description stored in the runs table
+        implicit: The run is registered by its first batch rather than started with POST /runs
+        
+    Returns:
+        Run ID
+    """
+    global current_run_id
+    run_id = run_id or datetime.utcnow().strftime("run_%Y%m%d_%H%M%S_%f")
+    try:
+        db_path = run_partitions.path(run_id)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    with runs_lock:
+        check_not_dropped(run_id)
+        if run_id not in run_files:
+            run_partitions.open(run_id)
+            db_file = os.path.relpath(db_path, os.path.dirname(os.path.abspath(DB_PATH)))
+            with store.writer() as cur:
+                cur.execute("""
+                    INSERT OR IGNORE INTO runs (run_id, started_at, db_file, description, implicit)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (run_id, datetime.utcnow().isoformat(timespec="seconds") + "Z", db_file, description, implicit))
+            run_files[run_id] = db_file
+            print(f"[Runs] Started {'implicit ' if implicit else ''}run {run_id} ({db_file})")
+        elif not implicit:
+            # POST /runs for a run its first batch registered makes it a regular run
+            with store.writer() as cur:
+                cur.execute("UPDATE runs SET implicit = 0 WHERE run_id = ?", (run_id,))
+        if not implicit:
+            current_run_id = run_id
+    return run_id
+
+def run_storage(run_id: Optional[str]) -> Tuple[str, TelemetryStore, GroupCommitWriter]:
+    """
+    Store and write queue of a run
+    
+    A run ID the server has not seen is registered on first use as an
+    implicit run (it does not become the current run); a dropped run is a
+    410. No run ID means the current run (started on demand).
+    
+    Args:
+        run_id: Run ID or None
+        
+    Returns:
+        (run ID, TelemetryStore, GroupCommitWriter)
+    """
+    with runs_lock:
+        check_not_dropped(run_id)
+        implicit = run_id is not None
+        run_id = run_id or current_run_id
+        known = run_id in run_files
+    if not known:
+        run_id = register_run(run_id, implicit=implicit)
+    with runs_lock:
+        in_main_db = run_id in run_files and run_files[run_id] is None
+    if in_main_db:
+        return run_id, store, ingest_queue  # Data from before run partitioning
+    run_store, writer = run_partitions.open(run_id)
+    return run_id, run_store, writer
+
+def existing_run_storage(run_id: Optional[str]) -> Tuple[str, TelemetryStore, GroupCommitWriter]:
+    """run_storage() for queries: unknown runs are a 404 instead of being registered"""
+    with runs_lock:
+        check_not_dropped(run_id)
+        run_id = run_id or current_run_id
+        if run_id not in run_files:
+            raise HTTPException(status_code=404, detail=f"Unknown run {run_id}")
+    return run_storage(run_id)
+
 # Pydantic model for vehicle log (backward compatibility)
 class VehicleLog(BaseModel):
     vehicle_id: str
@@ -97,41 +405,227 @@ class RSUIngestPayload(BaseModel):
     rsu_position: tuple
     vehicle_data: List[Dict[str, Any]]
     timestamp: str
+    delta: bool = False  # vehicle_data holds keyframe/delta rows (see wire_format.encode_deltas)
+    run_id: Optional[str] = None  # With seq: identifies the batch for deduplication
+    seq: Optional[int] = None
+
+class EdgeStatsRow(BaseModel):
+    edge_id: str
+    window_start: float
+    window_end: float
+    sample_count: int
+    vehicle_count: int
+    mean_speed: Optional[float] = None
+    mean_occupancy: Optional[float] = None
+    mean_battery_percentage: Optional[float] = None
+    min_battery_percentage: Optional[float] = None
+
+class EdgeStatsPayload(BaseModel):
+    rsu_id: str
+    window: float
+    edge_stats: List[EdgeStatsRow]
+    timestamp: str
+    run_id: Optional[str] = None  # Default: the current run
+
+class RunRequest(BaseModel):
+    run_id: Optional[str] = None  # Default: generated from the current time
+    description: Optional[str] = None
 
 # Endpoint to ingest vehicle logs (original - for backward compatibility)
 @app.post("/ingest")
 def ingest(logs: List[VehicleLog]):
     if not logs:
         raise HTTPException(status_code=400, detail="Empty payload")
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.executemany("""
-        INSERT INTO vehicle_logs (ts_utc, vehicle_id, speed, battery_charge, battery_capacity, sim_time)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, [
-        (datetime.utcnow().isoformat(timespec="seconds")+"Z",
-         l.vehicle_id, l.speed, l.battery_charge, l.battery_capacity, l.sim_time)
-        for l in logs
-    ])
-    conn.commit()
-    conn.close()
+    with store.writer() as cur:
+        cur.executemany("""
+            INSERT INTO vehicle_logs (ts_utc, vehicle_id, speed, battery_charge, battery_capacity, sim_time)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [
+            (datetime.utcnow().isoformat(timespec="seconds")+"Z",
+             l.vehicle_id, l.speed, l.battery_charge, l.battery_capacity, l.sim_time)
+            for l in logs
+        ])
     return {"status": "ok", "inserted": len(logs)}
 
 # Endpoint to ingest data from RSUs
+# Accepts JSON and the compact columnar formats of wire_format (by Content-Type)
 @app.post("/ingest_rsu")
-def ingest_rsu(payload: RSUIngestPayload):
+async def ingest_rsu(request: Request):
+    # Only the body is read on the event loop; decoding, validation, run lookup
+    # (which may create a run's file) and ingest_lock block, so they run in the threadpool
+    body = await request.body()
+    return await run_in_threadpool(
+        ingest_rsu_body,
+        body,
+        request.headers.get("content-type"),
+        request.headers.get("content-encoding")
+    )
+
+def ingest_rsu_body(body: bytes, content_type: Optional[str], content_encoding: Optional[str]):
+    """
+    Decode, validate and queue one /ingest_rsu batch
+    
+    Args:
+        body: Request body
+        content_type: Content-Type header (selects the wire format)
+        content_encoding: Content-Encoding header
+        
+    Returns:
+        Response of /ingest_rsu
+    """
+    try:
+        data = wire_format.decode_payload(body, content_type, content_encoding)
+    except wire_format.UnsupportedFormatError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Malformed payload: {e}")
+    
+    try:
+        payload = RSUIngestPayload(**data)
+    except (ValidationError, TypeError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
     if not payload.vehicle_data:
         raise HTTPException(status_code=400, detail="Empty vehicle data")
     
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    
     rsu_received_at = datetime.utcnow().isoformat(timespec="seconds") + "Z"
+    seq_key = (payload.rsu_id, payload.run_id or "")
+    run_id, run_store, run_queue = run_storage(payload.run_id)
     
-    # Insert vehicle data received from RSU with traffic density fields
-    records = []
-    for data in payload.vehicle_data:
-        records.append((
+    with ingest_lock:
+        if payload.seq is not None:
+            acked_seq = committed_watermark(seq_key, run_store)
+            # A resent copy of a stored batch is acknowledged without queueing it again
+            if payload.seq <= acked_seq or payload.seq in committed_ahead.get(seq_key, ()):
+                return {
+                    "status": "duplicate",
+                    "rsu_id": payload.rsu_id,
+                    "inserted": 0,
+                    "acked_seq": acked_seq,
+                    "timestamp": rsu_received_at
+                }
+            # ... and a resent copy of a batch still in the queue is left to that copy
+            if payload.seq in pending_batches.get(seq_key, {}):
+                return JSONResponse(status_code=202, content={
+                    "status": "pending",
+                    "rsu_id": payload.rsu_id,
+                    "run_id": run_id,
+                    "queued": 0,
+                    "acked_seq": acked_seq,
+                    "timestamp": rsu_received_at
+                })
+        
+        # Rebuild full rows of delta-encoded batches against the committed rows
+        # plus those of the batches queued before this one
+        new_base = None
+        if payload.delta:
+            base = dict(delta_state.get(seq_key, {}))
+            for queued_base in pending_batches.get(seq_key, {}).values():
+                base.update(queued_base or {})
+            try:
+                payload.vehicle_data, new_base = wire_format.apply_deltas(payload.vehicle_data, base)
+            except wire_format.MissingKeyframeError as e:
+                raise HTTPException(status_code=409, detail={"error": str(e), "resync": e.vehicle_ids})
+        
+        for data in payload.vehicle_data:
+            missing = [field for field in REQUIRED_RECORD_FIELDS if data.get(field) is None]
+            if missing:
+                raise HTTPException(status_code=422, detail=f"Record of {data.get('vehicle_id')} lacks {missing}")
+        
+        batch_key = payload.seq if payload.seq is not None else object()
+        queued = run_queue.submit(
+            lambda cur: write_rsu_payload(cur, payload, rsu_received_at),
+            len(payload.vehicle_data),
+            on_commit=lambda _: batch_committed(seq_key, batch_key, run_store),
+            on_error=lambda _: batch_failed(seq_key, batch_key, payload.delta)
+        )
+        if not queued:
+            raise HTTPException(status_code=503, detail="Ingest queue is full", headers={"Retry-After": "1"})
+        # The callbacks take ingest_lock, so they cannot run before the batch is registered
+        pending_batches.setdefault(seq_key, {})[batch_key] = new_base
+        acked_seq = committed_seqs.get(seq_key) if payload.seq is not None else None
+    
+    return JSONResponse(status_code=202, content={
+        "status": "accepted",
+        "rsu_id": payload.rsu_id,
+        "run_id": run_id,
+        "queued": len(payload.vehicle_data),
+        "acked_seq": acked_seq,
+        "timestamp": rsu_received_at
+    })
+
+def committed_watermark(seq_key: Tuple[str, str], run_store: TelemetryStore) -> int:
+    """
+    Highest seq of an (RSU, run) below which every batch is committed
+    (call with ingest_lock held)
+    
+    The state of an (RSU, run) the server has not seen since it started is
+    recovered from the run's rsu_batches table.
+    
+    Args:
+        seq_key: (RSU ID, run ID of the batches or "")
+        run_store: Store of the run
+        
+    Returns:
+        Watermark (0 if no batch is committed)
+    """
+    if seq_key not in committed_seqs:
+        committed_seqs[seq_key] = 0
+        with run_store.reader() as conn:
+            for (seq,) in conn.execute(
+                "SELECT seq FROM rsu_batches WHERE rsu_id = ? AND run_id = ? ORDER BY seq", seq_key
+            ):
+                mark_committed(seq_key, seq)
+    return committed_seqs[seq_key]
+
+def mark_committed(seq_key: Tuple[str, str], seq: int):
+    """Record a committed seq and advance the watermark over the seqs now contiguous"""
+    ahead = committed_ahead.setdefault(seq_key, set())
+    ahead.add(seq)
+    watermark = committed_seqs.get(seq_key, 0)
+    while watermark + 1 in ahead:
+        watermark += 1
+        ahead.remove(watermark)
+    committed_seqs[seq_key] = watermark
+
+def batch_committed(seq_key: Tuple[str, str], batch_key, run_store: TelemetryStore):
+    """Writer callback of a committed batch: acknowledge its seq and advance the delta base"""
+    with ingest_lock:
+        new_base = pending_batches.get(seq_key, {}).pop(batch_key, None)
+        if new_base:
+            delta_state.setdefault(seq_key, {}).update(new_base)
+        if isinstance(batch_key, int):
+            # Recover the watermark from rsu_batches if the key's state was dropped
+            # meanwhile, rather than restarting it at 0
+            committed_watermark(seq_key, run_store)
+            mark_committed(seq_key, batch_key)
+
+def batch_failed(seq_key: Tuple[str, str], batch_key, delta: bool):
+    """
+    Writer callback of a batch that was dropped: forget it, so the RSU's resend
+    (its seq stays unacknowledged) is queued again
+    """
+    with ingest_lock:
+        pending_batches.get(seq_key, {}).pop(batch_key, None)
+        if delta:
+            # The RSU encodes its next batches against rows the server never stored;
+            # without a base they are answered with 409 and resent as keyframes
+            delta_state.pop(seq_key, None)
+
+RSU_VEHICLE_LOG_INSERT = """
+    INSERT INTO rsu_vehicle_logs 
+    (ts_utc, rsu_id, rsu_position_x, rsu_position_y, vehicle_id, vehicle_type, 
+     edge_id, lane_id, lane_position, speed, battery_charge, battery_capacity, 
+     battery_percentage, vehicles_ahead_count, same_direction_ahead, 
+     distance_to_traffic_light, next_traffic_light, traffic_light_state, 
+     edge_occupancy_percentage, sim_time, collection_timestamp, rsu_received_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+def rsu_vehicle_log_rows(payload: RSUIngestPayload, rsu_received_at: str) -> List[tuple]:
+    """Parameter tuples of RSU_VEHICLE_LOG_INSERT for every record of a batch"""
+    return [
+        (
             rsu_received_at,
             payload.rsu_id,
             payload.rsu_position[0],
@@ -154,81 +648,355 @@ def ingest_rsu(payload: RSUIngestPayload):
             data.get('sim_time'),
             data.get('collection_timestamp'),
             rsu_received_at
-        ))
-    
-    cur.executemany("""
-        INSERT INTO rsu_vehicle_logs 
-        (ts_utc, rsu_id, rsu_position_x, rsu_position_y, vehicle_id, vehicle_type, 
-         edge_id, lane_id, lane_position, speed, battery_charge, battery_capacity, 
-         battery_percentage, vehicles_ahead_count, same_direction_ahead, 
-         distance_to_traffic_light, next_traffic_light, traffic_light_state, 
-         edge_occupancy_percentage, sim_time, collection_timestamp, rsu_received_at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, records)
+        )
+        for data in payload.vehicle_data
+    ]
+
+RSU_STATS_ROLLUP_UPSERT = """
+    INSERT INTO rsu_stats_rollup
+    (last_update, rsu_id, position_x, position_y, total_vehicles, total_records, batch_count)
+    VALUES (?, ?, ?, ?, ?, ?, 1)
+    ON CONFLICT (rsu_id) DO UPDATE SET
+        position_x = excluded.position_x,
+        position_y = excluded.position_y,
+        total_vehicles = total_vehicles + excluded.total_vehicles,
+        total_records = total_records + excluded.total_records,
+        batch_count = batch_count + 1,
+        last_update = MAX(last_update, excluded.last_update)
+"""
+
+def write_rsu_payload(cur, payload: RSUIngestPayload, rsu_received_at: str) -> Tuple[bool, Optional[int]]:
+    """
+    Insert one RSU batch into rsu_vehicle_logs, log the RSU status and update
+    the RSU's totals in rsu_stats_rollup
+    
+    Batches with a (run_id, seq) are stored at most once: a resent copy of a
+    batch that is already in rsu_batches is skipped.
+    
+    Args:
+        cur: Cursor of the writer connection (the caller commits)
+        payload: Validated batch with full rows
+        rsu_received_at: Receive timestamp stored with the rows
+        
+    Returns:
+        (True if the batch was a duplicate, highest stored seq of the RSU run or None)
+    """
+    acked_seq = None
+    if payload.seq is not None:
+        run_id = payload.run_id or ""
+        cur.execute("""
+            INSERT OR IGNORE INTO rsu_batches (ts_utc, rsu_id, run_id, seq, record_count)
+            VALUES (?, ?, ?, ?, ?)
+        """, (rsu_received_at, payload.rsu_id, run_id, payload.seq, len(payload.vehicle_data)))
+        duplicate = cur.rowcount == 0
+        acked_seq = cur.execute(
+            "SELECT MAX(seq) FROM rsu_batches WHERE rsu_id = ? AND run_id = ?",
+            (payload.rsu_id, run_id)
+        ).fetchone()[0]
+        if duplicate:
+            return True, acked_seq
+    
+    # Insert vehicle data received from RSU with traffic density fields
+    cur.executemany(RSU_VEHICLE_LOG_INSERT, rsu_vehicle_log_rows(payload, rsu_received_at))
     
     # Log RSU status
-    cur.execute("""
-        INSERT INTO rsu_status (ts_utc, rsu_id, position_x, position_y, vehicle_count, data_records)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, (
+    status = (
         rsu_received_at,
         payload.rsu_id,
         payload.rsu_position[0],
         payload.rsu_position[1],
         len(set(data.get('vehicle_id') for data in payload.vehicle_data)),
         len(payload.vehicle_data)
-    ))
+    )
+    cur.execute("""
+        INSERT INTO rsu_status (ts_utc, rsu_id, position_x, position_y, vehicle_count, data_records)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, status)
     
-    conn.commit()
-    conn.close()
+    # Keep the per-RSU totals of /rsu_stats current in the same transaction
+    cur.execute(RSU_STATS_ROLLUP_UPSERT, status)
+    return False, acked_seq
+
+def store_rsu_payload(payload: RSUIngestPayload):
+    """Store one RSU batch in `store` in its own transaction (synchronous path used by the benchmarks)"""
+    rsu_received_at = datetime.utcnow().isoformat(timespec="seconds") + "Z"
+    with store.writer() as cur:
+        duplicate, acked_seq = write_rsu_payload(cur, payload, rsu_received_at)
     
     return {
-        "status": "ok",
+        "status": "duplicate" if duplicate else "ok",
         "rsu_id": payload.rsu_id,
-        "inserted": len(payload.vehicle_data),
+        "inserted": 0 if duplicate else len(payload.vehicle_data),
+        "acked_seq": acked_seq,
         "timestamp": rsu_received_at
     }
 
+# Endpoint to ingest per-edge rollups from RSUs running in aggregation mode
+@app.post("/ingest_edge_stats")
+def ingest_edge_stats(payload: EdgeStatsPayload):
+    if not payload.edge_stats:
+        raise HTTPException(status_code=400, detail="Empty edge stats")
+    received_at = datetime.utcnow().isoformat(timespec="seconds") + "Z"
+    run_id, run_store, _ = run_storage(payload.run_id)
+    with run_store.writer() as cur:
+        cur.executemany("""
+            INSERT INTO rsu_edge_stats
+            (ts_utc, rsu_id, edge_id, window_start, window_end, sample_count, vehicle_count,
+             mean_speed, mean_occupancy, mean_battery_percentage, min_battery_percentage)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (received_at, payload.rsu_id, row.edge_id, row.window_start, row.window_end,
+             row.sample_count, row.vehicle_count, row.mean_speed, row.mean_occupancy,
+             row.mean_battery_percentage, row.min_battery_percentage)
+            for row in payload.edge_stats
+        ])
+    return {"status": "ok", "rsu_id": payload.rsu_id, "run_id": run_id, "inserted": len(payload.edge_stats),
+            "timestamp": received_at}
+
+# Endpoint to check on the write queue of a run (and the acknowledged batches of an RSU)
+@app.get("/ingest_status")
+def get_ingest_status(run_id: Optional[str] = None, rsu_id: Optional[str] = None):
+    resolved_run_id, run_store, run_queue = existing_run_storage(run_id)
+    with run_queue.pending_lock:
+        pending_rows = run_queue.pending_rows
+    status = {
+        "run_id": resolved_run_id,
+        "pending_rows": pending_rows,
+        "committed_rows": run_queue.committed_rows,
+        "failed_jobs": run_queue.failed_jobs,
+        "last_error": run_queue.last_error
+    }
+    if rsu_id is not None:
+        seq_key = (rsu_id, run_id or "")
+        with ingest_lock:
+            status["rsu_id"] = rsu_id
+            status["acked_seq"] = committed_watermark(seq_key, run_store)
+            status["pending_batches"] = len(pending_batches.get(seq_key, {}))
+    return status
+
 # Endpoint to get RSU statistics
 @app.get("/rsu_stats")
-def get_rsu_stats():
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    
-    # Get latest status for each RSU
-    cur.execute("""
-        SELECT rsu_id, position_x, position_y, 
-               SUM(vehicle_count) as total_vehicles, 
-               SUM(data_records) as total_records,
-               MAX(ts_utc) as last_update
-        FROM rsu_status
-        GROUP BY rsu_id
-    """)
+def get_rsu_stats(run_id: Optional[str] = None):
+    # Totals per RSU of the run (default: current run), maintained by write_rsu_payload
+    # (one row per RSU, independent of history size)
+    if run_id is None and current_run_id is None:
+        return {"run_id": None, "rsu_stats": []}
+    run_id, run_store, _ = existing_run_storage(run_id)
+    with run_store.reader() as conn:
+        rows = conn.execute("""
+            SELECT rsu_id, position_x, position_y, total_vehicles, total_records, last_update, batch_count
+            FROM rsu_stats_rollup
+        """).fetchall()
     
     stats = []
-    for row in cur.fetchall():
+    for row in rows:
         stats.append({
             "rsu_id": row[0],
             "position": (row[1], row[2]),
             "total_vehicles": row[3],
             "total_records": row[4],
-            "last_update": row[5]
+            "last_update": row[5],
+            "batch_count": row[6]
+        })
+    
+    return {"run_id": run_id, "rsu_stats": stats}
+
+# Keyset pagination of rsu_vehicle_logs: pages are ordered by (sim_time, id), and a
+# page's next_cursor "<sim_time>:<id>" is its last key. Every query filters on the
+# leading column of one of the migration 2 indexes, so a page is an index range scan
+# starting at the cursor, whatever its depth (OFFSET would rescan all earlier rows).
+DEFAULT_PAGE_LIMIT = 1000
+MAX_PAGE_LIMIT = 10000
+STREAM_FETCH_SIZE = 500  # Rows fetched from SQLite per chunk of a streamed page
+
+def parse_cursor(cursor: Optional[str]) -> Optional[Tuple[float, int]]:
+    """Decode a next_cursor token into its (sim_time, id) key"""
+    if cursor is None:
+        return None
+    try:
+        sim_time, row_id = cursor.rsplit(":", 1)
+        return float(sim_time), int(row_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor {cursor!r}")
+
+def stream_vehicle_log_page(run_id: Optional[str], conditions: List[str], params: List[Any],
+                            start: Optional[float], end: Optional[float], cursor: Optional[str],
+                            limit: int) -> StreamingResponse:
+    """
+    Stream one keyset page of rsu_vehicle_logs as JSON
+    
+    The body is {"run_id", "records": [...], "count", "next_cursor"}; rows are
+    written as they are fetched, so memory stays bounded by STREAM_FETCH_SIZE
+    rows whatever the page size. next_cursor is null on the last page.
+    
+    Args:
+        run_id: Run to query (default: current run)
+        conditions: Equality conditions on the leading index column, ANDed together
+        params: Parameters of the conditions
+        start: Lowest sim_time (inclusive), or None
+        end: Highest sim_time (inclusive), or None
+        cursor: next_cursor of the previous page, or None for the first page
+        limit: Maximum rows in the page
+        
+    Returns:
+        StreamingResponse with the page
+    """
+    if not 1 <= limit <= MAX_PAGE_LIMIT:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_PAGE_LIMIT}")
+    key = parse_cursor(cursor)
+    conditions, params = list(conditions), list(params)
+    # The cursor's sim_time is the lower bound of the index range; with the window start
+    # as the bound instead, SQLite would scan every earlier row of the window again
+    if key is not None:
+        start = key[0] if start is None else max(start, key[0])
+    if start is not None:
+        conditions.append("sim_time >= ?")
+        params.append(start)
+    if end is not None:
+        conditions.append("sim_time <= ?")
+        params.append(end)
+    if key is not None:
+        conditions.append("(sim_time, id) > (?, ?)")
+        params.extend(key)
+    run_id, run_store, _ = existing_run_storage(run_id)
+    sql = f"""
+        SELECT * FROM rsu_vehicle_logs
+        WHERE {" AND ".join(conditions)}
+        ORDER BY sim_time, id
+        LIMIT ?
+    """
+    
+    def generate():
+        with run_store.reader() as conn:
+            rows = conn.execute(sql, params + [limit])
+            columns = [description[0] for description in rows.description]
+            yield '{"run_id": ' + json.dumps(run_id) + ', "records": ['
+            count = 0
+            last = None
+            while True:
+                chunk = rows.fetchmany(STREAM_FETCH_SIZE)
+                if not chunk:
+                    break
+                # One string per chunk: each yield costs a threadpool round trip in StreamingResponse
+                records = [json.dumps(dict(zip(columns, row))) for row in chunk]
+                yield ("," if count else "") + ",".join(records)
+                count += len(chunk)
+                last = (chunk[-1][columns.index("sim_time")], chunk[-1][columns.index("id")])
+        next_cursor = f"{last[0]!r}:{last[1]}" if count == limit else None
+        yield '], "count": ' + str(count) + ', "next_cursor": ' + json.dumps(next_cursor) + '}'
+    
+    return StreamingResponse(generate(), media_type="application/json")
+
+# Endpoint to page through the trajectory of one vehicle (index on vehicle_id, sim_time)
+@app.get("/trajectory/{vehicle_id}")
+def get_trajectory(vehicle_id: str, run_id: Optional[str] = None, start: Optional[float] = None,
+                   end: Optional[float] = None, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_LIMIT):
+    return stream_vehicle_log_page(run_id, ["vehicle_id = ?"], [vehicle_id], start, end, cursor, limit)
+
+# Endpoint to page through all records of a sim-time window (index on sim_time)
+@app.get("/time_window")
+def get_time_window(start: float, end: float, run_id: Optional[str] = None, cursor: Optional[str] = None,
+                    limit: int = DEFAULT_PAGE_LIMIT):
+    return stream_vehicle_log_page(run_id, [], [], start, end, cursor, limit)
+
+# Endpoint to page through the records of one edge (index on edge_id, sim_time)
+@app.get("/edge/{edge_id}")
+def get_edge_slice(edge_id: str, run_id: Optional[str] = None, start: Optional[float] = None,
+                   end: Optional[float] = None, cursor: Optional[str] = None, limit: int = DEFAULT_PAGE_LIMIT):
+    return stream_vehicle_log_page(run_id, ["edge_id = ?"], [edge_id], start, end, cursor, limit)
+
+# Endpoint to export a whole table of a run as CSV or Parquet, streamed in fetchmany() chunks
+# (vehicle_logs of the legacy /ingest endpoint is always exported from telemetry.db)
+@app.get("/export/{table}")
+def export_table(table: str, run_id: Optional[str] = None, format: str = telemetry_export.CSV):
+    if table not in telemetry_export.EXPORT_TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown table {table} (use one of {list(telemetry_export.EXPORT_TABLES)})")
+    if format not in telemetry_export.MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unknown format {format} (use one of {list(telemetry_export.MEDIA_TYPES)})")
+    try:
+        telemetry_export.check_format(format)
+    except telemetry_export.ExportFormatUnavailableError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    if table == "vehicle_logs":
+        run_id, run_store = None, store
+    else:
+        run_id, run_store, _ = existing_run_storage(run_id)
+    
+    def generate():
+        with run_store.reader() as conn:
+            yield from telemetry_export.iter_export(conn, table, format)
+    
+    filename = f"{table}_{run_id}.{format}" if run_id else f"{table}.{format}"
+    return StreamingResponse(generate(), media_type=telemetry_export.MEDIA_TYPES[format],
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+# Endpoints to manage runs
+@app.post("/runs")
+def start_run(request: Optional[RunRequest] = None):
+    request = request or RunRequest()
+    run_id = register_run(request.run_id, request.description)
+    return {"status": "ok", "run_id": run_id, "current": True}
+
+@app.get("/runs")
+def list_runs():
+    with store.reader() as conn:
+        rows = conn.execute("""
+            SELECT run_id, started_at, db_file, description, implicit FROM runs
+            WHERE dropped_at IS NULL ORDER BY rowid
+        """).fetchall()
+    runs = []
+    for run_id, started_at, db_file, description, implicit in rows:
+        db_path = os.path.join(os.path.dirname(os.path.abspath(DB_PATH)), db_file) if db_file else DB_PATH
+        runs.append({
+            "run_id": run_id,
+            "started_at": started_at,
+            "db_file": db_file or DB_PATH,
+            "size_bytes": sum(os.path.getsize(path) for path in (db_path, db_path + "-wal") if os.path.exists(path)),
+            "description": description,
+            "implicit": bool(implicit),
+            "current": run_id == current_run_id
         })
+    return {"current_run_id": current_run_id, "runs": runs}
+
+@app.delete("/runs/{run_id}")
+def drop_run(run_id: str):
+    with runs_lock:
+        check_not_dropped(run_id)
+        if run_id not in run_files:
+            raise HTTPException(status_code=404, detail=f"Unknown run {run_id}")
+        if run_id == current_run_id:
+            raise HTTPException(status_code=409, detail="Cannot drop the current run; start a new run first")
+        db_file = run_files.pop(run_id)
+        dropped_runs.add(run_id)
+        with store.writer() as cur:
+            cur.execute("UPDATE runs SET dropped_at = ? WHERE run_id = ?",
+                        (datetime.utcnow().isoformat(timespec="seconds") + "Z", run_id))
     
-    conn.close()
-    return {"rsu_stats": stats}
+    if db_file is None:
+        # Data from before run partitioning shares telemetry.db with the catalogue
+        ingest_queue.flush()
+        with store.writer() as cur:
+            for table in ("rsu_vehicle_logs", "rsu_status", "rsu_stats_rollup", "rsu_edge_stats", "rsu_batches"):
+                cur.execute(f"DELETE FROM {table}")
+    else:
+        run_partitions.drop(run_id)  # Close and unlink the run's file
+    with ingest_lock:
+        for state in (committed_seqs, committed_ahead, pending_batches, delta_state):
+            for key in [key for key in state if key[1] == run_id]:
+                del state[key]
+    return {"status": "dropped", "run_id": run_id}
 
-# Endpoint to clear the vehicle_logs table
+# Endpoint to clear data before a run: starts a new run, earlier runs are kept
 @app.delete("/clear_data")
 def clear_data():
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.execute("DELETE FROM vehicle_logs")  # Clears all data in the table
-    cur.execute("DELETE FROM rsu_vehicle_logs")  # Clear RSU-based logs
-    cur.execute("DELETE FROM rsu_status")  # Clear RSU status
-    conn.commit()
-    conn.close()
-    return {"status": "All data cleared"}
+    run_id = register_run()
+    with ingest_lock:
+        # Batches without a run_id (key run "") go to the new run from now on; the
+        # state of runs named by their batches is theirs and stays
+        for state in (committed_seqs, committed_ahead, pending_batches, delta_state):
+            for key in [key for key in state if key[1] == ""]:
+                del state[key]
+    return {"status": "New run started", "run_id": run_id}
 
 if __name__ == "__main__":
     import uvicorn
@@ -236,6 +1004,15 @@ if __name__ == "__main__":
     print("Starting FastAPI server on http://127.0.0.1:8000")
     print("RSU data ingestion endpoints:")
     print("  POST /ingest_rsu - Receive vehicle data from RSUs")
-    print("  GET /rsu_stats - Get RSU statistics")
-    print("  DELETE /clear_data - Clear all data")
+    print("  POST /ingest_edge_stats - Receive per-edge rollups from RSUs")
+    print("  GET /ingest_status - Write queue of a run and acknowledged batches of an RSU")
+    print("  GET /rsu_stats - Get RSU statistics of a run")
+    print("  GET /trajectory/{vehicle_id} - Page through a vehicle's records")
+    print("  GET /time_window?start=&end= - Page through a sim-time window")
+    print("  GET /edge/{edge_id} - Page through an edge's records")
+    print("  GET /export/{table}?format=csv|parquet - Stream a table of a run")
+    print("  POST /runs - Start a new run")
+    print("  GET /runs - List runs")
+    print("  DELETE /runs/{run_id} - Drop a run")
+    print("  DELETE /clear_data - Start a new run (earlier runs are kept)")
     uvicorn.run(app, host="127.0.0.1", port=8000)
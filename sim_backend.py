@@ -0,0 +1,84 @@
+"""
+Simulation Backend Module
+Selects how the scripts talk to SUMO: `traci` (socket connection to a SUMO
+process, supports sumo-gui) or `libsumo` (SUMO loaded in-process, same API,
+no socket serialization, headless only).
+
+The backend is chosen once at startup with the SUMO_BACKEND environment
+variable, e.g.
+
+    SUMO_BACKEND=libsumo python traCI_rsu.py
+
+Scripts import the selected module instead of importing traci directly:
+
+    from sim_backend import traci, start_sumo
+"""
+
+import os
+
+SUPPORTED_BACKENDS = ("traci", "libsumo")
+
+# Options only understood by sumo-gui; dropped when running headless
+GUI_ONLY_OPTIONS = ("--start", "--quit-on-end")
+
+
+def load_backend(name: str = None):
+    """
+    Import the requested SUMO control library
+
+    Args:
+        name: 'traci' or 'libsumo' (default: SUMO_BACKEND env var, else 'traci')
+
+    Returns:
+        (backend name, backend module)
+    """
+    name = (name or os.environ.get("SUMO_BACKEND", "traci")).strip().lower()
+    if name not in SUPPORTED_BACKENDS:
+        raise ValueError(f"Unknown SUMO backend '{name}', expected one of {SUPPORTED_BACKENDS}")
+
+    if name == "libsumo":
+        try:
+            import libsumo as backend
+            return name, backend
+        except ImportError as e:
+            print(f"[Backend] libsumo not available ({e}), falling back to traci")
+            name = "traci"
+
+    import traci as backend
+    return name, backend
+
+
+BACKEND_NAME, traci = load_backend()
+
+
+def use_gui(gui: bool = True) -> bool:
+    """
+    Decide whether sumo-gui can be used
+
+    libsumo cannot drive sumo-gui, and SUMO_GUI=0 forces headless runs.
+
+    Args:
+        gui: Whether the caller would like the GUI
+
+    Returns:
+        True if sumo-gui should be started
+    """
+    if BACKEND_NAME == "libsumo":
+        return False
+    if os.environ.get("SUMO_GUI", "1").strip().lower() in ("0", "false", "no"):
+        return False
+    return gui
+
+
+def start_sumo(config_file: str = "CustomRoadNetwork.sumocfg", gui: bool = True, extra_args=()):
+    """
+    Start SUMO with the selected backend
+
+    Args:
+        config_file: SUMO configuration file
+        gui: Start sumo-gui when the backend allows it
+        extra_args: Additional command-line options for SUMO
+    """
+    gui = use_gui(gui)
+    args = [a for a in extra_args if gui or a not in GUI_ONLY_OPTIONS]
+    traci.start(["sumo-gui" if gui else "sumo", "-c", config_file, *args])
@@ -0,0 +1,221 @@
+"""
+Telemetry Export Module
+Streams telemetry tables out of SQLite in bounded memory, for the server's
+/export endpoint and the offline mode of extract_data.py.
+
+Formats:
+    csv       header line, then rows written fetchmany() chunk by chunk
+    parquet   one Parquet row group per chunk, snappy-compressed
+              (requires the optional pyarrow package)
+
+Rows are read with a cursor and fetchmany(), and every chunk is encoded and
+handed out before the next one is read, so memory stays bounded by the chunk
+size whatever the table size.
+"""
+
+import csv
+import io
+import os
+import sqlite3
+from typing import Dict, Iterator, List, Tuple, Union
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # optional dependency
+    pyarrow = None
+
+CSV = "csv"
+PARQUET = "parquet"
+
+MEDIA_TYPES = {
+    CSV: "text/csv",
+    PARQUET: "application/vnd.apache.parquet",
+}
+
+# Exportable tables and their row order; rsu_vehicle_logs is read in order of
+# its sim_time index, the others in insertion order, so no export needs a sort
+EXPORT_TABLES: Dict[str, str] = {
+    'rsu_vehicle_logs': "sim_time, id",
+    'rsu_status': "id",
+    'rsu_edge_stats': "id",
+    'vehicle_logs': "id",
+}
+
+CSV_CHUNK_ROWS = 5000
+PARQUET_CHUNK_ROWS = 50000
+
+
+class ExportFormatUnavailableError(ValueError):
+    """Raised for an export format that is unknown or needs a package that is not installed"""
+
+
+def available_formats() -> List[str]:
+    """Export formats usable with the installed packages"""
+    return [fmt for fmt in (CSV, PARQUET) if fmt != PARQUET or pyarrow is not None]
+
+
+def check_format(fmt: str):
+    """
+    Raise ExportFormatUnavailableError unless fmt can be exported
+
+    Args:
+        fmt: 'csv' or 'parquet'
+    """
+    if fmt not in MEDIA_TYPES:
+        raise ExportFormatUnavailableError(f"Unknown export format {fmt!r} (use one of {list(MEDIA_TYPES)})")
+    if fmt == PARQUET and pyarrow is None:
+        raise ExportFormatUnavailableError("Parquet export requires pyarrow (pip install pyarrow)")
+
+
+def check_table(table: str):
+    """Raise ValueError unless table is in EXPORT_TABLES"""
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"Unknown table {table!r} (use one of {list(EXPORT_TABLES)})")
+
+
+def _select(conn: sqlite3.Connection, table: str) -> sqlite3.Cursor:
+    check_table(table)
+    return conn.execute(f"SELECT * FROM {table} ORDER BY {EXPORT_TABLES[table]}")
+
+
+def iter_csv(conn: sqlite3.Connection, table: str, chunk_rows: int = CSV_CHUNK_ROWS) -> Iterator[str]:
+    """
+    Stream a table as CSV
+
+    Args:
+        conn: Connection to read from
+        table: Name of a table in EXPORT_TABLES
+        chunk_rows: Rows fetched and encoded per yielded chunk
+
+    Yields:
+        CSV text, header first
+    """
+    rows = _select(conn, table)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([description[0] for description in rows.description])
+    while True:
+        chunk = rows.fetchmany(chunk_rows)
+        if chunk:
+            writer.writerows(chunk)
+        if buffer.tell():
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if not chunk:
+            return
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file collecting what the Parquet writer emits until it is taken"""
+
+    def __init__(self):
+        super().__init__()
+        self.chunks: List[bytes] = []
+        self.position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self.position
+
+    def take(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def _arrow_schema(conn: sqlite3.Connection, table: str):
+    """Arrow schema from the declared SQLite column types (INTEGER, REAL, anything else as text)"""
+    arrow_types = {'INTEGER': pyarrow.int64(), 'REAL': pyarrow.float64()}
+    return pyarrow.schema([
+        (name, arrow_types.get(declared_type.upper(), pyarrow.string()))
+        for _, name, declared_type, *_ in conn.execute(f"PRAGMA table_info({table})")
+    ])
+
+
+def iter_parquet(conn: sqlite3.Connection, table: str, chunk_rows: int = PARQUET_CHUNK_ROWS) -> Iterator[bytes]:
+    """
+    Stream a table as a Parquet file, one row group per chunk
+
+    Args:
+        conn: Connection to read from
+        table: Name of a table in EXPORT_TABLES
+        chunk_rows: Rows per row group
+
+    Yields:
+        Consecutive pieces of the Parquet file (footer last)
+    """
+    check_format(PARQUET)
+    schema = _arrow_schema(conn, table)
+    rows = _select(conn, table)
+    sink = _ChunkSink()
+    writer = pyarrow.parquet.ParquetWriter(sink, schema, compression="snappy")
+    try:
+        while True:
+            chunk = rows.fetchmany(chunk_rows)
+            if not chunk:
+                break
+            arrays = []
+            for field, column in zip(schema, zip(*chunk)):
+                if field.type == pyarrow.string():
+                    # SQLite columns are dynamically typed; text columns may hold numbers
+                    column = [None if value is None else str(value) for value in column]
+                arrays.append(pyarrow.array(column, type=field.type))
+            writer.write_table(pyarrow.Table.from_arrays(arrays, schema=schema))
+            yield sink.take()
+    finally:
+        writer.close()
+    yield sink.take()
+
+
+def iter_export(conn: sqlite3.Connection, table: str, fmt: str) -> Iterator[Union[str, bytes]]:
+    """
+    Stream a table in the given format
+
+    Args:
+        conn: Connection to read from
+        table: Name of a table in EXPORT_TABLES
+        fmt: 'csv' or 'parquet'
+
+    Returns:
+        Iterator over the pieces of the exported file (str for CSV, bytes for Parquet)
+    """
+    check_format(fmt)
+    if fmt == PARQUET:
+        return iter_parquet(conn, table)
+    return iter_csv(conn, table)
+
+
+def export_table(db_path: str, table: str, fmt: str, out_path: str) -> Tuple[int, int]:
+    """
+    Export one table of a database file to a file, in bounded memory
+
+    Args:
+        db_path: SQLite database to read (opened read-only)
+        table: Name of a table in EXPORT_TABLES
+        fmt: 'csv' or 'parquet'
+        out_path: File to write
+
+    Returns:
+        (rows exported, bytes written)
+    """
+    check_format(fmt)
+    check_table(table)
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        row_count = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        with open(out_path, "w", newline="", encoding="utf-8") if fmt == CSV else open(out_path, "wb") as f:
+            for piece in iter_export(conn, table, fmt):
+                f.write(piece)
+    finally:
+        conn.close()
+    return row_count, os.path.getsize(out_path)
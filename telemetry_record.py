@@ -0,0 +1,122 @@
+"""
+Telemetry Record Module
+Compact per-sample record of the EV telemetry collected by the RSUs
+"""
+
+import sys
+import time
+from dataclasses import dataclass, fields
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple, Union
+
+# Fields whose values repeat across samples (IDs and states); these are
+# interned so every record of e.g. the same edge shares one string object
+INTERNED_FIELDS = (
+    'vehicle_id', 'vehicle_type', 'edge_id', 'lane_id',
+    'next_traffic_light', 'traffic_light_state', 'rsu_id',
+)
+
+
+@dataclass(slots=True)
+class VehicleRecord:
+    """
+    One telemetry sample of an EV
+
+    Replaces the per-sample dictionaries: a slotted record has no per-instance
+    __dict__ and is filled in place by the RSU instead of being copied. It
+    still supports read-only mapping access (record['speed'], .get(), .keys())
+    so code written against the dictionaries keeps working.
+    """
+    vehicle_id: str
+    vehicle_type: str
+    speed: float
+    edge_id: str
+    lane_id: str
+    lane_position: float
+    vehicles_ahead_count: int
+    same_direction_ahead: int
+    distance_to_traffic_light: float
+    next_traffic_light: str
+    traffic_light_state: str
+    time_to_red_light: float
+    edge_occupancy_percentage: float
+    battery_charge: float
+    battery_capacity: float
+    battery_percentage: float
+    sim_time: float
+    position: Tuple[float, float]
+    rsu_id: Optional[str] = None
+    collection_timestamp: Optional[str] = None
+
+    def __post_init__(self):
+        for name in INTERNED_FIELDS:
+            value = getattr(self, name)
+            if type(value) is str:
+                setattr(self, name, sys.intern(value))
+
+    def keys(self) -> Tuple[str, ...]:
+        return FIELD_NAMES
+
+    def __getitem__(self, key: str):
+        if key not in FIELD_SET:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __contains__(self, key: str) -> bool:
+        return key in FIELD_SET
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in FIELD_SET else default
+
+    def to_dict(self) -> Dict:
+        """Plain dictionary of the record (JSON export, spool)"""
+        return {name: getattr(self, name) for name in FIELD_NAMES}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "VehicleRecord":
+        """
+        Build a record from a telemetry dictionary
+
+        Args:
+            data: Dictionary with (at least) every required record field
+
+        Returns:
+            VehicleRecord
+        """
+        return cls(**{name: data[name] for name in FIELD_NAMES if name in data})
+
+
+FIELD_NAMES: Tuple[str, ...] = tuple(f.name for f in fields(VehicleRecord))
+FIELD_SET = frozenset(FIELD_NAMES)
+
+
+def as_dict(record: Union[VehicleRecord, Dict]) -> Dict:
+    """
+    Dictionary view of a buffered record
+
+    Args:
+        record: VehicleRecord or a legacy telemetry dictionary
+
+    Returns:
+        The dictionary itself, or the record converted to one
+    """
+    return record.to_dict() if isinstance(record, VehicleRecord) else record
+
+
+_timestamp_second = None
+_timestamp_value = None
+
+
+def collection_timestamp() -> str:
+    """
+    Current UTC time as an ISO-8601 string with second resolution
+
+    The string is rebuilt once per wall-clock second; every record collected
+    within that second shares the same object.
+    """
+    global _timestamp_second, _timestamp_value
+    now = int(time.time())
+    if now != _timestamp_second:
+        _timestamp_value = datetime.fromtimestamp(now, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        _timestamp_second = now
+    return _timestamp_value
@@ -0,0 +1,354 @@
+"""
+Telemetry Store Module
+SQLite access for the ingest server: one long-lived writer connection in WAL
+mode shared by all requests, and a small pool of read-only connections for
+queries (WAL readers never block the writer, and the writer never blocks them).
+Each simulation run is kept in its own database file (RunPartitions).
+"""
+
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Run IDs double as file names of the per-run databases
+RUN_ID_PATTERN = re.compile(r"^[A-Za-z0-9_.-]{1,64}$")
+
+# Queued GroupCommitWriter job: (job, rows, on_commit, on_error)
+WriteJob = Tuple[Callable[[sqlite3.Cursor], Any], int, Optional[Callable[[Any], None]],
+                 Optional[Callable[[Exception], None]]]
+
+
+class TelemetryStore:
+    """Persistent connections to the telemetry database"""
+
+    def __init__(self, db_path: str, read_pool_size: int = 4, synchronous: str = "NORMAL",
+                 cache_size_kib: int = 65536):
+        """
+        Initialize Telemetry Store
+
+        Args:
+            db_path: Path of the SQLite database file
+            read_pool_size: Maximum number of pooled read-only connections
+            synchronous: PRAGMA synchronous of the writer ('NORMAL' is durable
+                         across application crashes in WAL mode and only fsyncs
+                         on checkpoints; 'FULL' also survives power loss)
+            cache_size_kib: Page cache size per connection in KiB
+        """
+        self.db_path = db_path
+        self.synchronous = synchronous
+        self.cache_size_kib = cache_size_kib
+        self.write_lock = threading.RLock()  # One writer at a time (SQLite allows no more)
+        self.write_conn = self._connect_writer()
+        self.read_pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=read_pool_size)
+
+    def _connect_writer(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute(f"PRAGMA cache_size=-{self.cache_size_kib}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    def _connect_reader(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False, timeout=30)
+        conn.execute(f"PRAGMA cache_size=-{self.cache_size_kib}")
+        return conn
+
+    @contextmanager
+    def writer(self) -> Iterator[sqlite3.Cursor]:
+        """
+        Run one write transaction on the shared writer connection
+
+        Commits when the block exits normally and rolls back on an exception.
+
+        Yields:
+            Cursor of the writer connection
+        """
+        with self.write_lock:
+            cur = self.write_conn.cursor()
+            try:
+                yield cur
+                self.write_conn.commit()
+            except BaseException:
+                self.write_conn.rollback()
+                raise
+            finally:
+                cur.close()
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a read-only connection from the pool
+
+        Yields:
+            Read-only connection (returned to the pool afterwards)
+        """
+        try:
+            conn = self.read_pool.get_nowait()
+        except queue.Empty:
+            conn = self._connect_reader()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            try:
+                self.read_pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def close(self):
+        """Close the writer and every pooled reader"""
+        while True:
+            try:
+                self.read_pool.get_nowait().close()
+            except queue.Empty:
+                break
+        with self.write_lock:
+            self.write_conn.close()
+
+
+class GroupCommitWriter:
+    """
+    Background writer that coalesces queued writes into few transactions
+
+    Request handlers submit write jobs and return immediately; a single thread
+    drains the queue and commits every max_delay seconds or max_rows rows,
+    whichever comes first, so one fsync covers many requests. If a group
+    fails, its jobs are retried one transaction each so a bad job cannot take
+    the rest of the group down with it.
+
+    A job's on_commit callback runs on the writer thread once its transaction
+    has committed, and its on_error callback once it has failed on its own,
+    so the submitter learns the outcome of every job it queued.
+    """
+
+    def __init__(self, store: TelemetryStore, max_delay: float = 0.05, max_rows: int = 5000,
+                 max_pending_rows: int = 200000):
+        """
+        Initialize and start the writer thread
+
+        Args:
+            store: Store whose writer connection is used
+            max_delay: Maximum seconds a queued job waits for its group to fill
+            max_rows: Rows per group commit
+            max_pending_rows: Queued rows above which submit() refuses new jobs
+        """
+        self.store = store
+        self.max_delay = max_delay
+        self.max_rows = max_rows
+        self.max_pending_rows = max_pending_rows
+        self.queue: "queue.Queue[Optional[WriteJob]]" = queue.Queue()
+        self.pending_rows = 0  # Rows queued but not yet committed
+        self.pending_lock = threading.Lock()
+        self.committed_rows = 0
+        self.failed_jobs = 0  # Jobs dropped after failing in a transaction of their own
+        self.last_error: Optional[str] = None  # Error of the last dropped job
+        self.thread = threading.Thread(target=self._run, name="ingest-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, job: Callable[[sqlite3.Cursor], Any], rows: int,
+               on_commit: Optional[Callable[[Any], None]] = None,
+               on_error: Optional[Callable[[Exception], None]] = None) -> bool:
+        """
+        Queue a write job
+
+        Args:
+            job: Function executing the job's statements on the writer cursor
+            rows: Number of rows the job writes (for grouping and backpressure)
+            on_commit: Called with the job's return value after its transaction committed
+            on_error: Called with the exception if the job failed and was dropped
+
+        Returns:
+            False if the queue is full and the job was not accepted
+        """
+        with self.pending_lock:
+            if self.pending_rows + rows > self.max_pending_rows and self.pending_rows > 0:
+                return False
+            self.pending_rows += rows
+        self.queue.put((job, rows, on_commit, on_error))
+        return True
+
+    def _run(self):
+        """Collect jobs into groups and commit them until a stop sentinel is received"""
+        while True:
+            item = self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                return
+            group = [item]
+            rows = item[1]
+            deadline = time.monotonic() + self.max_delay
+            stop = False
+            while rows < self.max_rows:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                group.append(item)
+                rows += item[1]
+
+            self._commit(group)
+            with self.pending_lock:
+                self.pending_rows -= rows
+            for _ in group:
+                self.queue.task_done()
+            if stop:
+                self.queue.task_done()
+                return
+
+    def _commit(self, group: List["WriteJob"]):
+        try:
+            with self.store.writer() as cur:
+                results = [job(cur) for job, *_ in group]
+        except Exception as e:
+            if len(group) == 1:
+                _, rows, _, on_error = group[0]
+                self.failed_jobs += 1
+                self.last_error = str(e)
+                print(f"[Ingest Queue] Dropped a write of {rows} rows: {e}")
+                if on_error is not None:
+                    on_error(e)
+                return
+            for job in group:
+                self._commit([job])
+            return
+        self.committed_rows += sum(rows for _, rows, _, _ in group)
+        for (_, _, on_commit, _), result in zip(group, results):
+            if on_commit is not None:
+                on_commit(result)
+
+    def flush(self):
+        """Block until every queued job has been committed"""
+        self.queue.join()
+
+    def stop(self):
+        """Commit the queued jobs and stop the writer thread"""
+        self.queue.put(None)
+        self.thread.join()
+
+
+class RunPartitions:
+    """
+    One database file per simulation run
+
+    Every run has its own TelemetryStore and GroupCommitWriter over
+    <directory>/<run_id>.db, opened on first use. Queries scoped to a run
+    only touch that file, and dropping a run closes and unlinks it instead of
+    deleting its rows from a shared table.
+    """
+
+    def __init__(self, directory: str, init_store: Callable[[TelemetryStore], None],
+                 max_delay: float = 0.05, max_rows: int = 5000):
+        """
+        Initialize Run Partitions
+
+        Args:
+            directory: Directory of the per-run database files
+            init_store: Function creating or upgrading the schema of a run's store
+            max_delay: max_delay of each run's GroupCommitWriter
+            max_rows: max_rows of each run's GroupCommitWriter
+        """
+        self.directory = directory
+        self.init_store = init_store
+        self.max_delay = max_delay
+        self.max_rows = max_rows
+        self.open_runs: Dict[str, Tuple[TelemetryStore, GroupCommitWriter]] = {}
+        self.lock = threading.Lock()
+
+    def path(self, run_id: str) -> str:
+        """
+        Database file of a run
+
+        Raises:
+            ValueError: If the run ID is not usable as a file name
+        """
+        if not RUN_ID_PATTERN.match(run_id) or run_id in (".", ".."):
+            raise ValueError(f"Invalid run ID {run_id!r} (use 1-64 letters, digits, '_', '-' or '.')")
+        return os.path.join(self.directory, f"{run_id}.db")
+
+    def open(self, run_id: str) -> Tuple[TelemetryStore, GroupCommitWriter]:
+        """
+        Store and write queue of a run, creating its database file if needed
+
+        Args:
+            run_id: Run ID
+
+        Returns:
+            (TelemetryStore, GroupCommitWriter) of the run
+        """
+        with self.lock:
+            if run_id not in self.open_runs:
+                path = self.path(run_id)
+                os.makedirs(self.directory, exist_ok=True)
+                run_store = TelemetryStore(path)
+                self.init_store(run_store)
+                self.open_runs[run_id] = (run_store, GroupCommitWriter(run_store, self.max_delay, self.max_rows))
+            return self.open_runs[run_id]
+
+    def drop(self, run_id: str):
+        """Commit a run's queued writes, close it and delete its database file"""
+        path = self.path(run_id)
+        with self.lock:
+            opened = self.open_runs.pop(run_id, None)
+            if opened:
+                run_store, writer = opened
+                writer.stop()
+                run_store.close()
+            for suffix in ("", "-wal", "-shm"):
+                try:
+                    os.remove(path + suffix)
+                except FileNotFoundError:
+                    pass
+
+    def close(self):
+        """Commit the queued writes of every open run and close their stores"""
+        with self.lock:
+            for run_store, writer in self.open_runs.values():
+                writer.stop()
+                run_store.close()
+            self.open_runs.clear()
+
+
+def run_db_path(db_path: str, run_id: Optional[str] = None) -> str:
+    """
+    Database file holding a run's telemetry, for scripts reading SQLite directly
+
+    Args:
+        db_path: Main database (telemetry.db) with the runs table
+        run_id: Run ID (default: the most recently started run)
+
+    Returns:
+        Path of the run's database file; db_path itself if the run is stored
+        there (data from before run partitioning) or no runs are registered
+    """
+    if not os.path.exists(db_path):
+        return db_path
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(runs)")}
+        live = "dropped_at IS NULL" if "dropped_at" in columns else "1"
+        if run_id is None:
+            row = conn.execute(f"SELECT db_file FROM runs WHERE {live} ORDER BY rowid DESC LIMIT 1").fetchone()
+        else:
+            row = conn.execute(f"SELECT db_file FROM runs WHERE run_id = ? AND {live}", (run_id,)).fetchone()
+            if row is None:
+                raise ValueError(f"Unknown or dropped run {run_id!r}")
+    except sqlite3.OperationalError:  # No runs table yet
+        row = None
+    finally:
+        conn.close()
+    if row is None or row[0] is None:
+        return db_path
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), row[0])
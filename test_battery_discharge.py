@@ -1,18 +1,19 @@
 """
 Longer test to see battery discharge over time
 """
-import traci
+from sim_backend import traci, start_sumo
 from rsu import RSUNetwork
 import requests
 import pandas as pd
 import sqlite3
+from telemetry_store import run_db_path
 
 SERVER_URL = "http://127.0.0.1:8000"
 RSU_COVERAGE_RADIUS = 500.0
 
-def setup_rsu_network():
+def setup_rsu_network(run_id=None):
     """Setup RSU network"""
-    rsu_network = RSUNetwork(SERVER_URL)
+    rsu_network = RSUNetwork(SERVER_URL, run_id=run_id)
     
     rsu_positions = {
         'RSU_Chachra': (-165.47, -199.59),
@@ -67,20 +68,21 @@ def main():
     print("EXTENDED TEST - Monitoring Battery Discharge")
     print("="*60)
     
-    # Setup
-    rsu_network = setup_rsu_network()
-    print(f"✓ RSU Network ready with {len(rsu_network.rsus)} RSUs")
-    
-    # Clear old data
+    # Start a new run (earlier runs are kept); the RSUs send their batches to it
+    run_id = None
     try:
-        requests.delete(f"{SERVER_URL}/clear_data")
-        print("✓ Cleared old data from server")
+        run_id = requests.delete(f"{SERVER_URL}/clear_data").json()["run_id"]
+        print(f"✓ Started run {run_id} on the server")
     except:
-        print("⚠ Could not clear old data (server may not be running)")
+        print("⚠ Could not start a run (server may not be running)")
+    
+    # Setup
+    rsu_network = setup_rsu_network(run_id)
+    print(f"✓ RSU Network ready with {len(rsu_network.rsus)} RSUs")
     
     # Start SUMO in non-GUI mode
     print("\n Starting SUMO for 500 steps...")
-    traci.start(["sumo", "-c", "CustomRoadNetwork.sumocfg", "--no-warnings"])
+    start_sumo("CustomRoadNetwork.sumocfg", gui=False, extra_args=["--no-warnings"])
     
     # Run for 500 steps
     total_vehicles_seen = set()
@@ -115,7 +117,7 @@ def main():
     print("="*60)
     
     # Read from database and analyze
-    conn = sqlite3.connect('telemetry.db')
+    conn = sqlite3.connect(run_db_path('telemetry.db', run_id))  # This test's run
     df = pd.read_sql_query("""
         SELECT vehicle_id, sim_time, battery_charge, battery_capacity, battery_percentage
         FROM rsu_vehicle_logs
@@ -6,22 +6,79 @@ Vehicles communicate with RSUs which then forward data to the server
 import os
 import time
 import requests
-import traci
+import traci.constants as tc
 import json
 from datetime import datetime
 from rsu import RSUNetwork
+from sim_backend import BACKEND_NAME, traci, start_sumo
+from ev_registry import EVRegistry
+from network_cache import RouteCache, load_network_artifact
+from traffic_index import EdgeOccupancyIndex, TLSTimingCache
+from telemetry_record import VehicleRecord, as_dict
 
 # Constants
 SERVER_URL = "http://127.0.0.1:8000"  # Change to your server IP:port if remote
-RSU_BATCH_SIZE = 50  # Number of records each RSU sends per batch
+RSU_BATCH_SIZE = 50  # Number of records each RSU sends per batch (starting size with adaptive flushing)
 LOG_INTERVAL = 5  # Log data every 5 seconds (reduced for faster feedback)
 RSU_COVERAGE_RADIUS = 500.0  # RSU coverage radius in meters
+RSU_BUFFER_CAPACITY = 5000  # Max records buffered in memory per RSU
+RSU_OVERFLOW_POLICY = "spill"  # 'drop_oldest', 'drop_newest' or 'spill' (spool to disk)
+RSU_SPOOL_DIR = "rsu_spool"  # Per-run, per-RSU write-ahead spool used by the 'spill' policy
+RSU_SPOOL_FSYNC_INTERVAL = 1.0  # Seconds between spool fsyncs (0 = fsync every spilled record)
+RSU_PAYLOAD_FORMAT = "columnar"  # 'json', 'columnar' (gzip) or 'msgpack' (needs msgpack installed)
+RSU_DELTA_ENCODING = True  # Per-EV keyframe on connect, then only the fields that changed
+RSU_AGGREGATION_WINDOW = 30.0  # Per-edge rollup window in sim seconds (None disables edge rollups)
+RSU_RAW_SAMPLE_RATE = 1.0  # Fraction of raw EV records still sent alongside the rollups
+RSU_ADAPTIVE_FLUSH = True  # Adapt batch size to server latency/overload and backlog
+RSU_FLUSH_MAX_AGE = 10.0  # Sim seconds before an adaptive RSU flushes a partial batch
+RUN_ID = datetime.now().strftime("rsu_run_%Y%m%d_%H%M%S")  # Server-side run (own database file) of this simulation
+USE_SUBSCRIPTIONS = True  # Read EV telemetry through TraCI subscriptions (one bulk fetch per step)
 
-# URL to clear data from the FastAPI server
-CLEAR_DATA_URL = f"{SERVER_URL}/clear_data"
+# Vehicle variables subscribed for every EV when it departs
+EV_SUBSCRIPTION_VARS = [
+    tc.VAR_POSITION,
+    tc.VAR_TYPE,
+    tc.VAR_SPEED,
+    tc.VAR_WAITING_TIME,
+    tc.VAR_ROAD_ID,
+    tc.VAR_LANE_ID,
+    tc.VAR_LANEPOSITION,
+    tc.VAR_ROUTE_INDEX,
+    tc.VAR_EDGES,
+    tc.VAR_PARAMETER,
+]
 
-# Initialize RSU Network
-rsu_network = RSUNetwork(SERVER_URL)
+# URL to start a new run on the FastAPI server (earlier runs are kept)
+RUNS_URL = f"{SERVER_URL}/runs"
+
+# Initialize RSU Network (uploads run on background threads so SUMO stepping never waits on HTTP)
+rsu_network = RSUNetwork(
+    SERVER_URL,
+    background_upload=True,
+    buffer_capacity=RSU_BUFFER_CAPACITY,
+    overflow_policy=RSU_OVERFLOW_POLICY,
+    spill_dir=RSU_SPOOL_DIR,
+    spill_fsync_interval=RSU_SPOOL_FSYNC_INTERVAL,
+    payload_format=RSU_PAYLOAD_FORMAT,
+    delta_encoding=RSU_DELTA_ENCODING,
+    aggregation_window=RSU_AGGREGATION_WINDOW,
+    raw_sample_rate=RSU_RAW_SAMPLE_RATE,
+    adaptive_flush=RSU_ADAPTIVE_FLUSH,
+    flush_max_age=RSU_FLUSH_MAX_AGE,
+    run_id=RUN_ID
+)
+
+# EVs are classified once on departure from the vTypes in the route file
+ev_registry = EVRegistry("CustomRoadNetwork.rou.xml")
+
+# Static lane lengths and TLS-controlled edges, parsed once from the net file
+network = load_network_artifact("CustomRoadNetwork.net.xml")
+
+# Edge-length prefix sums and upcoming-TLS indices per distinct route
+route_cache = RouteCache(network)
+
+# Phase tables of the TLS programs, refreshed only when a program changes
+tls_timing = TLSTimingCache()
 
 def setup_rsu_network():
     """
@@ -49,19 +106,19 @@ def setup_rsu_network():
     print(f"RSU Network setup complete with {len(rsu_positions)} RSUs\n")
     return rsu_network
 
-def clear_data_before_run():
-    """Clear data from the server before starting the simulation"""
+def start_run_before_run():
+    """Start this simulation's run on the server so its data is stored apart from earlier runs"""
     try:
-        response = requests.delete(CLEAR_DATA_URL)
+        response = rsu_network.session.post(RUNS_URL, json={"run_id": RUN_ID, "description": "traCI_rsu simulation"})
         response.raise_for_status()
-        print("Data cleared successfully before the run.\n")
+        print(f"Started server run {RUN_ID}.\n")
     except requests.exceptions.RequestException as e:
-        print(f"Error clearing data: {e}\n")
+        print(f"Error starting run {RUN_ID}: {e}\n")
 
-def start_simulation():
+def start_simulation(gui=True):
     """Start SUMO connection"""
-    traci.start(["sumo-gui", "-c", "CustomRoadNetwork.sumocfg"])
-    print("SUMO simulation started\n")
+    start_sumo("CustomRoadNetwork.sumocfg", gui=gui)
+    print(f"SUMO simulation started (backend: {BACKEND_NAME})\n")
 
 def calculate_time_to_red_light(tls_id, current_state):
     """
@@ -75,53 +132,13 @@ def calculate_time_to_red_light(tls_id, current_state):
         Remaining time in seconds until red light, or -1 if error
     """
     try:
-        # Get current phase index and time within phase
-        current_phase = traci.trafficlight.getPhase(tls_id)
-        phase_time = traci.trafficlight.getPhaseDuration(tls_id)
-        next_switch = traci.trafficlight.getNextSwitch(tls_id)
-        current_sim_time = traci.simulation.getTime()
-        
-        # Time remaining in current phase
-        time_remaining_current_phase = next_switch - current_sim_time
-        
-        # Get all phases for this traffic light
         try:
-            # Get the traffic light logic
-            logic = traci.trafficlight.getCompleteRedYellowGreenDefinition(tls_id)[0]
-            phases = logic.getPhases()
-            
-            # Check if current state contains green ('G' or 'g')
-            has_green = 'G' in current_state or 'g' in current_state
-            
-            if not has_green:
-                # Already red or yellow, return 0 or remaining time in current phase if yellow
-                if 'y' in current_state.lower():
-                    return max(0, time_remaining_current_phase)
-                else:
-                    return 0.0
-            
-            # If currently green, check upcoming phases
-            total_time_to_red = time_remaining_current_phase
-            phase_index = (current_phase + 1) % len(phases)
-            
-            # Look ahead through phases until we find one without green
-            while phase_index != current_phase:
-                phase_state = phases[phase_index].state
-                phase_duration = phases[phase_index].duration
-                
-                # If this phase has no green, we found when it turns red
-                if 'G' not in phase_state and 'g' not in phase_state:
-                    break
-                    
-                # Add this phase duration and move to next
-                total_time_to_red += phase_duration
-                phase_index = (phase_index + 1) % len(phases)
-            
-            return round(total_time_to_red, 1)
+            return tls_timing.time_to_red(tls_id, current_state)
             
         except Exception as e:
             # Fallback: assume standard timing (60s green, 5s yellow, 30s red)
-            if has_green:
+            time_remaining_current_phase = traci.trafficlight.getNextSwitch(tls_id) - traci.simulation.getTime()
+            if 'G' in current_state or 'g' in current_state:
                 # If green, estimate based on our standard timing
                 if time_remaining_current_phase > 5:  # Still in green phase
                     return time_remaining_current_phase
@@ -134,7 +151,23 @@ def calculate_time_to_red_light(tls_id, current_state):
         print(f"Error calculating time to red for {tls_id}: {e}")
         return -1
 
-def get_traffic_density_ahead(vehicle_id, edge_id, lane_id, vehicle_position):
+def get_lane_length(lane_id):
+    """
+    Get the length of a lane from the static network artifact
+    
+    Args:
+        lane_id: Lane ID (normal or internal)
+        
+    Returns:
+        Lane length in meters
+    """
+    length = network.lane_length(lane_id)
+    if length is None:
+        # Lane not in the net file (should not happen); ask SUMO directly
+        length = traci.lane.getLength(lane_id)
+    return length
+
+def get_traffic_density_ahead(vehicle_id, edge_id, lane_id, vehicle_position, vehicle_route=None, route_index=None, edge_index=None):
     """
     Calculate traffic density ahead of the vehicle on the same road
     
@@ -143,45 +176,20 @@ def get_traffic_density_ahead(vehicle_id, edge_id, lane_id, vehicle_position):
         edge_id: Current edge ID
         lane_id: Current lane ID  
         vehicle_position: Position on the lane
+        vehicle_route: Route edges of the vehicle (fetched from TraCI if None)
+        route_index: Index of the current edge in the route (fetched from TraCI if None)
+        edge_index: EdgeOccupancyIndex shared by all EVs in this sample tick
         
     Returns:
         Dictionary with traffic density information
     """
     try:
-        # Get all vehicles on the current edge
-        vehicles_on_edge = traci.edge.getLastStepVehicleIDs(edge_id)
-        
-        # Get vehicles on the same lane
-        vehicles_on_lane = []
-        if lane_id and ":" not in lane_id:  # Valid lane (not internal lane)
-            try:
-                vehicles_on_lane = traci.lane.getLastStepVehicleIDs(lane_id)
-            except:
-                vehicles_on_lane = []
-        
-        # Count vehicles ahead in the same direction
-        vehicles_ahead = 0
-        same_direction_ahead = 0
-        
-        for vid in vehicles_on_edge:
-            if vid == vehicle_id:
-                continue
-                
-            try:
-                # Get other vehicle's position on the lane
-                other_lane_id = traci.vehicle.getLaneID(vid)
-                other_position = traci.vehicle.getLanePosition(vid)
-                
-                # Check if vehicle is ahead (higher lane position)
-                if other_position > vehicle_position:
-                    vehicles_ahead += 1
-                    
-                    # Check if on same lane (same direction)
-                    if other_lane_id == lane_id:
-                        same_direction_ahead += 1
-                        
-            except:
-                continue
+        # Count vehicles ahead (bisect lookups in the per-tick edge index)
+        if edge_index is None:
+            edge_index = EdgeOccupancyIndex()
+        vehicles_ahead, same_direction_ahead, vehicles_on_edge_count = edge_index.vehicles_ahead(
+            edge_id, lane_id, vehicle_position
+        )
         
         # Find next traffic light and calculate actual distance
         try:
@@ -189,80 +197,32 @@ def get_traffic_density_ahead(vehicle_id, edge_id, lane_id, vehicle_position):
             tls_state = 'none'
             distance_to_tls = -1
             
-            # Get vehicle's route and current position
-            vehicle_route = traci.vehicle.getRoute(vehicle_id)
-            route_index = traci.vehicle.getRouteIndex(vehicle_id)
-            vehicle_lane_position = traci.vehicle.getLanePosition(vehicle_id)
+            # Get vehicle's route and current position (reuse subscribed values when given)
+            if vehicle_route is None:
+                vehicle_route = traci.vehicle.getRoute(vehicle_id)
+            if route_index is None:
+                route_index = traci.vehicle.getRouteIndex(vehicle_id)
+            vehicle_lane_position = vehicle_position
             
-            # Define traffic lights and their controlled edges
-            traffic_light_edges = {
-                'J1': ['E4', '-E5', 'E3.189', 'E3'],
-                'J2': ['-E9', '-E3', 'E3'], 
-                'J3': ['-E1', 'E7', '-E4', 'E9', 'E0'],
-                'J4': ['E6', '-E7', '-E8'],
-                'J5': ['E5', '-E6'],
-                'J6': ['E8', 'E1', 'E2'],
-                'J7': ['-E2', '-E0', '-E30']
-            }
+            # Remaining distance on the current lane
+            remaining_on_lane = max(0, get_lane_length(lane_id) - vehicle_lane_position)
             
-            # Look for next traffic light on the route
-            for i in range(route_index, len(vehicle_route)):
-                upcoming_edge = vehicle_route[i]
-                
-                # Check if this edge has a traffic light
-                for tls_id, controlled_edges in traffic_light_edges.items():
-                    if upcoming_edge in controlled_edges:
-                        next_tls_id = tls_id
-                        tls_state = traci.trafficlight.getRedYellowGreenState(tls_id)
-                        
-                        # Calculate distance to traffic light
-                        if i == route_index:  # Traffic light on current edge
-                            try:
-                                current_lane_length = traci.lane.getLength(lane_id)
-                                distance_to_tls = max(0, current_lane_length - vehicle_lane_position)
-                            except:
-                                distance_to_tls = 50.0  # Fallback estimate
-                        else:  # Traffic light on future edge
-                            distance_to_tls = 0
-                            # Add remaining distance on current edge
-                            try:
-                                current_lane_length = traci.lane.getLength(lane_id)
-                                distance_to_tls += max(0, current_lane_length - vehicle_lane_position)
-                            except:
-                                distance_to_tls += 50.0
-                            
-                            # Add lengths of intermediate edges
-                            for j in range(route_index + 1, i):
-                                intermediate_edge = vehicle_route[j]
-                                try:
-                                    # Use lane 0 as representative lane for edge length
-                                    intermediate_lane = f"{intermediate_edge}_0"
-                                    edge_length = traci.lane.getLength(intermediate_lane)
-                                    distance_to_tls += edge_length
-                                except:
-                                    distance_to_tls += 100.0  # Fallback estimate
-                        
-                        # Round to reasonable precision
-                        distance_to_tls = round(distance_to_tls, 1)
-                        break
+            # Look for next traffic light on the route (prefix sums, constant time)
+            tls_id, distance = route_cache.next_tls(vehicle_route, route_index, remaining_on_lane)
+            if tls_id is not None:
+                next_tls_id = tls_id
+                tls_state = traci.trafficlight.getRedYellowGreenState(tls_id)
                 
-                if next_tls_id != 'none':
-                    break
+                # Round to reasonable precision
+                distance_to_tls = round(distance, 1)
             
             # If no traffic light found in route, check if current edge has one
             if next_tls_id == 'none':
-                current_edge = traci.vehicle.getRoadID(vehicle_id)
-                for tls_id, controlled_edges in traffic_light_edges.items():
-                    if current_edge in controlled_edges:
-                        next_tls_id = tls_id
-                        tls_state = traci.trafficlight.getRedYellowGreenState(tls_id)
-                        try:
-                            current_lane_length = traci.lane.getLength(lane_id)
-                            distance_to_tls = max(0, current_lane_length - vehicle_lane_position)
-                            distance_to_tls = round(distance_to_tls, 1)
-                        except:
-                            distance_to_tls = 50.0
-                        break
+                tls_id = network.tls_for_edge(edge_id)
+                if tls_id is not None:
+                    next_tls_id = tls_id
+                    tls_state = traci.trafficlight.getRedYellowGreenState(tls_id)
+                    distance_to_tls = round(remaining_on_lane, 1)
                         
         except Exception as e:
             # Fallback to original simple approach if calculation fails
@@ -281,16 +241,13 @@ def get_traffic_density_ahead(vehicle_id, edge_id, lane_id, vehicle_position):
                 tls_state = 'unknown'
                 distance_to_tls = -1
         
-        # Calculate edge occupancy percentage
-        try:
-            # Use lane length since there's no edge.getLength()
-            if lane_id and ":" not in lane_id:  # Valid lane (not internal)
-                edge_length = traci.lane.getLength(lane_id)
-            else:
-                edge_length = 100.0  # Default fallback
-        except:
+        # Calculate edge occupancy percentage (lane length from the network artifact)
+        edge_length = None
+        if lane_id and ":" not in lane_id:  # Valid lane (not internal)
+            edge_length = network.lane_length(lane_id)
+        if edge_length is None:
             edge_length = 100.0  # Default fallback
-        edge_occupancy = min(100.0, (len(vehicles_on_edge) / max(1, edge_length / 7.5)) * 100)  # Assume 7.5m per vehicle
+        edge_occupancy = min(100.0, (vehicles_on_edge_count / max(1, edge_length / 7.5)) * 100)  # Assume 7.5m per vehicle
         
         # Calculate time remaining until red light
         time_to_red = -1
@@ -305,7 +262,7 @@ def get_traffic_density_ahead(vehicle_id, edge_id, lane_id, vehicle_position):
             'tls_state': tls_state,
             'time_to_red_light': time_to_red,
             'edge_occupancy': round(edge_occupancy, 2),
-            'total_vehicles_on_edge': len(vehicles_on_edge)
+            'total_vehicles_on_edge': vehicles_on_edge_count
         }
         
     except Exception as e:
@@ -339,67 +296,24 @@ def get_next_traffic_light(vehicle_id, edge_id, vehicle_position):
         route_edges = traci.vehicle.getRoute(vehicle_id)
         current_route_index = traci.vehicle.getRouteIndex(vehicle_id)
         
-        # Known traffic light junctions from network (using SUMO IDs)
-        traffic_lights = {
-            'J1': {'edges': ['E4', '-E5', 'E3.189'], 'name': 'Chachra'},
-            'J2': {'edges': ['-E9', '-E3', 'E3'], 'name': 'Dhormotola'},  
-            'J3': {'edges': ['-E1', 'E7', '-E4', 'E9', 'E0'], 'name': 'Doratana'},
-            'J4': {'edges': ['E6', '-E7', '-E8'], 'name': 'Monihar'},
-            'J5': {'edges': ['E5', '-E6'], 'name': 'Muroli'},
-            'J6': {'edges': ['E8', 'E1', 'E2'], 'name': 'New_Market'},
-            'J7': {'edges': ['-E2', '-E0', '-E30'], 'name': 'Palbari'}
-        }
+        # Remaining distance on the current lane
+        current_lane = traci.vehicle.getLaneID(vehicle_id)
+        remaining_on_lane = get_lane_length(current_lane) - vehicle_position
         
         # Check upcoming edges for traffic lights
-        for i in range(current_route_index, len(route_edges)):
-            upcoming_edge = route_edges[i]
+        tls_name, distance = route_cache.next_tls(route_edges, current_route_index, remaining_on_lane)
+        if tls_name is not None:
+            # Get traffic light state
+            try:
+                tls_state = traci.trafficlight.getRedYellowGreenState(tls_name)
+            except:
+                tls_state = 'unknown'
             
-            for tls_name, tls_data in traffic_lights.items():
-                if upcoming_edge in tls_data['edges']:
-                    # Calculate distance
-                    if i == current_route_index:  # Same edge
-                        try:
-                            # Get current vehicle's lane
-                            current_lane = traci.vehicle.getLaneID(vehicle_id)
-                            if current_lane and ":" not in current_lane:
-                                edge_length = traci.lane.getLength(current_lane)
-                            else:
-                                edge_length = 100.0
-                        except:
-                            edge_length = 100.0
-                        distance = edge_length - vehicle_position
-                    else:  # Future edge
-                        distance = 0
-                        for j in range(current_route_index, i + 1):
-                            if j == current_route_index:
-                                try:
-                                    current_lane = traci.vehicle.getLaneID(vehicle_id)
-                                    if current_lane and ":" not in current_lane:
-                                        edge_length = traci.lane.getLength(current_lane)
-                                    else:
-                                        edge_length = 100.0
-                                except:
-                                    edge_length = 100.0
-                                distance += edge_length - vehicle_position
-                            else:
-                                try:
-                                    # Try to get first lane from the edge to calculate length
-                                    lane_name = f"{route_edges[j]}_0"
-                                    distance += traci.lane.getLength(lane_name)
-                                except:
-                                    distance += 100.0  # Default fallback
-                    
-                    # Get traffic light state
-                    try:
-                        tls_state = traci.trafficlight.getRedYellowGreenState(tls_name)
-                    except:
-                        tls_state = 'unknown'
-                    
-                    return {
-                        'tls_id': tls_name,
-                        'distance': round(distance, 2),
-                        'state': tls_state
-                    }
+            return {
+                'tls_id': tls_name,
+                'distance': round(distance, 2),
+                'state': tls_state
+            }
         
         # No traffic light found
         return {
@@ -437,11 +351,119 @@ def is_electric_vehicle(vehicle_id):
         # If we can't get battery parameters, it's not an EV
         return False
 
+def subscribe_ev_telemetry(vehicle_id):
+    """
+    Subscribe to all telemetry variables of an EV so that every later sample
+    is served from a single bulk subscription fetch
+    
+    Args:
+        vehicle_id: ID of the EV that just departed
+    """
+    try:
+        traci.vehicle.subscribe(
+            vehicle_id,
+            EV_SUBSCRIPTION_VARS,
+            parameters={tc.VAR_PARAMETER: ("s", "device.battery.actualBatteryCapacity")}
+        )
+    except Exception as e:
+        print(f"Error subscribing to EV {vehicle_id}: {e}")
+
+def fetch_ev_values(vehicle_id):
+    """
+    Read the telemetry variables of one EV with individual TraCI calls
+    (used when subscriptions are disabled)
+    
+    Args:
+        vehicle_id: ID of the EV
+        
+    Returns:
+        Dictionary keyed by the same TraCI variable IDs as a subscription result
+    """
+    return {
+        tc.VAR_POSITION: traci.vehicle.getPosition(vehicle_id),
+        tc.VAR_TYPE: traci.vehicle.getTypeID(vehicle_id),
+        tc.VAR_SPEED: traci.vehicle.getSpeed(vehicle_id),
+        tc.VAR_WAITING_TIME: traci.vehicle.getWaitingTime(vehicle_id),
+        tc.VAR_ROAD_ID: traci.vehicle.getRoadID(vehicle_id),
+        tc.VAR_LANE_ID: traci.vehicle.getLaneID(vehicle_id),
+        tc.VAR_LANEPOSITION: traci.vehicle.getLanePosition(vehicle_id),
+        tc.VAR_ROUTE_INDEX: traci.vehicle.getRouteIndex(vehicle_id),
+        tc.VAR_EDGES: traci.vehicle.getRoute(vehicle_id),
+        tc.VAR_PARAMETER: traci.vehicle.getParameter(vehicle_id, "device.battery.actualBatteryCapacity"),
+    }
+
+def build_vehicle_data(vehicle_id, values, sim_time, edge_index=None):
+    """
+    Build the telemetry record expected by the RSU network
+    
+    Args:
+        vehicle_id: ID of the EV
+        values: TraCI variable values keyed by variable ID
+        sim_time: Current simulation time
+        edge_index: EdgeOccupancyIndex shared by all EVs in this sample tick
+        
+    Returns:
+        VehicleRecord with the EV telemetry
+    """
+    position = values[tc.VAR_POSITION]
+    
+    # Get vehicle speed
+    speed = values[tc.VAR_SPEED]
+    if values[tc.VAR_WAITING_TIME] > 0:
+        speed = 0.0
+    
+    # Get current edge and lane
+    edge_id = values[tc.VAR_ROAD_ID]
+    lane_id = values[tc.VAR_LANE_ID]
+    lane_position = values[tc.VAR_LANEPOSITION]
+    
+    # Get traffic density data
+    traffic_data = get_traffic_density_ahead(
+        vehicle_id, edge_id, lane_id, lane_position,
+        vehicle_route=values[tc.VAR_EDGES],
+        route_index=values[tc.VAR_ROUTE_INDEX],
+        edge_index=edge_index
+    )
+    
+    # Get battery parameters (capacity comes from the vType definition)
+    battery_capacity = ev_registry.battery_capacity(vehicle_id)
+    if battery_capacity is None:
+        battery_capacity = float(traci.vehicle.getParameter(vehicle_id, "device.battery.capacity"))
+    battery_charge = float(values[tc.VAR_PARAMETER])
+    
+    # Calculate battery percentage
+    battery_percentage = (battery_charge / battery_capacity * 100.0) if battery_capacity > 0 else 0.0
+    
+    # Prepare vehicle data with consistent field names
+    return VehicleRecord(
+        vehicle_id=vehicle_id,
+        vehicle_type=values[tc.VAR_TYPE],
+        speed=speed,
+        edge_id=edge_id,
+        lane_id=lane_id,
+        lane_position=lane_position,
+        vehicles_ahead_count=traffic_data['vehicles_ahead'],
+        same_direction_ahead=traffic_data['same_direction_ahead'],
+        distance_to_traffic_light=traffic_data['distance_to_tls'],
+        next_traffic_light=traffic_data['next_tls_id'],
+        traffic_light_state=traffic_data['tls_state'],
+        time_to_red_light=traffic_data['time_to_red_light'],
+        edge_occupancy_percentage=traffic_data['edge_occupancy'],
+        battery_charge=battery_charge,
+        battery_capacity=battery_capacity,
+        battery_percentage=battery_percentage,
+        sim_time=sim_time,
+        position=position
+    )
+
 def collect_vehicle_data_via_rsu(sim_time):
     """
     Collect vehicle data and route it through the RSU network
     Only collects data from Electric Vehicles (EVs)
     
+    With USE_SUBSCRIPTIONS enabled, EV telemetry comes from a single
+    getAllSubscriptionResults() call instead of per-vehicle round-trips.
+    
     Args:
         sim_time: Current simulation time
     """
@@ -450,8 +472,13 @@ def collect_vehicle_data_via_rsu(sim_time):
     if not vehicle_ids:
         return
     
-    # Filter to only EVs
-    ev_ids = [vid for vid in vehicle_ids if is_electric_vehicle(vid)]
+    if USE_SUBSCRIPTIONS:
+        # Only EVs are subscribed, so the bulk result is already filtered
+        ev_values = traci.vehicle.getAllSubscriptionResults()
+        ev_ids = list(ev_values)
+    else:
+        # Filter to only EVs (set lookups in the registry, no TraCI calls)
+        ev_ids = [vid for vid in vehicle_ids if vid in ev_registry]
     non_ev_count = len(vehicle_ids) - len(ev_ids)
     
     print(f"[Sim Time: {sim_time}s] Active vehicles: {len(vehicle_ids)} (EVs: {len(ev_ids)}, Non-EVs: {non_ev_count})")
@@ -462,64 +489,36 @@ def collect_vehicle_data_via_rsu(sim_time):
     
     print(f"  Collecting data from {len(ev_ids)} EVs...")
     
+    # One edge index per sample tick, seeded with the EV positions we already have
+    known_positions = {}
+    if USE_SUBSCRIPTIONS:
+        known_positions = {
+            vid: (values[tc.VAR_LANE_ID], values[tc.VAR_LANEPOSITION])
+            for vid, values in ev_values.items()
+        }
+    edge_index = EdgeOccupancyIndex(known_positions)
+    tls_timing.begin_tick(sim_time)
+    
+    collected_ids = []
+    collected_data = []
     for vid in ev_ids:
         try:
-            # Get vehicle position
-            position = traci.vehicle.getPosition(vid)
-            
-            # Get vehicle type
-            v_type = traci.vehicle.getTypeID(vid)
-            
-            # Get vehicle speed
-            speed = traci.vehicle.getSpeed(vid)
-            if traci.vehicle.getWaitingTime(vid) > 0:
-                speed = 0.0
-            
-            # Get current edge and lane
-            edge_id = traci.vehicle.getRoadID(vid)
-            lane_id = traci.vehicle.getLaneID(vid)
-            lane_position = traci.vehicle.getLanePosition(vid)
-            
-            # Get traffic density data
-            traffic_data = get_traffic_density_ahead(vid, edge_id, lane_id, lane_position)
-            
-            # Get battery parameters
-            battery_capacity = float(traci.vehicle.getParameter(vid, "device.battery.capacity"))
-            battery_charge = float(traci.vehicle.getParameter(vid, "device.battery.actualBatteryCapacity"))
-            
-            # Calculate battery percentage
-            battery_percentage = (battery_charge / battery_capacity * 100.0) if battery_capacity > 0 else 0.0
-            
-            # Prepare vehicle data with consistent field names
-            vehicle_data = {
-                'vehicle_id': vid,
-                'vehicle_type': v_type,
-                'speed': speed,
-                'edge_id': edge_id,
-                'lane_id': lane_id,
-                'lane_position': lane_position,
-                'vehicles_ahead_count': traffic_data['vehicles_ahead'],
-                'same_direction_ahead': traffic_data['same_direction_ahead'],
-                'distance_to_traffic_light': traffic_data['distance_to_tls'],
-                'next_traffic_light': traffic_data['next_tls_id'],
-                'traffic_light_state': traffic_data['tls_state'],
-                'time_to_red_light': traffic_data['time_to_red_light'],
-                'edge_occupancy_percentage': traffic_data['edge_occupancy'],
-                'battery_charge': battery_charge,
-                'battery_capacity': battery_capacity,
-                'battery_percentage': battery_percentage,
-                'sim_time': sim_time,
-                'position': position
-            }
-            
-            # Send data to nearest RSU (only EVs)
-            rsu_network.collect_vehicle_data(vid, position, vehicle_data, is_ev=True)
+            values = ev_values[vid] if USE_SUBSCRIPTIONS else fetch_ev_values(vid)
+            collected_data.append(build_vehicle_data(vid, values, sim_time, edge_index))
+            collected_ids.append(vid)
             
         except Exception as e:
             print(f"Error collecting data for EV {vid}: {e}")
     
-    # Send data from all RSUs to server
-    rsu_network.send_all_data(RSU_BATCH_SIZE)
+    # Send data to nearest RSUs (only EVs), assigning all EVs in one batch
+    rsu_network.collect_vehicle_data_batch(
+        collected_ids,
+        [data.position for data in collected_data],
+        collected_data
+    )
+    
+    # Send data from all RSUs to server (adaptive RSUs flush on batch size or record age)
+    rsu_network.send_all_data(RSU_BATCH_SIZE, sim_time)
 
 def export_enhanced_data_locally(rsu_network, step_count, sim_time, total_vehicles, total_evs, data_points):
     """
@@ -534,17 +533,17 @@ def export_enhanced_data_locally(rsu_network, step_count, sim_time, total_vehicl
     
     # Collect data from all RSUs
     for rsu in rsu_network.rsus:
-        if rsu.vehicle_buffer:  # Only include RSUs with data
+        if rsu.buffered_count():  # Only include RSUs with data
             rsu_data = {
                 'rsu_id': rsu.rsu_id,
                 'rsu_position': rsu.position,
                 'connected_vehicles': len(rsu.connected_vehicles),
-                'buffered_records': len(rsu.vehicle_buffer),
-                'vehicle_data': rsu.vehicle_buffer
+                'buffered_records': rsu.buffered_count(),
+                'vehicle_data': [as_dict(record) for record in rsu.buffered_records()]
             }
             all_data.append(rsu_data)
-            total_records += len(rsu.vehicle_buffer)
-            print(f"RSU {rsu.rsu_id}: {len(rsu.vehicle_buffer)} enhanced records")
+            total_records += rsu.buffered_count()
+            print(f"RSU {rsu.rsu_id}: {rsu.buffered_count()} enhanced records")
     
     if total_records == 0:
         print("❌ No enhanced data found in RSU buffers")
@@ -623,6 +622,27 @@ def export_enhanced_data_locally(rsu_network, step_count, sim_time, total_vehicl
     
     return json_file, csv_file
 
+def advance_simulation():
+    """
+    Advance SUMO by one step and register departed / arrived vehicles
+    
+    Returns:
+        (simulation time, departed vehicle IDs, newly departed EV IDs)
+    """
+    traci.simulationStep()
+    sim_time = traci.simulation.getTime()
+    
+    # Classify departures once and evict arrivals from the EV registry
+    departed_vehicles = traci.simulation.getDepartedIDList()
+    new_evs = ev_registry.update(departed_vehicles, traci.simulation.getArrivedIDList())
+    
+    # Subscribe newly departed EVs once; subscriptions end automatically on arrival
+    if USE_SUBSCRIPTIONS:
+        for vid in new_evs:
+            subscribe_ev_telemetry(vid)
+    
+    return sim_time, departed_vehicles, new_evs
+
 def run_simulation():
     """Run simulation and collect data via RSU network"""
     last_log_time = 0
@@ -641,8 +661,7 @@ def run_simulation():
     
     while (traci.simulation.getMinExpectedNumber() > 0 or step_count < min_steps) and sim_time < max_sim_time and step_count < max_steps:
         try:
-            traci.simulationStep()
-            sim_time = traci.simulation.getTime()
+            sim_time, departed_vehicles, new_evs = advance_simulation()
             step_count += 1
             
             # Early logging to debug vehicle spawning
@@ -656,25 +675,20 @@ def run_simulation():
             
             # Track all vehicles seen during simulation
             current_vehicles = traci.vehicle.getIDList()
-            if current_vehicles:
-                new_vehicles = set(current_vehicles) - all_vehicles_seen
-                if new_vehicles:
-                    # Check which are EVs
-                    new_evs = [vid for vid in new_vehicles if is_electric_vehicle(vid)]
-                    new_non_evs = len(new_vehicles) - len(new_evs)
-                    if new_evs:
-                        print(f"[Step {step_count}] New vehicles appeared: {len(new_vehicles)} (EVs: {len(new_evs)}, Non-EVs: {new_non_evs})")
-                        ev_vehicles_seen.update(new_evs)
-                    else:
-                        print(f"[Step {step_count}] New non-EV vehicles appeared: {len(new_vehicles)}")
-                all_vehicles_seen.update(current_vehicles)
+            if departed_vehicles:
+                new_non_evs = len(departed_vehicles) - len(new_evs)
+                if new_evs:
+                    print(f"[Step {step_count}] New vehicles appeared: {len(departed_vehicles)} (EVs: {len(new_evs)}, Non-EVs: {new_non_evs})")
+                    ev_vehicles_seen.update(new_evs)
+                else:
+                    print(f"[Step {step_count}] New non-EV vehicles appeared: {len(departed_vehicles)}")
+                all_vehicles_seen.update(departed_vehicles)
             
             # Log data at regular intervals
             if sim_time - last_log_time >= LOG_INTERVAL:
                 if current_vehicles:
                     collect_vehicle_data_via_rsu(sim_time)
-                    current_evs = [vid for vid in current_vehicles if is_electric_vehicle(vid)]
-                    total_ev_data_collected += len(current_evs)
+                    total_ev_data_collected += len(ev_registry)
                     print(f"  📊 Total seen: {len(all_vehicles_seen)} vehicles ({len(ev_vehicles_seen)} EVs), EV data points collected: {total_ev_data_collected}")
                 else:
                     print(f"[Step {step_count}, Time: {sim_time}s] No active vehicles (Total seen: {len(all_vehicles_seen)}, EVs: {len(ev_vehicles_seen)})")
@@ -706,6 +720,12 @@ def run_simulation():
     # Final data transmission
     print("\nSimulation ended. Sending remaining data...")
     rsu_network.send_all_data(RSU_BATCH_SIZE)
+    rsu_network.send_edge_stats(final=True)
+    rsu_network.wait_for_uploads()
+    # The server acknowledges batches once committed; wait for that (resending
+    # any it lost) so the /rsu_stats totals below include every batch
+    if not rsu_network.wait_for_acks():
+        print("⚠️  Some batches are not committed yet; the server statistics may be incomplete")
     
     # Export enhanced data locally before ending
     export_enhanced_data_locally(rsu_network, step_count, sim_time, len(all_vehicles_seen), len(ev_vehicles_seen), total_ev_data_collected)
@@ -727,7 +747,7 @@ def run_simulation():
     
     # Print final statistics
     try:
-        response = requests.get(f"{SERVER_URL}/rsu_stats")
+        response = rsu_network.session.get(f"{SERVER_URL}/rsu_stats", params={"run_id": RUN_ID})
         if response.status_code == 200:
             stats = response.json()
             print("\n" + "="*60)
@@ -752,8 +772,8 @@ def main():
         # Setup RSU network
         setup_rsu_network()
         
-        # Clear old data from the server
-        clear_data_before_run()
+        # Start a new run on the server (earlier runs stay available)
+        start_run_before_run()
         
         # Start the simulation
         start_simulation()
@@ -766,6 +786,7 @@ def main():
     except Exception as e:
         print(f"An error occurred: {e}")
     finally:
+        rsu_network.close()
         traci.close()
         print("SUMO connection closed.")
 
@@ -0,0 +1,189 @@
+"""
+Traffic Index Module
+Per-sample lookup structures shared by every EV in the same sample tick
+"""
+
+from bisect import bisect_right
+from typing import Dict, List, Optional, Tuple
+from sim_backend import traci
+
+
+class EdgeOccupancyIndex:
+    """
+    Sorted lane positions of the vehicles on each edge, built lazily once per
+    sample tick so that every EV on the same edge reuses the same index
+    """
+
+    def __init__(self, known_positions: Optional[Dict[str, Tuple[str, float]]] = None):
+        """
+        Initialize an empty index for one sample tick
+
+        Args:
+            known_positions: vehicle ID -> (lane ID, lane position) already known
+                             for this tick (e.g. from subscription results)
+        """
+        self.known_positions = known_positions or {}
+        self._edges: Dict[str, Tuple[List[float], Dict[str, List[float]]]] = {}
+
+    def _build_edge(self, edge_id: str) -> Tuple[List[float], Dict[str, List[float]]]:
+        """
+        Fetch and sort the lane positions of all vehicles on an edge
+
+        Args:
+            edge_id: Edge ID
+
+        Returns:
+            (sorted positions on the edge, lane ID -> sorted positions on the lane)
+        """
+        edge_positions = []
+        lane_positions: Dict[str, List[float]] = {}
+
+        for vid in traci.edge.getLastStepVehicleIDs(edge_id):
+            known = self.known_positions.get(vid)
+            try:
+                if known is not None:
+                    lane_id, position = known
+                else:
+                    lane_id = traci.vehicle.getLaneID(vid)
+                    position = traci.vehicle.getLanePosition(vid)
+            except Exception:
+                continue
+            edge_positions.append(position)
+            lane_positions.setdefault(lane_id, []).append(position)
+
+        edge_positions.sort()
+        for positions in lane_positions.values():
+            positions.sort()
+
+        entry = (edge_positions, lane_positions)
+        self._edges[edge_id] = entry
+        return entry
+
+    def vehicles_ahead(self, edge_id: str, lane_id: str, position: float) -> Tuple[int, int, int]:
+        """
+        Count the vehicles ahead of a lane position
+
+        Args:
+            edge_id: Edge ID of the requesting vehicle
+            lane_id: Lane ID of the requesting vehicle
+            position: Lane position of the requesting vehicle
+
+        Returns:
+            (vehicles ahead on the edge, vehicles ahead on the same lane,
+             total vehicles on the edge)
+        """
+        entry = self._edges.get(edge_id)
+        if entry is None:
+            entry = self._build_edge(edge_id)
+        edge_positions, lane_positions = entry
+
+        # Strictly greater positions are ahead, which also excludes the vehicle itself
+        ahead = len(edge_positions) - bisect_right(edge_positions, position)
+        same_lane = lane_positions.get(lane_id, [])
+        same_direction_ahead = len(same_lane) - bisect_right(same_lane, position)
+
+        return ahead, same_direction_ahead, len(edge_positions)
+
+
+def has_green(state: str) -> bool:
+    """True if a red/yellow/green state string contains any green signal"""
+    return 'G' in state or 'g' in state
+
+
+class TLSTimingCache:
+    """
+    Precomputed phase tables of the traffic-light programs, so that the time
+    until a TLS turns red is a table read plus the remaining time of the
+    current phase. Results are shared by every EV in the same sample tick.
+    """
+
+    def __init__(self):
+        """Initialize an empty cache"""
+        self._programs: Dict[str, Tuple[str, List[float]]] = {}  # TLS ID -> (program ID, green tail per phase)
+        self._tick_time: Optional[float] = None
+        self._tick_results: Dict[str, float] = {}
+
+    def begin_tick(self, sim_time: float):
+        """
+        Start a new sample tick; per-TLS results are memoized until the next tick
+
+        Args:
+            sim_time: Current simulation time
+        """
+        self._tick_time = sim_time
+        self._tick_results = {}
+
+    def _load_program(self, tls_id: str, program_id: str) -> List[float]:
+        """
+        Build the phase table of a TLS program
+
+        For each phase index p, the table holds the total duration of the
+        green phases that directly follow p, i.e. the time from the end of
+        phase p until the first non-green phase starts.
+
+        Args:
+            tls_id: Traffic light ID
+            program_id: Active program ID
+
+        Returns:
+            List of green-tail durations indexed by phase
+        """
+        logics = traci.trafficlight.getCompleteRedYellowGreenDefinition(tls_id)
+        logic = next((l for l in logics if l.programID == program_id), logics[0])
+        phases = logic.getPhases()
+        count = len(phases)
+
+        green_tail = []
+        for current_phase in range(count):
+            total = 0.0
+            phase_index = (current_phase + 1) % count
+            while phase_index != current_phase:
+                if not has_green(phases[phase_index].state):
+                    break
+                total += phases[phase_index].duration
+                phase_index = (phase_index + 1) % count
+            green_tail.append(total)
+
+        self._programs[tls_id] = (program_id, green_tail)
+        return green_tail
+
+    def time_to_red(self, tls_id: str, current_state: str) -> float:
+        """
+        Remaining time until a traffic light turns red
+
+        Args:
+            tls_id: Traffic light ID
+            current_state: Current red/yellow/green state string
+
+        Returns:
+            Remaining time in seconds until red light
+        """
+        cached = self._tick_results.get(tls_id)
+        if cached is not None:
+            return cached
+
+        sim_time = self._tick_time
+        if sim_time is None:
+            sim_time = traci.simulation.getTime()
+        time_remaining_current_phase = traci.trafficlight.getNextSwitch(tls_id) - sim_time
+
+        if not has_green(current_state):
+            # Already red or yellow, return 0 or remaining time in current phase if yellow
+            if 'y' in current_state.lower():
+                result = max(0, time_remaining_current_phase)
+            else:
+                result = 0.0
+        else:
+            # Refresh the phase table only when the active program changes
+            program_id = traci.trafficlight.getProgram(tls_id)
+            entry = self._programs.get(tls_id)
+            if entry is None or entry[0] != program_id:
+                green_tail = self._load_program(tls_id, program_id)
+            else:
+                green_tail = entry[1]
+            current_phase = traci.trafficlight.getPhase(tls_id)
+            result = round(time_remaining_current_phase + green_tail[current_phase], 1)
+
+        if self._tick_time is not None:
+            self._tick_results[tls_id] = result
+        return result
@@ -1,7 +1,8 @@
 import sqlite3
 import pandas as pd
+from telemetry_store import run_db_path
 
-conn = sqlite3.connect('telemetry.db')
+conn = sqlite3.connect(run_db_path('telemetry.db'))  # Latest run
 
 # Get sample data
 df = pd.read_sql_query("""
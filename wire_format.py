@@ -0,0 +1,262 @@
+"""
+RSU Wire Format Module
+Encodes RSU batches for /ingest_rsu and decodes them on the server.
+
+Formats (negotiated by Content-Type, JSON is always accepted):
+    json      application/json                      one object per record (original format)
+    columnar  application/vnd.rsu.columnar+json     struct-of-arrays, gzip-compressed
+    msgpack   application/vnd.rsu.columnar+msgpack  struct-of-arrays in MessagePack, gzip-compressed
+                                                    (requires the optional msgpack package)
+
+The columnar formats send every field name once per batch instead of once per
+record, and hoist columns whose value is identical across the batch (rsu_id,
+collection timestamp, vehicle type, ...) into a constants map.
+
+Delta-encoded batches (RSU delta mode, 'delta': true in the envelope) have
+rows with different fields and are always sent row-oriented; see
+apply_deltas() for how the server rebuilds full rows from them.
+"""
+
+import gzip
+import json
+from typing import Dict, List, Optional, Tuple
+
+from telemetry_record import FIELD_NAMES, VehicleRecord, as_dict
+
+try:
+    import msgpack
+except ImportError:  # optional dependency
+    msgpack = None
+
+JSON = "json"
+COLUMNAR = "columnar"
+MSGPACK = "msgpack"
+
+CONTENT_TYPES = {
+    JSON: "application/json",
+    COLUMNAR: "application/vnd.rsu.columnar+json",
+    MSGPACK: "application/vnd.rsu.columnar+msgpack",
+}
+FORMATS_BY_CONTENT_TYPE = {content_type: fmt for fmt, content_type in CONTENT_TYPES.items()}
+
+
+class UnsupportedFormatError(ValueError):
+    """Raised for a Content-Type / Content-Encoding the decoder does not understand"""
+
+
+class MissingKeyframeError(ValueError):
+    """Raised for delta rows of vehicles whose keyframe the receiver does not have"""
+
+    def __init__(self, vehicle_ids: List[str]):
+        super().__init__(f"No keyframe for vehicles {vehicle_ids}")
+        self.vehicle_ids = vehicle_ids
+
+
+def available_formats() -> List[str]:
+    """Wire formats usable with the installed packages"""
+    return [fmt for fmt in (JSON, COLUMNAR, MSGPACK) if fmt != MSGPACK or msgpack is not None]
+
+
+def _json_default(value):
+    """JSON fallback: VehicleRecords as objects, anything else as a string"""
+    if isinstance(value, VehicleRecord):
+        return value.to_dict()
+    return str(value)
+
+
+def to_columns(records: List) -> Optional[Tuple[Dict, Dict]]:
+    """
+    Convert records to (constants, columns)
+
+    Args:
+        records: VehicleRecords or row-oriented dictionaries that all share the same fields
+
+    Returns:
+        (field -> value shared by every record, field -> list of values), or
+        None if the records do not all have the same fields
+    """
+    if not records:
+        return {}, {}
+    if all(type(record) is VehicleRecord for record in records):
+        # Slotted records have fixed fields; read the columns straight off the attributes
+        fields = FIELD_NAMES
+        column_of = lambda field: [getattr(record, field) for record in records]
+    else:
+        fields = list(records[0].keys())
+        field_set = set(fields)
+        if any(set(record.keys()) != field_set for record in records):
+            return None
+        column_of = lambda field: [record[field] for record in records]
+
+    constants = {}
+    columns = {}
+    for field in fields:
+        values = column_of(field)
+        first = values[0]
+        if all(value == first for value in values):
+            constants[field] = first
+        else:
+            columns[field] = values
+    return constants, columns
+
+
+def from_columns(count: int, constants: Dict, columns: Dict) -> List[Dict]:
+    """
+    Rebuild row-oriented records from (constants, columns)
+
+    Args:
+        count: Number of records
+        constants: Field -> value shared by every record
+        columns: Field -> list of values
+
+    Returns:
+        List of record dictionaries
+    """
+    fields = list(columns.keys())
+    rows = zip(*(columns[field] for field in fields)) if fields else ([] for _ in range(count))
+    return [{**constants, **dict(zip(fields, row))} for row in rows]
+
+
+def encode_deltas(records: List, base: Dict[str, Dict]) -> Tuple[List[Dict], Dict[str, Dict]]:
+    """
+    Delta-encode records against the last full row of each vehicle
+
+    The first row of a vehicle without a base row is a full keyframe (marked
+    'keyframe': True); every later row only carries vehicle_id and the fields
+    that changed since the previous row of the same vehicle.
+
+    Args:
+        records: VehicleRecords or telemetry dictionaries, in collection order
+        base: Vehicle ID -> last full row known to the receiver (not modified)
+
+    Returns:
+        (delta rows, vehicle ID -> last full row once the receiver has the rows)
+    """
+    rows = []
+    new_base: Dict[str, Dict] = {}
+    for record in records:
+        full = as_dict(record)
+        vehicle_id = full['vehicle_id']
+        previous = new_base.get(vehicle_id) or base.get(vehicle_id)
+        if previous is None or previous.keys() != full.keys():
+            row = {**full, 'keyframe': True}
+        else:
+            row = {
+                field: value for field, value in full.items()
+                if field == 'vehicle_id' or previous[field] != value
+            }
+        new_base[vehicle_id] = full
+        rows.append(row)
+    return rows, new_base
+
+
+def apply_deltas(rows: List[Dict], base: Dict[str, Dict]) -> Tuple[List[Dict], Dict[str, Dict]]:
+    """
+    Rebuild full rows from delta rows (inverse of encode_deltas)
+
+    Args:
+        rows: Keyframe and delta rows, in collection order
+        base: Vehicle ID -> last full row of a previous batch (not modified)
+
+    Returns:
+        (full rows, vehicle ID -> last full row after this batch)
+
+    Raises:
+        MissingKeyframeError: if a delta row has no keyframe to apply to
+    """
+    full_rows = []
+    new_base: Dict[str, Dict] = {}
+    missing = []
+    for row in rows:
+        row = dict(row)
+        vehicle_id = row.get('vehicle_id')
+        if row.pop('keyframe', False):
+            full = row
+        else:
+            previous = new_base.get(vehicle_id) or base.get(vehicle_id)
+            if previous is None:
+                missing.append(vehicle_id)
+                continue
+            full = {**previous, **row}
+        new_base[vehicle_id] = full
+        full_rows.append(full)
+    if missing:
+        raise MissingKeyframeError(sorted(set(missing)))
+    return full_rows, new_base
+
+
+def encode_payload(payload: Dict, fmt: str = JSON) -> Tuple[bytes, Dict[str, str]]:
+    """
+    Encode an RSU payload for POSTing to /ingest_rsu
+
+    Args:
+        payload: Envelope with rsu_id, rsu_position, vehicle_data and timestamp
+        fmt: 'json', 'columnar' or 'msgpack'; falls back to JSON when the
+             records cannot be made columnar (e.g. delta rows, gzip-compressed)
+             or msgpack is not installed
+
+    Returns:
+        (request body, HTTP headers)
+    """
+    if fmt in (COLUMNAR, MSGPACK) and not (fmt == MSGPACK and msgpack is None):
+        converted = to_columns(payload['vehicle_data'])
+        if converted is not None:
+            constants, columns = converted
+            envelope = {key: value for key, value in payload.items() if key != 'vehicle_data'}
+            envelope['count'] = len(payload['vehicle_data'])
+            envelope['constants'] = constants
+            envelope['columns'] = columns
+            if fmt == MSGPACK:
+                raw = msgpack.packb(envelope, use_bin_type=True)
+            else:
+                raw = json.dumps(envelope, separators=(",", ":"), default=_json_default).encode("utf-8")
+            headers = {"Content-Type": CONTENT_TYPES[fmt], "Content-Encoding": "gzip"}
+            return gzip.compress(raw, compresslevel=6), headers
+        if fmt == COLUMNAR:
+            # Ragged rows (delta-encoded batches): compact JSON rows, still compressed
+            raw = json.dumps(payload, separators=(",", ":"), default=_json_default).encode("utf-8")
+            headers = {"Content-Type": CONTENT_TYPES[JSON], "Content-Encoding": "gzip"}
+            return gzip.compress(raw, compresslevel=6), headers
+
+    body = json.dumps(payload, default=_json_default).encode("utf-8")
+    return body, {"Content-Type": CONTENT_TYPES[JSON]}
+
+
+def decode_payload(body: bytes, content_type: Optional[str], content_encoding: Optional[str] = None) -> Dict:
+    """
+    Decode a /ingest_rsu request body into the row-oriented payload
+
+    Args:
+        body: Raw request body
+        content_type: Content-Type header value
+        content_encoding: Content-Encoding header value
+
+    Returns:
+        Envelope with rsu_id, rsu_position, vehicle_data (list of dicts) and timestamp
+    """
+    media_type = (content_type or CONTENT_TYPES[JSON]).split(";")[0].strip().lower()
+    fmt = FORMATS_BY_CONTENT_TYPE.get(media_type)
+    if fmt is None:
+        raise UnsupportedFormatError(f"Unsupported Content-Type '{media_type}'")
+
+    encoding = (content_encoding or "identity").strip().lower()
+    if encoding == "gzip":
+        body = gzip.decompress(body)
+    elif encoding != "identity":
+        raise UnsupportedFormatError(f"Unsupported Content-Encoding '{encoding}'")
+
+    if fmt == JSON:
+        return json.loads(body)
+
+    if fmt == MSGPACK:
+        if msgpack is None:
+            raise UnsupportedFormatError("msgpack is not installed on the server")
+        envelope = msgpack.unpackb(body, raw=False)
+    else:
+        envelope = json.loads(body)
+
+    count = envelope.pop('count')
+    constants = envelope.pop('constants')
+    columns = envelope.pop('columns')
+    envelope['vehicle_data'] = from_columns(count, constants, columns)
+    return envelope